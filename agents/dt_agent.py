@@ -5,8 +5,33 @@ from google.adk.agent_builder import AgentBuilder
 from google.adk.function_tool import FunctionTool
 from core.utils.prompt_utils import read_prompt_file
 from schemas import SessionContext  # Importar SessionContext real
+from core.session import EMOCIONES_NEGATIVAS, warm_up, degraded, get_context_store, diff_context, VersionConflict
+from core.entidades import emergency_contacts
+from core.cache import get_client_data_cache
+from core.clientes import get_client_data
+from core.utils.tool_events import get_tool_logger
 import json # Necesario para manejar JSON en el SessionContext
 
+log = get_tool_logger("DT_AGENT")
+
+# Umbrales sobre la trayectoria emocional (SessionContext.estado_emocional)
+CARGA_TT = 1.0            # carga negativa mínima para que una escalada active el Think Tool
+TENDENCIA_ESCALADA = 0.2  # tendencia de la carga negativa que se considera escalada
+CARGA_URGENTE = 2.0       # carga negativa sostenida que pasa a modo Urgente
+TURNOS_URGENTE = 3        # turnos seguidos en la misma emoción negativa para modo Urgente
+
+# Plazo (segundos) de cada lectura del arranque de sesión; vencido, se usa su valor por defecto
+WARMUP_DEADLINES = {
+    "cliente": 1.5,
+    "resumen_ultima_sesion": 1.0,
+    "pautas": 0.5,
+    "especialidades": 0.5,
+}
+
+# Pautas y especialidades con las que arranca un cliente sin datos propios
+PAUTAS_DEFAULT = ("ICF-1.1_escucha_activa", "ICF-2.0_preg_abiertas")
+ESPECIALIDADES_DEFAULT = {"principal": "ICF", "secundarias": ("Ontología", "Gestalt")}
+
 # --- DEFINICIÓN DE FUNCTIONTOOLS (PLACEHOLDERS, SE IMPLEMENTARÁN EN PASOS POSTERIORES) ---
 # Estas son las herramientas que el Agente DT usará.
 
@@ -18,31 +43,87 @@ def retrieve_client_data_tool(client_id: str) -> dict:
     Returns:
         Un diccionario con las preferencias, el último resumen_memoria_larga, y entidades_iniciales.
     """
-    print(f"DEBUG: Llamada a retrieve_client_data_tool para cliente: {client_id}")
+    log.debug("retrieve_client_data_tool para cliente: %s", client_id)
+    # Lectura real (repositorios), a través de la caché compartida de clientes
+    return get_client_data(client_id)
+
+def retrieve_last_session_summary_tool(client_id: str) -> str:
+    """
+    Recupera el resumen de la última sesión cerrada del cliente (None si no hay).
+    """
+    # TODO: Implementar la lógica real para leer la tabla sesiones de Supabase (Paso 4)
+    return None
+
+def retrieve_pautas_tool(client_id: str) -> list:
+    """
+    Recupera las pautas priorizadas con las que arranca la sesión del cliente.
+    """
+    # TODO: Implementar la lógica real para leer de Supabase (Paso 4)
+    return list(PAUTAS_DEFAULT)
+
+def retrieve_especialidades_tool(client_id: str) -> dict:
+    """
+    Recupera la especialidad principal y las secundarias para el cliente.
+    """
     # TODO: Implementar la lógica real para leer de Supabase (Paso 4)
-    # Valores de ejemplo para que la lógica del DT pueda operar
+    return _especialidades_default()
+
+def _especialidades_default() -> dict:
+    return {"principal": ESPECIALIDADES_DEFAULT["principal"],
+            "secundarias": list(ESPECIALIDADES_DEFAULT["secundarias"])}
+
+def _warmup_defaults() -> dict:
+    # Valores con los que arranca la sesión si una lectura no llega a tiempo (nuevos en cada llamada)
     return {
-        "preferencias": {"idioma": "es", "tono": "cercano", "voz": "femenina"},
-        "resumen_memoria_larga": "El cliente tiene un conflicto laboral y ha mostrado frustración en sesiones anteriores. Ha trabajado en la gestión del estrés.",
-        "entidades_iniciales": [] # Por ahora, vacío
+        "cliente": {"preferencias": {}, "resumen_memoria_larga": None, "entidades_iniciales": []},
+        "resumen_ultima_sesion": None,
+        # Los mismos de retrieve_pautas_tool / retrieve_especialidades_tool sin datos del
+        # cliente; no se llaman acá porque una lectura real no respetaría el plazo
+        "pautas": list(PAUTAS_DEFAULT),
+        "especialidades": _especialidades_default(),
     }
 
-def update_session_context_tool(session_id: str, client_id: str, context_data: dict) -> bool:
+def update_session_context_tool(session_id: str, client_id: str, context_data: dict,
+                                base_context: dict = None, expected_version: int = None) -> int:
     """
     Actualiza el SessionContext global en el ADK State con nuevos datos.
     En un entorno ADK real, esto se haría manejando el ADK State directamente
     o a través de un servicio de estado.
+    Sólo se escribe un parche con los campos que cambiaron (no el contexto completo),
+    sobre el almacén versionado de contextos de sesión.
     Args:
         session_id: ID de la sesión.
         client_id: ID del cliente.
         context_data: Diccionario con los datos a actualizar en el SessionContext.
+        base_context: Contexto del que partió el turno; el parche son los cambios respecto
+            de él. Sin base, el parche se calcula contra el estado guardado.
+        expected_version: Versión leída al empezar el turno. Si otro escritor cambió la
+            sesión después, el parche se rebasa sobre la versión actual sólo si el otro
+            escritor no tocó las mismas rutas (con base_context); si no, VersionConflict.
     Returns:
-        True si la actualización fue exitosa.
+        La versión nueva del contexto de la sesión.
+    Raises:
+        VersionConflict: otro escritor cambió los mismos campos desde expected_version.
     """
-    print(f"DEBUG: Llamada a update_session_context_tool para sesión {session_id}, cliente {client_id} con datos: {json.dumps(context_data, default=str)}")
-    # TODO: Implementar la lógica real para actualizar el ADK State (Paso 4/5)
-    # Aquí solo simulamos la acción.
-    return True
+    store = get_context_store()
+    try:
+        if base_context is None:
+            version, patch = store.write(session_id, context_data, expected_version)
+        else:
+            patch = diff_context(base_context, context_data)
+            try:
+                version = store.patch(session_id, patch, expected_version)
+            except VersionConflict as e:
+                version = store.rebase(session_id, base_context, patch, expected_version)
+                log.info("%s; parche rebasado sobre la versión actual (rutas sin cruce)", e,
+                         evento="parche_rebasado", session_id=session_id)
+    except VersionConflict as e:
+        log.warning("Conflicto de versión: %s", e, evento="conflicto_version", session_id=session_id)
+        raise
+    log.debug("Contexto de sesión %s (cliente %s): versión %d, %d cambios en %s", session_id, client_id, version,
+              len(patch), lambda: [op["path"] for op in patch], evento="contexto_actualizado")
+    # TODO: Implementar la lógica real para actualizar el ADK State (Paso 4/5) aplicando el parche
+    return version
 
 def log_dt_finding_tool(session_id: str, client_id: str, finding_type: str, description: str, tags: list = None) -> bool:
     """
@@ -85,8 +166,29 @@ class DtAgent(LlmAgent):
         """
         print(f"\\n[DT_AGENT]: Iniciando contexto para cliente {client_id}, sesión {session_id}...")
         
-        # 1. Recuperar datos del cliente (simulando tool call)
-        client_data = retrieve_client_data_tool(client_id)
+        # 1. Lecturas de arranque en paralelo (cliente, último resumen, pautas y
+        #    especialidades), cada una con su plazo: el primer turno espera a la más lenta,
+        #    no a la suma. Las que no llegan a tiempo arrancan con su valor por defecto.
+        # La sesión queda asociada al cliente para que update_session_summary invalide su caché
+        get_client_data_cache().register_session(session_id, client_id)
+        warmup, meta = warm_up({
+            "cliente": lambda: retrieve_client_data_tool(client_id),
+            "resumen_ultima_sesion": lambda: retrieve_last_session_summary_tool(client_id),
+            "pautas": lambda: retrieve_pautas_tool(client_id),
+            "especialidades": lambda: retrieve_especialidades_tool(client_id),
+        }, deadlines=WARMUP_DEADLINES, defaults=_warmup_defaults())
+        log.info("Lecturas de arranque en %s ms: %s", meta["total_ms"], meta["estado"],
+                 evento="arranque", total_ms=meta["total_ms"])
+        parciales = degraded(meta)
+        if parciales:
+            log_dt_finding_tool(session_id, client_id, "arranque_parcial",
+                                f"Lecturas de arranque con valor por defecto: {parciales}",
+                                tags=["arranque", "revisar_latencia"])
+        client_data = warmup["cliente"]
+        especialidades = warmup["especialidades"]
+        criterios = {"foco": "rapport", "objetivo_inicial": "identificar_tema_principal"}
+        if warmup["resumen_ultima_sesion"]:
+            criterios["resumen_ultima_sesion"] = warmup["resumen_ultima_sesion"]
 
         # 2. Asegurar que Context Caching esté poblado (placeholder)
         print("[DT_AGENT]: Asegurando que Context Caching esté poblado (lógica placeholder)...")
@@ -100,19 +202,22 @@ class DtAgent(LlmAgent):
             modo_asistencia="Integral",
             guion_dt="Exploración inicial del problema del cliente para establecer el acuerdo de sesión.",
             acuerdo_sesion=None,
-            criterios={"foco": "rapport", "objetivo_inicial": "identificar_tema_principal"},
-            pautas_priorizadas=["ICF-1.1_escucha_activa", "ICF-2.0_preg_abiertas"],
+            criterios=criterios,
+            pautas_priorizadas=warmup["pautas"],
             resumen_memoria_larga=client_data.get("resumen_memoria_larga"),
             interacciones_recientes=[{"actor": "cliente", "text": initial_input}],
+            # Las entidades del turno las completa zenda_agent con recall_entities; las
+            # activas del cliente llegan en client_data["entidades_iniciales"]
+            entidades_mencionadas=[],
             preferencias_usuario=client_data.get("preferencias", {}),
-            especialidad_principal="ICF",
-            especialidades_secundarias=["Ontología", "Gestalt"],
+            especialidad_principal=especialidades.get("principal"),
+            especialidades_secundarias=especialidades.get("secundarias", []),
             ciclo_rotativo_actual=None,
             think_tool_activado=False,
             motivo_tt=None
         )
         
-        update_session_context_tool(str(session_context.id_sesion), str(session_context.id_cliente), session_context.model_dump()) 
+        update_session_context_tool(str(session_context.id_sesion), str(session_context.id_cliente), session_context.model_dump(mode="json"))
         print("[DT_AGENT]: Contexto de sesión inicial preparado y actualizado.")
         
         return session_context
@@ -126,9 +231,18 @@ class DtAgent(LlmAgent):
         
         # Crear nuevo SessionContext modificado usando Pydantic
         new_session_context = current_session_context.model_copy(deep=True)
+        # Versión y estado de partida: al final del turno sólo se escribe lo que cambió
+        context_version = get_context_store().version(str(current_session_context.id_sesion))
+        base_context = current_session_context.model_dump(mode="json")
         
+        # Trayectoria emocional incremental (la actualiza Zenda en cada detección)
+        estado_emocional = new_session_context.estado_emocional()
+        escalada = bool(estado_emocional) and \
+            estado_emocional["tendencia"] >= TENDENCIA_ESCALADA and \
+            estado_emocional["carga_negativa"] >= CARGA_TT
+
         # --- Lógica de ejemplo de decisión del DT (simulando razonamiento LLM) ---
-        # 1. Detección de tema sensible o falla de memoria para activar Think Tool
+        # 1. Detección de tema sensible, escalada emocional o falla de memoria para activar Think Tool
         if "ansiedad" in user_input.lower() or "estrés" in user_input.lower() or \
            "miedo" in user_input.lower() or "depresion" in user_input.lower():
             new_session_context.think_tool_activado = True
@@ -143,6 +257,16 @@ class DtAgent(LlmAgent):
                     description=f"Tema sensible detectado ('{user_input}'). DT ajusta foco y activa TT.",
                     tags=["tema_sensible", "estrat_dt", "tt_activado"]
                 )
+        elif escalada:
+            new_session_context.think_tool_activado = True
+            new_session_context.motivo_tt = "S"
+            log_dt_finding_tool(
+                session_id=str(new_session_context.id_sesion),
+                client_id=str(new_session_context.id_cliente),
+                finding_type="escalada_emocional",
+                description=f"Carga negativa en aumento ({estado_emocional['carga_negativa']}, tendencia {estado_emocional['tendencia']}). DT activa TT.",
+                tags=["escalada_emocional", "estrat_dt", "tt_activado"]
+            )
         elif "olvidaste" in user_input.lower() or "no recuerdas" in user_input.lower():
             new_session_context.think_tool_activado = True
             new_session_context.motivo_tt = "F"
@@ -157,10 +281,40 @@ class DtAgent(LlmAgent):
             new_session_context.think_tool_activado = False
             new_session_context.motivo_tt = None
 
+        # 1b. Modo Urgente ante carga negativa sostenida; se vuelve al modo previo cuando baja
+        if estado_emocional:
+            sostenida = estado_emocional["estado"] in EMOCIONES_NEGATIVAS and \
+                estado_emocional["turnos_en_estado"] >= TURNOS_URGENTE and \
+                estado_emocional["carga_negativa"] >= CARGA_URGENTE
+            if sostenida and new_session_context.modo_asistencia != "Urgente":
+                new_session_context.criterios["modo_previo"] = new_session_context.modo_asistencia
+                new_session_context.modo_asistencia = "Urgente"
+                # Contactos de emergencia desde el índice de relaciones (vista precalculada, sin LLM)
+                contactos = emergency_contacts(str(new_session_context.id_cliente))
+                new_session_context.criterios["contactos_emergencia"] = contactos
+                log_dt_finding_tool(
+                    session_id=str(new_session_context.id_sesion),
+                    client_id=str(new_session_context.id_cliente),
+                    finding_type="modo_urgente",
+                    description=f"{estado_emocional['estado']} sostenida por {estado_emocional['turnos_en_estado']} turnos. DT pasa a modo Urgente ({len(contactos)} contactos de emergencia).",
+                    tags=["modo_urgente", "estrat_dt"]
+                )
+            elif new_session_context.modo_asistencia == "Urgente" and "modo_previo" in new_session_context.criterios and \
+                    estado_emocional["carga_negativa"] < CARGA_TT and estado_emocional["tendencia"] <= 0:
+                new_session_context.modo_asistencia = new_session_context.criterios.pop("modo_previo")
+                new_session_context.criterios.pop("contactos_emergencia", None)
+                log_dt_finding_tool(
+                    session_id=str(new_session_context.id_sesion),
+                    client_id=str(new_session_context.id_cliente),
+                    finding_type="fin_modo_urgente",
+                    description=f"Carga negativa en baja ({estado_emocional['carga_negativa']}). DT vuelve a modo {new_session_context.modo_asistencia}.",
+                    tags=["modo_urgente", "estrat_dt"]
+                )
+
         # 2. Avance de fase
         if (new_session_context.fase_actual == "Inicio_Sesion" and 
             "identificar_tema_principal" in new_session_context.criterios.get("objetivo_inicial", "") and 
-            len(new_session_context.interacciones_recientes) > 2):
+            len(new_session_context.ultimas_interacciones()) > 2):
             
             new_session_context.criterios["objetivo_inicial"] = "tema_identificado"
             new_session_context.fase_actual = "Desarrollo_Sesion"
@@ -180,7 +334,9 @@ class DtAgent(LlmAgent):
         else:
             new_session_context.pautas_priorizadas = []
 
-        update_session_context_tool(str(new_session_context.id_sesion), str(new_session_context.id_cliente), new_session_context.model_dump())
+        update_session_context_tool(str(new_session_context.id_sesion), str(new_session_context.id_cliente),
+                                    new_session_context.model_dump(mode="json"),
+                                    base_context=base_context, expected_version=context_version)
         print(f"[DT_AGENT]: Estrategia del turno decidida. TT activado: {new_session_context.think_tool_activado} (Motivo: {new_session_context.motivo_tt})")
         
         return new_session_context
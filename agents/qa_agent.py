@@ -4,6 +4,8 @@ from google.adk.agents.agent import AgentResult, GenerationResult
 from google.adk.function_tool import FunctionTool
 from core.utils.prompt_utils import read_prompt_file
 from schemas import SessionContext, BitacoraModel, SesionModel  # Importar modelos reales
+from core.bitacora import get_bitacora_query
+from core.session import close_session
 import json
 import uuid
 from typing import Optional, List, Dict, Any
@@ -11,28 +13,33 @@ from typing import Optional, List, Dict, Any
 # --- DEFINICIÓN DE FUNCTIONTOOLS (PLACEHOLDERS, SE IMPLEMENTARÁN EN PASOS POSTERIORES) ---
 # Estas son las herramientas que el Agente QA usará.
 
-def retrieve_bitacora_tool(session_id: str) -> List[dict]:
+# Columnas que QA necesita para auditar (evita traer content_raw / ids internos)
+QA_BITACORA_COLUMNS = ["created_at", "actor", "event_type", "content_text", "pautas_codigos", "status", "tags"]
+
+def retrieve_bitacora_tool(session_id: str, actores: Optional[List[str]] = None, tipos: Optional[List[str]] = None,
+                           desde: Optional[str] = None, hasta: Optional[str] = None, pauta: Optional[str] = None,
+                           columnas: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0) -> List[dict]:
     """
-    Recupera todas las entradas de la bitácora para una sesión específica.
+    Recupera entradas de la bitácora de una sesión, filtradas y paginadas en la base
+    (índice por session_id + created_at) en lugar de dejar el filtrado al prompt.
     Args:
         session_id: ID de la sesión.
+        actores: Filtra por actor (ej. ["cliente", "zenda"]).
+        tipos: Filtra por event_type (ej. ["msg", "emo"]).
+        desde / hasta: Rango de created_at (ISO).
+        pauta: Código de pauta aplicado.
+        columnas: Proyección de columnas (por defecto QA_BITACORA_COLUMNS).
+        limit / offset: Paginación.
     Returns:
         Una lista de diccionarios, cada uno representando una entrada de bitácora.
     """
     print(f"DEBUG: Llamada a retrieve_bitacora_tool para sesión: {session_id}")
-    # TODO: Implementar la lógica real para leer de la tabla bitacora (Paso 7)
-    # Simulación de datos de bitácora
-    return [
-        {"actor": "cliente", "tipo": "msg", "texto": "Hola, tengo un problema con mi jefe, me siento frustrado."},
-        {"actor": "zenda", "tipo": "msg", "texto": "Entiendo tu frustración. ¿Podrías contarme más sobre lo que está pasando?"},
-        {"actor": "memo", "tipo": "emo", "texto": "Emoción detectada: frustración"},
-        {"actor": "zenda", "tipo": "tec", "texto": "Se aplicó pauta ICF-1.1_escucha_activa", "guia": ["ICF-1.1_escucha_activa"]},
-        {"actor": "cliente", "tipo": "msg", "texto": "Sí, me siento agotado y a veces creo que no sirvo para esto."},
-        {"actor": "memo", "tipo": "op", "texto": "Oportunidad: Cliente menciona baja autoestima.", "status": "detectado"},
-        {"actor": "zenda", "tipo": "msg", "texto": "Parece que te sientes agotado y que hay dudas sobre tu valía. Es normal sentirse así en estas situaciones. ¿Podrías explorar un poco más esa sensación?"},
-        {"actor": "dt", "tipo": "tec", "texto": "DT ajusta estrategia: activar TT por tema sensible 'autoestima'.", "tt": "S"},
-        {"actor": "zenda", "tipo": "msg", "texto": "DEBUG TT AJUSTÓ: Explorando la valía personal..."}, # Simulando TT
-    ]
+    entradas = get_bitacora_query().find(
+        session_id=session_id, actors=actores, event_types=tipos, desde=desde, hasta=hasta,
+        pauta=pauta, columns=columnas or QA_BITACORA_COLUMNS, limit=limit, offset=offset,
+    )
+    # Sesión sin entradas: lista vacía (QA no debe auditar datos inventados)
+    return entradas
 
 def save_qa_report_tool(qa_report_data: dict) -> bool:
     """
@@ -85,6 +92,9 @@ class QaAgent(LlmAgent):
         Método principal para que el Agente QA realice una auditoría post-sesión.
         """
         print(f"\\n[QA_AGENT]: Iniciando auditoría para sesión {session_data.id_sesion}, cliente {session_data.id_cliente}...")
+        # La auditoría es post-sesión: se libera el estado en memoria de la sesión cerrada
+        # (ventana de contexto, contexto versionado, buffer de turnos, trayectoria emocional)
+        close_session(str(session_data.id_sesion))
         
         # 1. Recuperar Bitácora Completa
         bitacora_completa = retrieve_bitacora_tool(str(session_data.id_sesion))
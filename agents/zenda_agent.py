@@ -4,6 +4,11 @@ from google.adk.agents.agent import AgentResult, GenerationResult # Para AgentRe
 from google.adk.function_tool import FunctionTool
 from core.utils.prompt_utils import read_prompt_file
 from schemas import SessionContext  # Importar SessionContext real
+from tools.bitacora_tool import bitacora_function
+from tools.emotion_detection_tool import emotion_detection_function
+from core.session import update_emotion_trajectory, prompt_budget
+from core.entidades import recall_entities
+from core.utils.tool_events import get_tool_logger
 import json
 import uuid # Para generar IDs de sesión/cliente si es necesario en placeholders
 from typing import Optional, List, Dict, Any
@@ -26,9 +31,8 @@ def bitacora_tool(session_id: str, client_id: str, actor: str, tipo: str, texto:
     Returns:
         True si el registro fue exitoso.
     """
-    print(f"DEBUG: Llamada a bitacora_tool: Sesion={session_id}, Cliente={client_id}, Actor={actor}, Tipo={tipo}, Texto='{texto[:50]}...'")
-    # TODO: Implementar la lógica real para guardar en la tabla bitacora (Paso 7)
-    return True
+    # Delegar en la tool real: persiste en lote y alimenta el buffer de turnos de la sesión
+    return bitacora_function(session_id, client_id, actor, tipo, texto, guia=guia, tt=tt, canal=canal)
 
 def emotion_detection_tool(input_text: str, audio_bytes: bytes = None) -> dict:
     """
@@ -37,16 +41,12 @@ def emotion_detection_tool(input_text: str, audio_bytes: bytes = None) -> dict:
         input_text: Texto del mensaje del cliente.
         audio_bytes: Datos de audio (si la comunicación es por voz).
     Returns:
-        Un diccionario con la emoción detectada (ej. {"emocion": "frustracion", "nivel": "alto"}).
+        Un diccionario con la emoción detectada (ej. {"emocion": "frustracion", "nivel": "alto"}),
+        como emotion_detection_function.
     """
-    print(f"DEBUG: Llamada a emotion_detection_tool para texto: '{input_text[:50]}...'")
-    # TODO: Implementar la lógica real usando Gemini Multimodal (Paso 4)
-    # Simulación de detección
-    if "frustracion" in input_text.lower() or "agotado" in input_text.lower():
-        return {"emocion": "frustracion", "nivel": "alto"}
-    if "miedo" in input_text.lower() or "ansiedad" in input_text.lower():
-        return {"emocion": "ansiedad", "nivel": "medio"}
-    return {"emocion": "neutral", "nivel": "bajo"}
+    # Delegar en la tool real (léxico EmotionMatcher y prosodia si hay audio): la misma
+    # detección alimenta la trayectoria emocional que lee el DT
+    return emotion_detection_function(input_text, audio_bytes)
 
 def entidades_tool(session_id: str, client_id: str, action: str, entity_data: dict = None) -> dict:
     """
@@ -78,6 +78,12 @@ def save_context_info_tool(session_id: str, client_id: str, info_type: str, info
     # TODO: Implementar lógica real para guardar en entidades (Paso 4)
     return True
 
+# Presupuesto de tokens del prompt de cada turno (los turnos recientes y el resumen de la
+# sesión tienen el suyo en core.session.context_window; esto sólo se reporta)
+PRESUPUESTO_PROMPT = 6000
+
+log = get_tool_logger("ZENDA_AGENT")
+
 # --- Cargar el prompt del Agente Zenda ---
 try:
     zenda_prompt_content = read_prompt_file("zenda_system_prompt.md")
@@ -149,8 +155,12 @@ class ZendaAgent(LlmAgent):
         
         # --- 2.1. Recepción y Preparación del Contexto ---
         # Los datos ya vienen en session_context.
-        # Simulamos la detección de emoción y registro en bitácora.
+        # Detección de emoción y registro en bitácora.
         emocion_detectada = emotion_detection_tool(client_input)
+        # Trayectoria emocional de la sesión (O(1) por turno); el DT la lee en el próximo turno
+        update_emotion_trajectory(str(session_context.id_sesion), emocion_detectada)
+        # Entidades del cliente mencionadas en este input (una pasada por autómata, sin volcar todas al prompt)
+        session_context.entidades_mencionadas = recall_entities(str(session_context.id_cliente), client_input)
         # Esto debería actualizar SessionContext o una base de datos directamente
         bitacora_tool(str(session_context.id_sesion), str(session_context.id_cliente), "cliente", "msg", client_input, canal=session_context.preferencias_usuario.get("canal_comunicacion", "T"))
         bitacora_tool(str(session_context.id_sesion), str(session_context.id_cliente), "emo", "emo", f"Emoción detectada: {emocion_detectada}", guia=[emocion_detectada.get("emocion")])
@@ -161,7 +171,12 @@ class ZendaAgent(LlmAgent):
         
         # Aquí se traduciría el SessionContext a un formato que el prompt de Zenda pueda entender.
         # Ejemplo: "CONTEXTO DE SESION: ... Criterios: ... Modo: ... Historial: ... Interacciones Recientes: ..."
-        context_for_llm = f"""
+        # Turnos recientes dentro del presupuesto de tokens + resumen corrido de los anteriores:
+        # el prompt no crece con la duración de la sesión.
+        ventana = session_context.ventana_contexto()
+        secciones = {
+            "sistema": self.instruction,
+            "sesion": f"""
         # CONTEXTO DE SESIÓN ACTUAL:
         - ID Sesión: {session_context.id_sesion}
         - ID Cliente: {session_context.id_cliente}
@@ -172,15 +187,33 @@ class ZendaAgent(LlmAgent):
         - Criterios DT: {json.dumps(session_context.criterios)}
         - Pautas Priorizadas por DT: {session_context.pautas_priorizadas}
         - Preferencias Cliente: {json.dumps(session_context.preferencias_usuario)}
-        - Resumen Historial Larga: {session_context.resumen_memoria_larga if session_context.resumen_memoria_larga else 'No disponible.'}
-        - Interacciones Recientes: {json.dumps(session_context.interacciones_recientes, default=str)}
+        - Resumen Historial Larga: {session_context.resumen_memoria_larga if session_context.resumen_memoria_larga else 'No disponible.'}""",
+            "resumen_sesion": f"""
+        - Resumen de la Sesión (turnos anteriores): {ventana["resumen"] if ventana["resumen"] else 'Sin turnos anteriores.'}""",
+            "interacciones": f"""
+        - Interacciones Recientes: {json.dumps(ventana["turnos"], default=str, ensure_ascii=False)}""",
+            "entidades": f"""
+        - Entidades Mencionadas: {json.dumps(session_context.entidades_mencionadas, default=str, ensure_ascii=False) if session_context.entidades_mencionadas else 'Ninguna.'}
         - Especialidad Principal: {session_context.especialidad_principal}
         - Especialidades Secundarias: {session_context.especialidades_secundarias}
         - Ciclo Rotativo Actual: {session_context.ciclo_rotativo_actual if session_context.ciclo_rotativo_actual else 'N/A'}
-        
+        """,
+            "input": f"""
         # INPUT DEL CLIENTE PARA ESTE TURNO:
         {client_input}
-        """
+        """,
+        }
+        context_for_llm = "".join(texto for nombre, texto in secciones.items() if nombre != "sistema")
+
+        # Reparto del presupuesto por sección (MetricsSink suma los tokens_* para seguir el costo)
+        reparto = prompt_budget(secciones, PRESUPUESTO_PROMPT)
+        log.info("Prompt de %d tokens (presupuesto %d)", reparto["total"], PRESUPUESTO_PROMPT,
+                 evento="presupuesto_prompt", session_id=str(session_context.id_sesion),
+                 tokens_total=reparto["total"], turnos_plegados=ventana["plegados"],
+                 **{f"tokens_{nombre}": tokens for nombre, tokens in reparto["secciones"].items()})
+        if reparto["excedido"]:
+            log.warning("Prompt excede el presupuesto: %s", reparto["secciones"], evento="presupuesto_excedido",
+                        session_id=str(session_context.id_sesion))
 
         # La llamada real al LLM se haría dentro de la lógica del AgentBuilder
         # Aquí simulamos la respuesta del LLM de Zenda basándonos en el prompt y contexto.
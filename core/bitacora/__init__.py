@@ -0,0 +1,8 @@
+# Zenda - core/bitacora/__init__.py
+
+from .sinks import BitacoraSink, SQLiteBitacoraSink, SupabaseBitacoraSink
+from .wal import BitacoraWAL
+from .writer import BitacoraWriter, BitacoraBackpressureError, get_bitacora_writer, set_bitacora_writer
+from .query import BitacoraQuery, SupabaseBitacoraQuery, get_bitacora_query
+from .archive import BitacoraArchive, write_archive, archive_session, scan_archives
+from .pubsub import BitacoraBus, BitacoraSubscription, get_bitacora_bus
@@ -0,0 +1,278 @@
+import json
+import os
+import struct
+import zlib
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Union
+
+_MAGIC = b"ZBCA\x01"
+_FOOTER_LEN = struct.Struct("<I")
+_EPOCH = datetime(1970, 1, 1)
+_NULL_INT = -(2 ** 63)
+
+ARCHIVE_SUFFIX = ".zbca"
+
+# Codificación por columna. session_id / user_id son constantes por archivo y van en el footer.
+_DICT_COLUMNS = ("actor", "event_type", "status")
+_TEXT_COLUMNS = ("invocation_id", "event_id", "content_text", "pautas_codigos", "tags")
+_JSON_COLUMNS = ("content_raw", "metadata")
+_INT_COLUMNS = ("id", "created_at")
+ARCHIVE_COLUMNS = ["id", "session_id", "user_id", "invocation_id", "event_id", "created_at", "actor",
+                   "event_type", "content_text", "content_raw", "pautas_codigos", "status", "tags", "metadata"]
+
+TimeBound = Optional[Union[datetime, str]]
+
+
+def _to_micros(value: Any) -> int:
+    if value is None:
+        return _NULL_INT
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value: int) -> Optional[str]:
+    if value == _NULL_INT:
+        return None
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _as_set(value: Optional[Union[str, Sequence[str]]]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    return {value} if isinstance(value, str) else set(value)
+
+
+# --- Codificadores de columna ---
+
+def _encode_ints(values: List[Any], convert=None) -> bytes:
+    data = array("q", (_NULL_INT if v is None else (convert(v) if convert else int(v)) for v in values))
+    return data.tobytes()
+
+
+def _encode_dict(values: List[Optional[str]]):
+    dictionary: List[str] = []
+    codes_by_value: Dict[str, int] = {}
+    codes = array("H")
+    for v in values:
+        if v is None:
+            codes.append(0xFFFF)
+            continue
+        code = codes_by_value.get(v)
+        if code is None:
+            code = codes_by_value[v] = len(dictionary)
+            dictionary.append(v)
+        codes.append(code)
+    return codes.tobytes(), dictionary
+
+
+def _encode_text(values: List[Optional[str]]) -> bytes:
+    offsets = array("I", [0])
+    nulls = bytearray()
+    blob = bytearray()
+    for v in values:
+        nulls.append(v is None)
+        if v is not None:
+            blob += v.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets.tobytes() + bytes(nulls) + bytes(blob)
+
+
+def _decode_text(raw: bytes, rows: int, indices: Sequence[int]) -> List[Optional[str]]:
+    offsets = array("I")
+    offsets.frombytes(raw[:4 * (rows + 1)])
+    nulls = raw[4 * (rows + 1):4 * (rows + 1) + rows]
+    blob = memoryview(raw)[4 * (rows + 1) + rows:]
+    return [None if nulls[i] else str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in indices]
+
+
+def write_archive(path: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Escribe las entradas de UNA sesión en un archivo columnar comprimido.
+    Devuelve el footer escrito (metadatos, diccionarios y estadísticas).
+    """
+    if not rows:
+        raise ValueError("No hay entradas para archivar")
+    session_id = str(rows[0]["session_id"])
+    user_id = str(rows[0]["user_id"])
+    if any(str(r["session_id"]) != session_id for r in rows):
+        raise ValueError("write_archive espera entradas de una sola sesión")
+
+    rows = sorted(rows, key=lambda r: _to_micros(r.get("created_at")))
+    created = [_to_micros(r.get("created_at")) for r in rows]
+    footer: Dict[str, Any] = {
+        "version": 1,
+        "session_id": session_id,
+        "user_id": user_id,
+        "rows": len(rows),
+        "min_created_at": created[0],
+        "max_created_at": created[-1],
+        "columns": {},
+    }
+
+    blocks: List[bytes] = []
+    offset = len(_MAGIC)
+
+    def add_block(name: str, raw: bytes, encoding: str, **extra):
+        nonlocal offset
+        compressed = zlib.compress(raw, 6)
+        footer["columns"][name] = {"encoding": encoding, "offset": offset, "length": len(compressed), **extra}
+        blocks.append(compressed)
+        offset += len(compressed)
+
+    add_block("id", _encode_ints([r.get("id") for r in rows]), "int64")
+    add_block("created_at", array("q", created).tobytes(), "int64_micros")
+    for name in _DICT_COLUMNS:
+        codes, dictionary = _encode_dict([r.get(name) for r in rows])
+        add_block(name, codes, "dict", dictionary=dictionary)
+    for name in _TEXT_COLUMNS:
+        add_block(name, _encode_text([r.get(name) for r in rows]), "text")
+    for name in _JSON_COLUMNS:
+        values = [r.get(name) for r in rows]
+        add_block(name, _encode_text([None if v is None else (v if isinstance(v, str) else json.dumps(v, default=str))
+                                      for v in values]), "json")
+
+    footer_raw = json.dumps(footer).encode("utf-8")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_MAGIC)
+        for block in blocks:
+            f.write(block)
+        f.write(footer_raw)
+        f.write(_FOOTER_LEN.pack(len(footer_raw)))
+        f.write(_MAGIC)
+    os.replace(tmp, path)
+    return footer
+
+
+class BitacoraArchive:
+    """
+    Lector de un archivo columnar de bitácora.
+
+    El footer (diccionarios y min/max de created_at) permite descartar el archivo
+    completo sin descomprimir nada; luego sólo se descomprimen las columnas de los
+    predicados y, para las filas que pasan, las columnas proyectadas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            f.seek(-(len(_MAGIC) + _FOOTER_LEN.size), os.SEEK_END)
+            (footer_len,) = _FOOTER_LEN.unpack(f.read(_FOOTER_LEN.size))
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"Archivo de bitácora inválido: {path}")
+            f.seek(-(len(_MAGIC) + _FOOTER_LEN.size + footer_len), os.SEEK_END)
+            self.footer = json.loads(f.read(footer_len))
+        self.rows = self.footer["rows"]
+
+    def _raw(self, name: str) -> bytes:
+        meta = self.footer["columns"][name]
+        with open(self.path, "rb") as f:
+            f.seek(meta["offset"])
+            return zlib.decompress(f.read(meta["length"]))
+
+    def _ints(self, name: str) -> array:
+        values = array("q")
+        values.frombytes(self._raw(name))
+        return values
+
+    def _codes(self, name: str) -> array:
+        codes = array("H")
+        codes.frombytes(self._raw(name))
+        return codes
+
+    def may_match(self, actors=None, event_types=None, statuses=None,
+                  desde: TimeBound = None, hasta: TimeBound = None) -> bool:
+        """Poda a nivel archivo usando sólo el footer."""
+        if desde is not None and self.footer["max_created_at"] < _to_micros(desde):
+            return False
+        if hasta is not None and self.footer["min_created_at"] > _to_micros(hasta):
+            return False
+        for name, wanted in (("actor", _as_set(actors)), ("event_type", _as_set(event_types)),
+                             ("status", _as_set(statuses))):
+            if wanted is not None and not wanted.intersection(self.footer["columns"][name]["dictionary"]):
+                return False
+        return True
+
+    def read(self, columns: Optional[Sequence[str]] = None, actors=None, event_types=None, statuses=None,
+             desde: TimeBound = None, hasta: TimeBound = None) -> List[Dict[str, Any]]:
+        """Devuelve las filas que cumplen los predicados, con la proyección pedida."""
+        columns = list(columns) if columns else list(ARCHIVE_COLUMNS)
+        invalid = [c for c in columns if c not in ARCHIVE_COLUMNS]
+        if invalid:
+            raise ValueError(f"Columnas de bitácora no válidas: {invalid}")
+        if not self.may_match(actors, event_types, statuses, desde, hasta):
+            return []
+
+        selected = range(self.rows)
+        for name, wanted in (("actor", _as_set(actors)), ("event_type", _as_set(event_types)),
+                             ("status", _as_set(statuses))):
+            if wanted is None:
+                continue
+            dictionary = self.footer["columns"][name]["dictionary"]
+            codes_wanted = {i for i, v in enumerate(dictionary) if v in wanted}
+            codes = self._codes(name)
+            selected = [i for i in selected if codes[i] in codes_wanted]
+        if desde is not None or hasta is not None:
+            created = self._ints("created_at")
+            lo = _to_micros(desde) if desde is not None else _NULL_INT + 1
+            hi = _to_micros(hasta) if hasta is not None else 2 ** 63 - 1
+            selected = [i for i in selected if lo <= created[i] <= hi]
+        if not selected:
+            return []
+
+        decoded: Dict[str, List[Any]] = {}
+        for name in columns:
+            if name in ("session_id", "user_id"):
+                decoded[name] = [self.footer[name]] * len(selected)
+            elif name == "id":
+                ids = self._ints(name)
+                decoded[name] = [None if ids[i] == _NULL_INT else ids[i] for i in selected]
+            elif name == "created_at":
+                created = self._ints(name)
+                decoded[name] = [_from_micros(created[i]) for i in selected]
+            elif name in _DICT_COLUMNS:
+                dictionary = self.footer["columns"][name]["dictionary"]
+                codes = self._codes(name)
+                decoded[name] = [None if codes[i] == 0xFFFF else dictionary[codes[i]] for i in selected]
+            else:
+                values = _decode_text(self._raw(name), self.rows, selected)
+                if name in _JSON_COLUMNS:
+                    values = [None if v is None else json.loads(v) for v in values]
+                decoded[name] = values
+        return [dict(zip(columns, values)) for values in zip(*(decoded[c] for c in columns))]
+
+
+def scan_archives(directory: str, columns: Optional[Sequence[str]] = None, **filters) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre todos los archivos de un directorio (p. ej. "todas las alertas del último mes"),
+    saltando por footer los que no pueden contener resultados.
+    """
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(ARCHIVE_SUFFIX):
+            continue
+        archive = BitacoraArchive(os.path.join(directory, name))
+        if archive.may_match(**filters):
+            yield from archive.read(columns, **filters)
+
+
+def archive_session(session_id: str, directory: Optional[str] = None, query=None) -> Optional[str]:
+    """
+    Archiva la bitácora de una sesión cerrada en formato columnar.
+    Devuelve la ruta del archivo, o None si la sesión no tiene entradas.
+    """
+    if query is None:
+        from core.bitacora.query import get_bitacora_query
+        query = get_bitacora_query()
+    if directory is None:
+        directory = os.path.join(os.getenv("ZENDA_DATA_DIR", "data"), "bitacora_archivo")
+    rows = query.find(session_id=str(session_id))
+    if not rows:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{session_id}{ARCHIVE_SUFFIX}")
+    write_archive(path, rows)
+    return path
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Set, Union
+
+
+def _as_set(value: Optional[Union[str, Sequence[str]]]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    return {value} if isinstance(value, str) else set(value)
+
+
+class BitacoraSubscription:
+    """
+    Suscripción a las entradas de bitácora que se van registrando.
+    Se consume con `async for entry in sub`. El buffer es acotado: si el consumidor
+    se atrasa se descartan las entradas más viejas y se cuentan en `descartadas`.
+    """
+
+    def __init__(self, bus: "BitacoraBus", loop: asyncio.AbstractEventLoop, maxsize: int,
+                 session_id: Optional[str], actors: Optional[Set[str]], event_types: Optional[Set[str]]):
+        self._bus = bus
+        self._loop = loop
+        self._buffer: deque = deque()
+        self._maxsize = maxsize
+        self._lock = threading.Lock()
+        self._event = asyncio.Event()
+        self._closed = False
+        self.session_id = None if session_id is None else str(session_id)
+        self.actors = actors
+        self.event_types = event_types
+        self.recibidas = 0
+        self.entregadas = 0
+        self.descartadas = 0
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        if self.session_id is not None and str(entry.get("session_id")) != self.session_id:
+            return False
+        if self.actors is not None and entry.get("actor") not in self.actors:
+            return False
+        if self.event_types is not None and entry.get("event_type") not in self.event_types:
+            return False
+        return True
+
+    def _push(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            if len(self._buffer) >= self._maxsize:
+                self._buffer.popleft()
+                self.descartadas += 1
+            self._buffer.append(entry)
+            self.recibidas += 1
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass  # loop ya cerrado
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._buffer)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de la suscripción; lag = pendientes en buffer + descartadas."""
+        with self._lock:
+            return {
+                "recibidas": self.recibidas,
+                "entregadas": self.entregadas,
+                "descartadas": self.descartadas,
+                "pendientes": len(self._buffer),
+                "lag": len(self._buffer) + self.descartadas,
+            }
+
+    def get_nowait(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._buffer:
+                return None
+            self.entregadas += 1
+            return self._buffer.popleft()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._bus._remove(self)
+        self._wake()
+
+    def __aiter__(self) -> "BitacoraSubscription":
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        while True:
+            entry = self.get_nowait()
+            if entry is not None:
+                return entry
+            if self._closed:
+                raise StopAsyncIteration
+            self._event.clear()
+            if self._buffer or self._closed:
+                continue
+            await self._event.wait()
+
+
+class BitacoraBus:
+    """Pub/sub en proceso sobre las entradas que se agregan a la bitácora."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: List[BitacoraSubscription] = []
+        self.publicadas = 0
+
+    def subscribe(self, session_id: Optional[str] = None,
+                  actors: Optional[Union[str, Sequence[str]]] = None,
+                  event_types: Optional[Union[str, Sequence[str]]] = None,
+                  maxsize: int = 256, loop: Optional[asyncio.AbstractEventLoop] = None) -> BitacoraSubscription:
+        """Crea una suscripción filtrada. Debe llamarse desde el loop que la va a consumir."""
+        sub = BitacoraSubscription(self, loop or asyncio.get_running_loop(), maxsize,
+                                   session_id, _as_set(actors), _as_set(event_types))
+        with self._lock:
+            self._subs = self._subs + [sub]
+        return sub
+
+    def publish(self, entry: Dict[str, Any]) -> int:
+        """Entrega la entrada a las suscripciones que la aceptan. No bloquea nunca."""
+        with self._lock:
+            self.publicadas += 1
+            subs = self._subs
+        delivered = 0
+        for sub in subs:
+            if sub.matches(entry):
+                sub._push(entry)
+                delivered += 1
+        return delivered
+
+    def _remove(self, sub: BitacoraSubscription) -> None:
+        with self._lock:
+            self._subs = [s for s in self._subs if s is not sub]
+
+    @property
+    def suscripciones(self) -> int:
+        return len(self._subs)
+
+
+_bus = BitacoraBus()
+
+
+def get_bitacora_bus() -> BitacoraBus:
+    return _bus
@@ -0,0 +1,173 @@
+import json
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.bitacora.sinks import BITACORA_COLUMNS, SQLiteBitacoraSink, SupabaseBitacoraSink
+from core.repositorios import fetch_all
+
+QUERY_COLUMNS = ["id"] + BITACORA_COLUMNS
+_JSON_COLUMNS = ("content_raw", "metadata")
+
+# Índices equivalentes para la tabla de Supabase (aplicar como migración)
+SUPABASE_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS ix_bitacora_session_created ON bitacora (session_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_bitacora_user_created ON bitacora (user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_bitacora_event_type ON bitacora (event_type, created_at);
+"""
+
+TimeBound = Optional[Union[datetime, str]]
+
+
+def _as_list(value: Optional[Union[str, Sequence[str]]]) -> Optional[List[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def _as_iso(value: TimeBound) -> Optional[str]:
+    if value is None:
+        return None
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _projection(columns: Optional[Sequence[str]]) -> List[str]:
+    if not columns:
+        return list(QUERY_COLUMNS)
+    invalid = [c for c in columns if c not in QUERY_COLUMNS]
+    if invalid:
+        raise ValueError(f"Columnas de bitácora no válidas: {invalid}")
+    return list(columns)
+
+
+class BitacoraQuery:
+    """
+    Capa de consulta de la bitácora sobre SQLite.
+
+    Todas las consultas filtran primero por un prefijo indexado
+    ((session_id, created_at), (user_id, created_at) o (event_type, created_at)),
+    de modo que QA y DT leen sólo el tramo que necesitan en vez de la sesión completa.
+    """
+
+    def __init__(self, sink: SQLiteBitacoraSink):
+        self.sink = sink
+
+    def find(self, session_id: Optional[str] = None, user_id: Optional[str] = None,
+             actors: Optional[Union[str, Sequence[str]]] = None,
+             event_types: Optional[Union[str, Sequence[str]]] = None,
+             desde: TimeBound = None, hasta: TimeBound = None,
+             pauta: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+             descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Devuelve las entradas que cumplen los filtros, ordenadas por created_at.
+
+        Args:
+            session_id / user_id: filtran por sesión o cliente
+            actors / event_types: uno o varios valores
+            desde / hasta: rango de created_at (incluye extremos)
+            pauta: código de pauta contenido en pautas_codigos
+            columns: proyección (por defecto todas las columnas)
+            descending, limit, offset: orden y paginación
+        """
+        cols = _projection(columns)
+        where, params = self._where(session_id, user_id, actors, event_types, desde, hasta, pauta)
+        order = "DESC" if descending else "ASC"
+        sql = f"SELECT {', '.join(cols)} FROM bitacora{where} ORDER BY created_at {order}, id {order}"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += (-1 if limit is None else limit, offset)
+        return [self._decode(cols, row) for row in self.sink.query(sql, params)]
+
+    def count(self, session_id: Optional[str] = None, user_id: Optional[str] = None,
+              actors: Optional[Union[str, Sequence[str]]] = None,
+              event_types: Optional[Union[str, Sequence[str]]] = None,
+              desde: TimeBound = None, hasta: TimeBound = None, pauta: Optional[str] = None) -> int:
+        where, params = self._where(session_id, user_id, actors, event_types, desde, hasta, pauta)
+        return self.sink.query(f"SELECT COUNT(*) FROM bitacora{where}", params)[0][0]
+
+    @staticmethod
+    def _where(session_id, user_id, actors, event_types, desde, hasta, pauta) -> Tuple[str, tuple]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(str(session_id))
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(str(user_id))
+        for column, values in (("actor", _as_list(actors)), ("event_type", _as_list(event_types))):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+                params.extend(values)
+        if desde is not None:
+            clauses.append("created_at >= ?")
+            params.append(_as_iso(desde))
+        if hasta is not None:
+            clauses.append("created_at <= ?")
+            params.append(_as_iso(hasta))
+        if pauta:
+            # Código exacto dentro de la lista separada por comas (instr: sin comodines de LIKE)
+            clauses.append("instr(',' || pautas_codigos || ',', ?) > 0")
+            params.append(f",{pauta},")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    @staticmethod
+    def _decode(columns: List[str], row: tuple) -> Dict[str, Any]:
+        entry = dict(zip(columns, row))
+        for col in _JSON_COLUMNS:
+            if entry.get(col) is not None:
+                entry[col] = json.loads(entry[col])
+        return entry
+
+
+class SupabaseBitacoraQuery:
+    """Misma interfaz que BitacoraQuery, traducida a filtros PostgREST de Supabase."""
+
+    def __init__(self, sink: SupabaseBitacoraSink):
+        self.sink = sink
+
+    def find(self, session_id: Optional[str] = None, user_id: Optional[str] = None,
+             actors=None, event_types=None, desde: TimeBound = None, hasta: TimeBound = None,
+             pauta: Optional[str] = None, columns: Optional[Sequence[str]] = None,
+             descending: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        def build() -> Any:
+            q = self.sink.client.table(self.sink.table).select(",".join(_projection(columns)))
+            if session_id is not None:
+                q = q.eq("session_id", str(session_id))
+            if user_id is not None:
+                q = q.eq("user_id", str(user_id))
+            if _as_list(actors):
+                q = q.in_("actor", _as_list(actors))
+            if _as_list(event_types):
+                q = q.in_("event_type", _as_list(event_types))
+            if desde is not None:
+                q = q.gte("created_at", _as_iso(desde))
+            if hasta is not None:
+                q = q.lte("created_at", _as_iso(hasta))
+            if pauta:
+                # Mismo criterio que SQLite: el código exacto entre comas (o en un extremo)
+                q = q.filter("pautas_codigos", "match", f"(^|,){re.escape(pauta)}(,|$)")
+            return q.order("created_at", desc=descending).order("id", desc=descending)
+
+        if limit is not None:
+            return build().range(offset, offset + limit - 1).execute().data
+        # Sin limit: desde offset hasta el final, de a páginas (PostgREST corta en max-rows)
+        return list(fetch_all(build, start=offset))
+
+
+def get_bitacora_query(consistente: bool = True):
+    """
+    Devuelve la capa de consulta sobre el sink del escritor compartido.
+    Con consistente=True vuelca antes lo encolado, para leer también los eventos recientes.
+    """
+    from core.bitacora.writer import get_bitacora_writer
+
+    writer = get_bitacora_writer()
+    if consistente:
+        writer.flush(timeout=5)
+    if isinstance(writer.sink, SupabaseBitacoraSink):
+        return SupabaseBitacoraQuery(writer.sink)
+    return BitacoraQuery(writer.sink)
@@ -0,0 +1,148 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+# Columnas de la tabla bitacora (mismo orden que BitacoraModel, sin el id autoincremental)
+BITACORA_COLUMNS = [
+    "session_id", "user_id", "invocation_id", "event_id", "created_at", "actor",
+    "event_type", "content_text", "content_raw", "pautas_codigos", "status", "tags", "metadata",
+]
+
+_JSON_COLUMNS = ("content_raw", "metadata")
+
+_SQLITE_DDL = """
+CREATE TABLE IF NOT EXISTS bitacora (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    invocation_id TEXT,
+    event_id TEXT,
+    created_at TEXT NOT NULL,
+    actor TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    content_text TEXT,
+    content_raw TEXT,
+    pautas_codigos TEXT,
+    status TEXT NOT NULL,
+    tags TEXT,
+    metadata TEXT
+)
+"""
+
+# event_id único: reproducir el WAL después de una caída no duplica eventos.
+# El resto son los índices de lectura que usa core.bitacora.query (QA / DT).
+_SQLITE_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_bitacora_event_id ON bitacora (event_id)",
+    "CREATE INDEX IF NOT EXISTS ix_bitacora_session_created ON bitacora (session_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_bitacora_user_created ON bitacora (user_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_bitacora_event_type ON bitacora (event_type, created_at)",
+]
+
+
+def row_to_dict(row: Any) -> Dict[str, Any]:
+    """Acepta un BitacoraModel o un dict y devuelve un dict plano."""
+    if hasattr(row, "model_dump"):
+        return row.model_dump()
+    return dict(row)
+
+
+def _to_db_value(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if column in _JSON_COLUMNS:
+        return json.dumps(value, default=str)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+class BitacoraSink(ABC):
+    """
+    Destino de escritura en lote para la bitácora.
+    Las implementaciones reciben filas ya normalizadas como dict.
+    """
+
+    @abstractmethod
+    def write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBitacoraSink(BitacoraSink):
+    """
+    Sink local sobre SQLite. Stand-in de Supabase para desarrollo y pruebas offline.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(_SQLITE_DDL)
+        for ddl in _SQLITE_INDEXES:
+            self._conn.execute(ddl)
+        self._conn.commit()
+        self._insert_sql = (
+            f"INSERT OR IGNORE INTO bitacora ({', '.join(BITACORA_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in BITACORA_COLUMNS)})"
+        )
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        params = [
+            tuple(_to_db_value(col, row.get(col)) for col in BITACORA_COLUMNS)
+            for row in rows
+        ]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(self._insert_sql, params)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM bitacora").fetchone()[0]
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Ejecuta una consulta de lectura sobre la misma conexión del sink."""
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SupabaseBitacoraSink(BitacoraSink):
+    """
+    Sink de producción: un único insert masivo por lote en la tabla 'bitacora' de Supabase.
+    Usa upsert sobre event_id para que la reproducción del WAL sea idempotente.
+    """
+
+    def __init__(self, client: Optional[Any] = None, table: str = "bitacora"):
+        if client is None:
+            # El mismo cliente (y sesión HTTP) que los repositorios de core.repositorios
+            from core.repositorios.supabase_backend import get_supabase_client
+            client = get_supabase_client()
+        self._client = client
+        self.table = table
+
+    @property
+    def client(self) -> Any:
+        """Cliente Supabase del sink (lo reutiliza la capa de consulta)."""
+        return self._client
+
+    def write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        payload = [
+            {col: (row.get(col) if col in _JSON_COLUMNS else _to_db_value(col, row.get(col)))
+             for col in BITACORA_COLUMNS}
+            for row in rows
+        ]
+        self._client.table(self.table).upsert(payload, on_conflict="event_id", ignore_duplicates=True).execute()
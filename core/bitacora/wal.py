@@ -0,0 +1,171 @@
+import json
+import os
+import threading
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from core.bitacora.sinks import BitacoraSink
+
+_SEGMENT_SUFFIX = ".wal"
+_ACK_FILE = "ACK"
+
+
+class BitacoraWAL:
+    """
+    Write-ahead log local de la bitácora, en segmentos append-only.
+
+    Cada registro es una línea "lsn<TAB>crc32<TAB>json". El fsync se agrupa:
+    se hace cada fsync_every registros o cuando el escritor llama a sync()
+    antes de volcar un lote. ack(lsn) marca como confirmado todo lo <= lsn y
+    borra los segmentos que quedaron completamente confirmados.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int = 4 * 1024 * 1024, fsync_every: int = 32):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_every = fsync_every
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path: Optional[str] = None
+        self._pending_sync = 0
+        self.acked_lsn = self._read_ack()
+        self._last_lsn = max(self.acked_lsn, self._scan_last_lsn())
+
+    # --- Escritura ---
+
+    def append(self, row: Dict[str, Any]) -> int:
+        payload = json.dumps(row, default=str, ensure_ascii=False)
+        with self._lock:
+            self._last_lsn += 1
+            lsn = self._last_lsn
+            if self._file is None or self._file.tell() >= self.segment_max_bytes:
+                self._rotate(lsn)
+            crc = zlib.crc32(payload.encode("utf-8"))
+            self._file.write(f"{lsn}\t{crc}\t{payload}\n".encode("utf-8"))
+            self._file.flush()
+            self._pending_sync += 1
+            if self._pending_sync >= self.fsync_every:
+                self._fsync()
+            return lsn
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._pending_sync:
+                self._fsync()
+
+    def ack(self, lsn: int) -> None:
+        """Confirma todo lo escrito hasta lsn y trunca los segmentos ya confirmados."""
+        with self._lock:
+            if lsn <= self.acked_lsn:
+                return
+            self.acked_lsn = lsn
+            self._write_ack(lsn)
+            segments = self._segments()
+            for i, (_, path) in enumerate(segments):
+                last_in_segment = segments[i + 1][0] - 1 if i + 1 < len(segments) else self._last_lsn
+                if last_in_segment > lsn:
+                    break
+                if path == self._file_path:
+                    self._close_current()
+                os.remove(path)
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_current()
+
+    # --- Recuperación ---
+
+    def pending(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Itera los registros válidos no confirmados, en orden de lsn."""
+        for _, path in self._segments():
+            for lsn, row in self._read_segment(path):
+                if lsn > self.acked_lsn:
+                    yield lsn, row
+
+    def recover(self, sink: BitacoraSink, batch_size: int = 500, upto: Optional[int] = None) -> int:
+        """
+        Reproduce en el sink los registros no confirmados (p. ej. tras una caída del proceso)
+        y los confirma. Con upto, sólo hasta ese lsn (lo posterior puede seguir encolado
+        en el escritor). Devuelve la cantidad de registros reproducidos.
+        """
+        replayed = 0
+        batch: List[Dict[str, Any]] = []
+        last_lsn = self.acked_lsn
+        for lsn, row in self.pending():
+            if upto is not None and lsn > upto:
+                break
+            batch.append(row)
+            last_lsn = lsn
+            if len(batch) >= batch_size:
+                sink.write_batch(batch)
+                self.ack(last_lsn)
+                replayed += len(batch)
+                batch = []
+        if batch:
+            sink.write_batch(batch)
+            replayed += len(batch)
+        self.ack(max(last_lsn, self._last_lsn) if upto is None else upto)
+        return replayed
+
+    # --- Internos ---
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.endswith(_SEGMENT_SUFFIX):
+                segments.append((int(name[:-len(_SEGMENT_SUFFIX)]), os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    @staticmethod
+    def _read_segment(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        with open(path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # cola truncada por una caída a mitad de escritura
+                try:
+                    lsn_s, crc_s, payload = raw[:-1].split(b"\t", 2)
+                    if zlib.crc32(payload) != int(crc_s):
+                        break
+                    yield int(lsn_s), json.loads(payload)
+                except ValueError:
+                    break
+
+    def _scan_last_lsn(self) -> int:
+        last = 0
+        for _, path in self._segments():
+            for lsn, _ in self._read_segment(path):
+                last = max(last, lsn)
+        return last
+
+    def _rotate(self, first_lsn: int) -> None:
+        self._close_current()
+        self._file_path = os.path.join(self.directory, f"{first_lsn:020d}{_SEGMENT_SUFFIX}")
+        self._file = open(self._file_path, "ab")
+
+    def _close_current(self) -> None:
+        if self._file is not None:
+            if self._pending_sync:
+                self._fsync()
+            self._file.close()
+            self._file = None
+            self._file_path = None
+
+    def _fsync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._pending_sync = 0
+
+    def _read_ack(self) -> int:
+        try:
+            with open(os.path.join(self.directory, _ACK_FILE), "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_ack(self, lsn: int) -> None:
+        tmp = os.path.join(self.directory, _ACK_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            f.write(str(lsn))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.directory, _ACK_FILE))
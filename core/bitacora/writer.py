@@ -0,0 +1,295 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.bitacora.sinks import BitacoraSink, SQLiteBitacoraSink, SupabaseBitacoraSink, row_to_dict
+from core.bitacora.wal import BitacoraWAL
+from core.utils.tool_events import get_tool_logger
+
+log = get_tool_logger("BITACORA_WRITER")
+
+# Centinelas de control para el hilo escritor
+_FLUSH = object()
+_STOP = object()
+
+
+class BitacoraBackpressureError(RuntimeError):
+    """La cola de la bitácora sigue llena después del tiempo de espera."""
+
+
+class BitacoraWriter:
+    """
+    Escritor asíncrono de la bitácora.
+    Encola filas (BitacoraModel o dict) y las vuelca en lote al sink cuando se alcanza
+    batch_size o pasa flush_interval segundos. La cola es acotada: si se llena,
+    submit() bloquea hasta put_timeout y luego lanza BitacoraBackpressureError
+    (antes de tocar el WAL: una fila rechazada no se reproduce después).
+
+    Con un BitacoraWAL, cada fila se escribe primero en el log local y se confirma
+    (ack) recién cuando su lote llegó al sink; lo no confirmado se reproduce con
+    wal.recover() al arrancar. El lsn se asigna y la fila se encola bajo el mismo
+    lock, así la cola sigue el orden del WAL y confirmar el último lsn de un lote
+    no confirma filas que siguen encoladas. Si un lote se descarta, los acks se
+    suspenden hasta el próximo volcado exitoso, que reproduce desde el WAL todo
+    lo pendiente hasta su último lsn (los sinks ignoran event_id repetidos).
+    """
+
+    def __init__(self, sink: BitacoraSink, batch_size: int = 50, flush_interval: float = 0.5,
+                 max_queue: int = 1000, put_timeout: float = 1.0, max_retries: int = 3,
+                 wal: Optional[BitacoraWAL] = None):
+        self.sink = sink
+        self.wal = wal
+        # Con un lote descartado no se confirma nada hasta reproducirlo desde el WAL
+        self._ack_bloqueado = False
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        # La capacidad la acota _slots (filas encoladas); los centinelas de control no ocupan lugar
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._slots = threading.Semaphore(max_queue)
+        self._submit_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "encoladas": 0,
+            "escritas": 0,
+            "descartadas": 0,
+            "lotes": 0,
+            "errores_flush": 0,
+            "esperas_backpressure": 0,
+            "rechazos_backpressure": 0,
+            "profundidad_max": 0,
+            "flush_ms_ultimo": 0.0,
+            "flush_ms_max": 0.0,
+            "flush_ms_total": 0.0,
+        }
+
+    # --- API pública ---
+
+    def start(self) -> "BitacoraWriter":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="bitacora-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, row: Any) -> None:
+        """Encola una fila y vuelve de inmediato (salvo backpressure)."""
+        if self._closed:
+            raise RuntimeError("BitacoraWriter cerrado")
+        row = row_to_dict(row)
+        if not self._slots.acquire(blocking=False):
+            self._bump("esperas_backpressure")
+            if not self._slots.acquire(timeout=self.put_timeout):
+                self._bump("rechazos_backpressure")
+                raise BitacoraBackpressureError(
+                    f"Cola de bitácora llena ({self.max_queue}) tras {self.put_timeout}s"
+                )
+        try:
+            with self._submit_lock:
+                lsn = self.wal.append(row) if self.wal is not None else 0
+                self._queue.put_nowait((lsn, row))
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._stats_lock:
+            self._stats["encoladas"] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats["profundidad_max"]:
+                self._stats["profundidad_max"] = depth
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Fuerza el volcado de todo lo encolado y espera a que termine."""
+        if self._thread is None or not self._thread.is_alive():
+            self._drain_inline()
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Vuelca lo pendiente y detiene el hilo. Se registra en atexit."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive():
+            # El hilo cierra WAL y sink al terminar de volcar: si vence el plazo no se
+            # cierran debajo de un volcado en curso
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                log.warning("Cierre incompleto: el hilo sigue volcando tras %ss; WAL y sink se cierran al terminar",
+                            timeout, evento="cierre_incompleto", pendientes=self._queue.qsize())
+            return
+        self._drain_inline()
+        self._close_resources()
+
+    def _close_resources(self) -> None:
+        if self.wal is not None:
+            self.wal.close()
+        self.sink.close()
+
+    def block_acks(self) -> None:
+        """Suspende los acks hasta el próximo volcado exitoso (p. ej. si falló wal.recover al arrancar)."""
+        self._ack_bloqueado = True
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lotes = stats["lotes"]
+        stats["profundidad_cola"] = self._queue.qsize()
+        stats["flush_ms_promedio"] = stats["flush_ms_total"] / lotes if lotes else 0.0
+        return stats
+
+    # --- Internos ---
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def _run(self) -> None:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(batch)
+                self._drain_inline()
+                self._close_resources()
+                return
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                self._write(batch)
+                batch, deadline = [], None
+                item[1].set()
+                continue
+            if item is not None:
+                self._slots.release()
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._write(batch)
+                batch, deadline = [], None
+
+    def _drain_inline(self) -> None:
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, tuple) and item[0] is _FLUSH:
+                item[1].set()
+            elif item is not _STOP:
+                self._slots.release()
+                batch.append(item)
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        self._write(batch)
+
+    def _write(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        if not batch:
+            return
+        if self.wal is not None:
+            self.wal.sync()
+        rows = [row for _, row in batch]
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self.sink.write_batch(rows)
+            except Exception:
+                self._bump("errores_flush")
+                if attempt < self.max_retries:
+                    time.sleep(min(0.05 * (2 ** attempt), 1.0))
+                    continue
+                self._bump("descartadas", len(batch))
+                self._ack_bloqueado = True
+                return
+            if self.wal is not None:
+                self._ack(batch[-1][0])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._stats_lock:
+                self._stats["escritas"] += len(batch)
+                self._stats["lotes"] += 1
+                self._stats["flush_ms_ultimo"] = elapsed_ms
+                self._stats["flush_ms_total"] += elapsed_ms
+                if elapsed_ms > self._stats["flush_ms_max"]:
+                    self._stats["flush_ms_max"] = elapsed_ms
+            return
+
+    def _ack(self, lsn: int) -> None:
+        if not self._ack_bloqueado:
+            self.wal.ack(lsn)
+            return
+        # El sink volvió: reproducir desde el WAL lo pendiente hasta este lote (incluye lo descartado)
+        try:
+            replayed = self.wal.recover(self.sink, upto=lsn)
+        except Exception as e:
+            self._bump("errores_flush")
+            log.warning("No se pudo reproducir el WAL de la bitácora: %s", e, evento="wal_reproduccion_fallida")
+            return
+        self._ack_bloqueado = False
+        log.info("WAL de la bitácora reproducido: %d filas", replayed, evento="wal_reproducido", filas=replayed)
+
+
+# --- Instancia compartida ---
+
+_writer: Optional[BitacoraWriter] = None
+_writer_lock = threading.Lock()
+
+
+def _default_sink() -> BitacoraSink:
+    # Sin ZENDA_BITACORA_BACKEND sigue a ZENDA_DB_BACKEND, como el almacén de entidades
+    backend = os.getenv("ZENDA_BITACORA_BACKEND") or os.getenv("ZENDA_DB_BACKEND", "sqlite")
+    if backend == "supabase":
+        return SupabaseBitacoraSink()
+    data_dir = os.getenv("ZENDA_DATA_DIR", "data")
+    return SQLiteBitacoraSink(os.path.join(data_dir, "bitacora.db"))
+
+
+def get_bitacora_writer() -> BitacoraWriter:
+    """
+    Devuelve el escritor compartido, creándolo y arrancándolo la primera vez.
+    Antes de arrancar reproduce en el sink lo que haya quedado sin confirmar en el WAL.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                sink = _default_sink()
+                wal = None
+                if os.getenv("ZENDA_BITACORA_WAL", "1") != "0":
+                    data_dir = os.getenv("ZENDA_DATA_DIR", "data")
+                    wal = BitacoraWAL(os.path.join(data_dir, "bitacora_wal"))
+                _writer = BitacoraWriter(sink, wal=wal)
+                if wal is not None:
+                    try:
+                        wal.recover(sink)
+                    except Exception as e:
+                        # El sink no responde al arrancar: se sigue encolando y lo pendiente
+                        # se reproduce con el primer volcado que funcione
+                        _writer.block_acks()
+                        log.warning("No se pudo reproducir el WAL de la bitácora al arrancar: %s", e,
+                                    evento="wal_recuperacion_fallida")
+                _writer.start()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def set_bitacora_writer(writer: Optional[BitacoraWriter]) -> None:
+    """Reemplaza el escritor compartido (tests, o para inyectar otro sink)."""
+    global _writer
+    with _writer_lock:
+        _writer = writer
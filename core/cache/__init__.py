@@ -0,0 +1,5 @@
+# Zenda - core/cache/__init__.py
+
+from .ttl_lru import TTLCache
+from .single_flight import SingleFlight
+from .client_data import ClientDataCache, get_client_data_cache, invalidate_client_data
@@ -0,0 +1,115 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from core.cache.single_flight import SingleFlight
+from core.cache.ttl_lru import TTLCache
+
+# Sesión -> cliente, para invalidar desde tools que sólo conocen el session_id
+_MAX_SESIONES = 10000
+
+# Invalidaciones recientes recordadas (para no cachear cargas que se cruzaron con una escritura)
+_MAX_INVALIDACIONES = 4096
+
+_MISSING = object()
+
+
+class ClientDataCache:
+    """
+    Caché de lectura de retrieve_client_data_function por id_cliente.
+
+    Un cliente que se reconecta dentro del TTL arranca la sesión sin tocar la
+    base. Las tools que escriben preferencias, entidades o el resumen
+    histórico llaman a invalidate() (o invalidate_session()) para que la
+    próxima lectura vaya a la base.
+
+    Los fallos concurrentes del mismo cliente (reconexiones rápidas, varios
+    canales) comparten una sola carga (SingleFlight, con flight_timeout por espera).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, flight_timeout: Optional[float] = 5.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.flight = SingleFlight(timeout=flight_timeout)
+        self._sessions: "OrderedDict[str, str]" = OrderedDict()
+        self._invalidated: "OrderedDict[str, int]" = OrderedDict()  # cliente -> secuencia
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def get(self, id_cliente: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        key = str(id_cliente)
+        data = self.cache.get(key, _MISSING)
+        if data is _MISSING:
+            data = self.flight.do(key, lambda: self._load(key, loader))
+        # Copia profunda: quien recibe los datos puede modificarlos sin tocar la caché
+        return copy.deepcopy(data)
+
+    def _load(self, key: str, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            started = self._seq
+        data = loader()
+        with self._lock:
+            # Si el cliente se invalidó durante la carga, se entrega pero no se cachea
+            if self._invalidated.get(key, 0) <= started:
+                self.cache.put(key, data)
+        return data
+
+    def register_session(self, session_id: str, id_cliente: str) -> None:
+        with self._lock:
+            self._sessions[str(session_id)] = str(id_cliente)
+            self._sessions.move_to_end(str(session_id))
+            if len(self._sessions) > _MAX_SESIONES:
+                self._sessions.popitem(last=False)
+
+    def client_for_session(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            return self._sessions.get(str(session_id))
+
+    def invalidate(self, id_cliente: Optional[str]) -> bool:
+        if not id_cliente:
+            return False
+        key = str(id_cliente)
+        with self._lock:
+            self._seq += 1
+            self._invalidated[key] = self._seq
+            self._invalidated.move_to_end(key)
+            if len(self._invalidated) > _MAX_INVALIDACIONES:
+                self._invalidated.popitem(last=False)
+        self.flight.forget(key)
+        return self.cache.invalidate(key)
+
+    def invalidate_session(self, session_id: str) -> bool:
+        return self.invalidate(self.client_for_session(session_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "single_flight": self.flight.stats()}
+
+
+_cache: Optional[ClientDataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_client_data_cache() -> ClientDataCache:
+    """
+    Caché compartida (ZENDA_CLIENT_CACHE_TTL segundos, ZENDA_CLIENT_CACHE_SIZE clientes,
+    ZENDA_SINGLE_FLIGHT_TIMEOUT segundos de espera por una carga en vuelo).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ClientDataCache(maxsize=int(os.getenv("ZENDA_CLIENT_CACHE_SIZE", "1024")),
+                                         ttl=float(os.getenv("ZENDA_CLIENT_CACHE_TTL", "300")),
+                                         flight_timeout=float(os.getenv("ZENDA_SINGLE_FLIGHT_TIMEOUT", "5")))
+    return _cache
+
+
+def invalidate_client_data(id_cliente: Optional[str] = None, session_id: Optional[str] = None) -> bool:
+    """Hook de invalidación para las tools que escriben datos del cliente."""
+    cache = get_client_data_cache()
+    if id_cliente:
+        return cache.invalidate(id_cliente)
+    if session_id:
+        return cache.invalidate_session(session_id)
+    return False
@@ -0,0 +1,84 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_DEFAULT = object()
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalescencia de lecturas concurrentes idénticas ("single-flight").
+
+    El primer hilo que pide una clave ejecuta la carga; los que llegan mientras
+    está en vuelo esperan ese mismo resultado (o su excepción) en vez de ir
+    otra vez al backend. Cada espera tiene timeout (por llamada o el de la
+    instancia): al vencer se lanza TimeoutError y la carga sigue para los demás.
+
+    forget() / forget_where() desacoplan las cargas en vuelo después de una
+    escritura: quien llegue luego arranca una carga nueva en lugar de recibir
+    datos leídos antes de escribir.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+        self.timeouts = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], timeout: Any = _DEFAULT) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.event.set()
+            return call.result
+        wait = self.timeout if timeout is _DEFAULT else timeout
+        if not call.event.wait(wait):
+            with self._lock:
+                self.timeouts += 1
+            raise TimeoutError(f"Sin respuesta para {key!r} en {wait}s")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        with self._lock:
+            for key in [k for k in self._calls if predicate(k)]:
+                del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "llamadas": self.calls,
+                "compartidas": self.shared,
+                "timeouts": self.timeouts,
+                "en_vuelo": len(self._calls),
+            }
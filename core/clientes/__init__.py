@@ -0,0 +1,5 @@
+# Zenda - core/clientes/__init__.py
+
+from .bulk import (CHUNK_DEFAULT, ClientDataSource, RepositoryClientSource, SupabaseClientSource,
+                   build_client_data, chunked, iter_clients_data, join_chunk)
+from .loader import get_client_data, load_client_data
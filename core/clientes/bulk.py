@@ -0,0 +1,128 @@
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.entidades import get_entity_store
+from core.repositorios import fetch_all, get_repository
+
+# Clientes por consulta IN (muy por debajo del límite de parámetros de SQLite / largo de URL de PostgREST)
+CHUNK_DEFAULT = 500
+
+# Columnas de sesiones que usa build_client_data
+COLUMNAS_SESION = ["id_cliente", "historical_summary", "csat", "comentario_usuario", "fecha_inicio"]
+
+# Preferencias con las que arranca un cliente que no está en la base
+PREFERENCIAS_DEFAULT = {"idioma": "es", "tono": "profesional", "canal_comunicacion": "T"}
+
+
+def chunked(ids: Iterable[Any], size: int = CHUNK_DEFAULT) -> Iterator[List[str]]:
+    """Bloques de hasta size ids (sin repetidos dentro del bloque), consumiendo la entrada de a poco."""
+    iterator = iter(ids)
+    while True:
+        chunk = list(dict.fromkeys(str(i) for i in islice(iterator, size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ClientDataSource(ABC):
+    """
+    Fuente de datos de clientes por bloques: una consulta IN por tabla y bloque
+    (paginada en Supabase).
+
+    fetch_sesiones devuelve las sesiones con historical_summary de la más reciente
+    a la más vieja (de cada cliente se usa la primera).
+    """
+
+    @abstractmethod
+    def fetch_clientes(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def fetch_entidades(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def fetch_sesiones(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        ...
+
+
+class SupabaseClientSource(ClientDataSource):
+    """Tablas clientes, entidades y sesiones de Supabase con filtros in_ de PostgREST."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    def fetch_clientes(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return fetch_all(lambda: self.client.table("clientes").select("id_cliente, preferencias")
+                         .in_("id_cliente", ids).order("id_cliente"))
+
+    def fetch_entidades(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return fetch_all(lambda: self.client.table("entidades")
+                         .select("id_cliente, tipo_entidad, nombre_entidad, datos_entidad, tipo_relacion, estado")
+                         .in_("id_cliente", ids).eq("estado", "activo").order("id"))
+
+    def fetch_sesiones(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return fetch_all(lambda: self.client.table("sesiones").select(", ".join(COLUMNAS_SESION))
+                         .in_("id_cliente", ids).not_.is_("historical_summary", "null")
+                         .order("fecha_inicio", desc=True).order("id_sesion"))
+
+
+class RepositoryClientSource(ClientDataSource):
+    """
+    Clientes y sesiones desde los repositorios compartidos (SQLite local o Supabase
+    según ZENDA_DB_BACKEND); entidades desde el almacén de entidades de las tools.
+    """
+
+    def fetch_clientes(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return get_repository("clientes").find_in("id_cliente", ids)
+
+    def fetch_entidades(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return get_entity_store().find_many(ids, estado="activo")
+
+    def fetch_sesiones(self, ids: List[str]) -> Iterable[Dict[str, Any]]:
+        return get_repository("sesiones").find_in("id_cliente", ids, order_by="fecha_inicio", desc=True,
+                                                  columns=COLUMNAS_SESION, not_null=["historical_summary"],
+                                                  first_per_value=True)
+
+
+def build_client_data(cliente: Optional[Dict[str, Any]], entidades: List[Dict[str, Any]],
+                      sesion: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mismo formato que retrieve_client_data_function."""
+    sesion = sesion or {}
+    return {
+        "preferencias": (cliente or {}).get("preferencias") or (dict(PREFERENCIAS_DEFAULT) if cliente is None else {}),
+        "resumen_memoria_larga": sesion.get("historical_summary"),
+        "entidades_iniciales": entidades,
+        "CSAT": sesion.get("csat"),
+        "comentario_usuario": sesion.get("comentario_usuario"),
+    }
+
+
+def iter_clients_data(ids: Iterable[Any], source: ClientDataSource,
+                      chunk_size: int = CHUNK_DEFAULT) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    (id_cliente, datos) para cada id, en el orden de entrada (sin repetidos por bloque).
+
+    Por bloque: tres consultas IN (clientes, entidades, sesiones) y el join en
+    memoria. Sólo un bloque vive en memoria a la vez, así que sirve para recorrer
+    100k clientes en jobs nocturnos (backfills de QA, re-resumen, conciliación).
+    """
+    for chunk in chunked(ids, chunk_size):
+        for id_cliente, (cliente, entidades, sesion) in join_chunk(chunk, source).items():
+            yield id_cliente, build_client_data(cliente, entidades, sesion)
+
+
+def join_chunk(chunk: List[str], source: ClientDataSource) -> Dict[str, tuple]:
+    """id_cliente -> (fila de clientes o None, entidades, última sesión con resumen o None)."""
+    clientes = {str(row["id_cliente"]): row for row in source.fetch_clientes(chunk)}
+    entidades: Dict[str, List[Dict[str, Any]]] = {}
+    for row in source.fetch_entidades(chunk):
+        entity = {k: v for k, v in row.items() if k != "id_cliente"}
+        entidades.setdefault(str(row["id_cliente"]), []).append(entity)
+    sesiones: Dict[str, Dict[str, Any]] = {}
+    for row in source.fetch_sesiones(chunk):
+        if row.get("historical_summary"):
+            sesiones.setdefault(str(row["id_cliente"]), row)
+    return {id_cliente: (clientes.get(id_cliente), entidades.get(id_cliente, []), sesiones.get(id_cliente))
+            for id_cliente in chunk}
@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+
+from core.cache import get_client_data_cache
+from core.clientes.bulk import ClientDataSource, RepositoryClientSource, build_client_data, join_chunk
+from core.utils.tool_events import get_tool_logger
+
+log = get_tool_logger("CLIENTES")
+
+_source: Optional[ClientDataSource] = None
+
+
+def _default_source() -> ClientDataSource:
+    global _source
+    if _source is None:
+        _source = RepositoryClientSource()
+    return _source
+
+
+def load_client_data(id_cliente: str, source: Optional[ClientDataSource] = None) -> Dict[str, Any]:
+    """Datos de un cliente (formato de build_client_data) leídos de la base, sin caché."""
+    id_cliente = str(id_cliente)
+    cliente, entidades, sesion = join_chunk([id_cliente], source or _default_source())[id_cliente]
+    if cliente is None:
+        log.info("CLIENTE NO ENCONTRADO: '%s' - Devolviendo datos por defecto", id_cliente,
+                 evento="cliente_no_encontrado")
+    return build_client_data(cliente, entidades, sesion)
+
+
+def get_client_data(id_cliente: str, source: Optional[ClientDataSource] = None) -> Dict[str, Any]:
+    """
+    Datos de un cliente a través de la caché compartida (LRU con TTL): una reconexión
+    dentro del TTL no toca la base. La invalidan las tools que escriben entidades,
+    resumen o preferencias.
+    """
+    return get_client_data_cache().get(str(id_cliente), lambda: load_client_data(id_cliente, source))
@@ -0,0 +1,5 @@
+# Zenda - core/emotion/__init__.py
+
+from .matcher import EmotionMatcher, get_emotion_matcher, spanish_variants
+from .batch import EmotionBatchScorer, iter_emotion_scores, score_emotions
+from .streaming import StreamingProsodyAnalyzer, analyze_audio, iter_audio_emotion
@@ -0,0 +1,243 @@
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.emotion.matcher import EMOCION_NEUTRAL, EmotionMatcher, get_emotion_matcher
+from core.utils.text_utils import fold_text
+
+_SEPARATOR = "\x1e"
+# split con grupo: [hueco, palabra, hueco, palabra, ..., hueco]. Los huecos (espacios,
+# puntuación, separadores de mensaje) se clasifican una vez por texto distinto y con eso
+# se aplican las reglas de EmotionMatcher por posición, sin offsets de caracteres.
+_SPLIT_RE = re.compile(r"(\w+)")
+
+
+def _gap_features(gap: str) -> Tuple[int, bool, bool, bool, int, bool]:
+    """
+    (separadores de mensaje, un solo carácter, es un espacio, empieza pegado a la palabra
+    anterior, bloques que empiezan dentro, termina en blanco).
+    """
+    starts = sum(1 for a, b in zip(gap, gap[1:]) if a.isspace() and not b.isspace())
+    return (gap.count(_SEPARATOR), len(gap) == 1 and gap != _SEPARATOR, gap == " ",
+            bool(gap) and not gap[0].isspace(), starts, bool(gap) and gap[-1].isspace())
+
+
+class EmotionBatchScorer:
+    """
+    Scoring de emociones por lotes con NumPy, para backfills de bitácora y analítica de QA.
+
+    Cada lote se tokeniza de una vez. Los tokens se mapean a un vocabulario
+    compartido (token -> fila de una matriz de pesos vocab x emociones) que se
+    aprende sobre la marcha usando el mismo EmotionMatcher que la tool, y los
+    conteos dispersos (mensaje, token) se reducen con bincount por emoción.
+    Intensificadores, negadores y frases de varias palabras se aplican por
+    posición de token, vectorizados y con las mismas reglas de caracteres que
+    EmotionMatcher: el intensificador tiene que estar pegado (un carácter de
+    separación), la negación alcanza hasta un bloque entre espacios (la
+    puntuación cuenta como bloque, así "no, estoy feliz" no niega) y las frases
+    sólo coinciden separadas por un espacio.
+    """
+
+    def __init__(self, matcher: Optional[EmotionMatcher] = None, max_vocab: int = 500_000):
+        self.matcher = matcher or get_emotion_matcher()
+        self.emotions = list(self.matcher.emotions)
+        self.max_vocab = max_vocab
+        n_emotions = len(self.emotions)
+        # Fila 0: tokens sin peso (la gran mayoría)
+        self._vocab: Dict[str, int] = {}
+        self._gaps: Dict[str, int] = {}
+        self._gap_rows: List[Tuple[int, bool, bool, bool, int, bool]] = []
+        self._gap_arrays: Optional[List[np.ndarray]] = None
+        self._weights: List[np.ndarray] = [np.zeros(n_emotions, dtype=np.float32)]
+        self._intens: List[bool] = [False]
+        self._neg: List[bool] = [False]
+        self._matrix = np.zeros((1, n_emotions), dtype=np.float32)
+        self._dirty = False
+        for word in self.matcher.intensifiers | self.matcher.negators:
+            self._learn(word)
+        self._phrases = [(tuple(self._learn(w) for w in words), idx, weight)
+                         for words, idx, weight in sorted(self.matcher.phrases, key=lambda p: len(p[0]))]
+
+    @property
+    def vocab_size(self) -> int:
+        return len(self._vocab)
+
+    def _learn_gap(self, gap: str) -> int:
+        known = self._gaps.get(gap)
+        if known is not None:
+            return known
+        row = len(self._gap_rows)
+        self._gap_rows.append(_gap_features(gap))
+        self._gap_arrays = None
+        if len(self._gaps) < self.max_vocab:
+            self._gaps[gap] = row
+        return row
+
+    def _learn(self, token: str) -> int:
+        known = self._vocab.get(token)
+        if known is not None:
+            return known
+        folded = fold_text(token)
+        if folded != token:
+            # "más" y "mas" comparten fila (las frases se indexan por la forma plegada)
+            row = self._learn(folded)
+            if len(self._vocab) < self.max_vocab:
+                self._vocab[token] = row
+            return row
+        weights = np.asarray([self.matcher.score(folded)[e] for e in self.emotions], dtype=np.float32)
+        is_intens = folded in self.matcher.intensifiers
+        is_neg = folded in self.matcher.negators
+        in_phrase = any(folded in words for words, _, _ in self.matcher.phrases)
+        if not weights.any() and not is_intens and not is_neg and not in_phrase:
+            row = 0
+        else:
+            row = len(self._weights)
+            self._weights.append(weights)
+            self._intens.append(is_intens)
+            self._neg.append(is_neg)
+            self._dirty = True
+        if len(self._vocab) < self.max_vocab:
+            self._vocab[token] = row
+        return row
+
+    def _arrays(self):
+        if self._dirty:
+            self._matrix = np.vstack(self._weights)
+            self._intens_arr = np.asarray(self._intens)
+            self._neg_arr = np.asarray(self._neg)
+            self._dirty = False
+        elif not hasattr(self, "_intens_arr"):
+            self._intens_arr = np.asarray(self._intens)
+            self._neg_arr = np.asarray(self._neg)
+        return self._matrix, self._intens_arr, self._neg_arr
+
+    def score(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Devuelve (scores, labels): matriz float32 mensajes x emociones y el argmax
+        por mensaje ("neutral" si ningún término aportó).
+        """
+        n_docs = len(texts)
+        # Se tokeniza en minúsculas y sólo se pliega (acentos) el vocabulario nuevo, no el lote entero
+        parts = _SPLIT_RE.split(_SEPARATOR.join(t.replace(_SEPARATOR, " ") for t in texts).lower())
+        tokens, gap_texts = parts[1::2], parts[0::2]
+        vocab, gaps = self._vocab, self._gaps
+        for token in set(tokens).difference(vocab):
+            self._learn(token)
+        for gap in set(gap_texts).difference(gaps):
+            self._learn_gap(gap)
+        ids = np.array(list(map(vocab.get, tokens, repeat(-2))), dtype=np.int32)
+        for pos in np.flatnonzero(ids == -2):  # sólo si el vocabulario llegó a max_vocab
+            ids[pos] = self._learn(tokens[pos])
+        gap_ids = np.array(list(map(gaps.get, gap_texts, repeat(-2))), dtype=np.int32)
+        for pos in np.flatnonzero(gap_ids == -2):
+            gap_ids[pos] = self._learn_gap(gap_texts[pos])
+        matrix, intens, neg = self._arrays()
+        if self._gap_arrays is None:
+            self._gap_arrays = [np.asarray(col) for col in zip(*self._gap_rows)]
+        seps, single, space, glued, inner, ends_ws = (col[gap_ids] for col in self._gap_arrays)
+        rows = ids
+        n_tokens = len(rows)
+        if not n_tokens:
+            scores = np.zeros((n_docs, len(self.emotions)), dtype=np.float32)
+            return scores, np.asarray([EMOCION_NEUTRAL] * n_docs, dtype=object)
+        # Hueco k: el anterior a la palabra k (el último queda después de la última palabra)
+        doc = np.cumsum(seps)[:n_tokens]
+
+        # Intensificador: la palabra anterior, separada por un único carácter
+        pegado = np.concatenate(([False], intens[rows[:-1]])) & single[:n_tokens]
+        factor = np.where(pegado, self.matcher.intensifier_weight, 1.0).astype(np.float32)
+        sin_negar = factor.copy()
+
+        # Negador: el último del mismo mensaje, con a lo sumo un bloque entre espacios en el
+        # medio (puntuación pegada al negador + bloques que empiezan en los huecos y palabras)
+        index = np.arange(n_tokens)
+        last_neg = np.maximum.accumulate(np.where(neg[rows], index, -1))
+        before = np.concatenate(([-1], last_neg[:-1]))
+        src = np.maximum(before, 0)
+        inner_cum = np.cumsum(inner)
+        word_starts_cum = np.cumsum(ends_ws[:n_tokens])
+        blocks = (glued[np.minimum(src + 1, len(gap_ids) - 1)] + inner_cum[:n_tokens] - inner_cum[src]
+                  + np.concatenate(([0], word_starts_cum[:-1])) - word_starts_cum[src])
+        factor[(before >= 0) & (doc[src] == doc) & (blocks <= 1)] = 0.0
+        weighted = matrix[rows] * factor[:, None]
+
+        # Frases (palabras separadas por un espacio): en la posición inicial reemplazan al
+        # término de la misma emoción; la más larga gana. Una frase con un negador propio
+        # ("no puedo más") no la niega un negador anterior: en el matcher su propio "no"
+        # mueve neg_end dentro de la frase
+        phrase_hits = {}
+        for words, idx, weight in self._phrases:
+            con_negador = bool(neg[list(words)].any())
+            k = len(words)
+            if n_tokens < k:
+                continue
+            mask = rows[:n_tokens - k + 1] == words[0]
+            for j in range(1, k):
+                mask &= (rows[j:n_tokens - k + 1 + j] == words[j]) & space[j:n_tokens - k + 1 + j]
+            for pos in np.flatnonzero(mask):
+                phrase_hits[(int(pos), idx)] = (weight, con_negador)
+        for (pos, idx), (weight, con_negador) in phrase_hits.items():
+            weighted[pos, idx] = weight * (sin_negar[pos] if con_negador else factor[pos])
+
+        scores = np.zeros((n_docs, len(self.emotions)), dtype=np.float32)
+        hit = np.flatnonzero(weighted.any(axis=1))
+        if hit.size:
+            for e in range(len(self.emotions)):
+                scores[:, e] = np.bincount(doc[hit], weights=weighted[hit, e], minlength=n_docs)[:n_docs]
+        labels = np.asarray(self.emotions + [EMOCION_NEUTRAL], dtype=object)[
+            np.where(scores.max(axis=1) > 0, scores.argmax(axis=1), len(self.emotions))
+        ]
+        return scores, labels
+
+
+_worker_scorer: Optional[EmotionBatchScorer] = None
+
+
+def _score_chunk(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    global _worker_scorer
+    if _worker_scorer is None:
+        _worker_scorer = EmotionBatchScorer()
+    return _worker_scorer.score(texts)
+
+
+def _chunks(texts: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    iterator = iter(texts)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_emotion_scores(texts: Iterable[str], chunk_size: int = 20_000,
+                        processes: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Procesa un iterable (posiblemente enorme) de textos en lotes, con memoria acotada.
+    Con processes > 1 reparte los lotes en un pool de procesos, manteniendo el orden.
+    """
+    if not processes or processes <= 1:
+        scorer = EmotionBatchScorer()
+        for chunk in _chunks(texts, chunk_size):
+            yield scorer.score(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = []
+        for chunk in _chunks(texts, chunk_size):
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= processes * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+
+def score_emotions(texts: Iterable[str], chunk_size: int = 20_000,
+                   processes: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Versión que junta todo: (scores mensajes x emociones, labels)."""
+    parts = list(iter_emotion_scores(texts, chunk_size, processes))
+    if not parts:
+        return np.zeros((0, len(get_emotion_matcher().emotions)), dtype=np.float32), np.asarray([], dtype=object)
+    return np.vstack([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
@@ -0,0 +1,137 @@
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from core.utils.aho_corasick import AhoCorasick
+from core.utils.text_utils import fold_text
+
+LEXICO_PATH = os.path.join(os.path.dirname(__file__), "lexico_emociones.json")
+
+EMOCION_NEUTRAL = "neutral"
+TONO_NEUTRAL = "informativo"
+
+# Tipos de payload en el autómata
+_TERM = 0
+_INTENSIFIER = 1
+_NEGATOR = 2
+
+
+def spanish_variants(word: str) -> List[str]:
+    """Variantes de género y número de una palabra ("agotado" -> agotada, agotados, agotadas)."""
+    if " " in word:
+        return [word]
+    if word.endswith("o"):
+        return [word, word[:-1] + "a", word + "s", word[:-1] + "as"]
+    if word.endswith("a") or word.endswith("e"):
+        return [word, word + "s"]
+    if word.endswith("z"):
+        return [word, word[:-1] + "ces"]
+    if word.endswith("ion"):
+        return [word, word + "es"]
+    return [word, word + "es"]
+
+
+class EmotionMatcher:
+    """
+    Detector de emociones por léxico, compilado en un único autómata Aho-Corasick.
+
+    El texto se pliega una vez (minúsculas, sin acentos) y se recorre en una sola
+    pasada. Los términos "raiz" coinciden con cualquier terminación ("frustr" ->
+    frustrada, frustración); el resto exige palabra completa, con sus variantes de
+    género y número. Un intensificador inmediatamente anterior multiplica el peso;
+    un negador hasta una palabra antes lo anula ("no estoy feliz").
+    """
+
+    def __init__(self, lexicon: Dict[str, Any]):
+        self.emotions: List[str] = list(lexicon["emociones"].keys())
+        self.tones: Dict[str, str] = {e: cfg.get("tono", TONO_NEUTRAL) for e, cfg in lexicon["emociones"].items()}
+        self.level_medio = lexicon["niveles"]["medio"]
+        self.level_alto = lexicon["niveles"]["alto"]
+        intens = lexicon.get("intensificadores", {})
+        self.intensifier_weight = intens.get("peso", 1.5)
+        # Vistas del léxico para el scoring por lotes (core.emotion.batch)
+        self.intensifiers = {fold_text(w) for w in intens.get("terminos", [])}
+        self.negators = {fold_text(w) for w in lexicon.get("negadores", [])}
+        self.phrases: List[tuple] = []
+
+        self._automaton = AhoCorasick()
+        for idx, emotion in enumerate(self.emotions):
+            for term in lexicon["emociones"][emotion]["terminos"]:
+                base = fold_text(term["t"])
+                is_root = term.get("raiz", False)
+                if " " in base:
+                    self.phrases.append((tuple(base.split()), idx, float(term["peso"])))
+                words = [base] if is_root or not term.get("variantes", True) else spanish_variants(base)
+                for word in words:
+                    self._automaton.add(word, (_TERM, idx, float(term["peso"]), is_root))
+        for word in intens.get("terminos", []):
+            self._automaton.add(fold_text(word), (_INTENSIFIER,))
+        for word in lexicon.get("negadores", []):
+            self._automaton.add(fold_text(word), (_NEGATOR,))
+        self._automaton.build()
+
+    @classmethod
+    def from_file(cls, path: str = LEXICO_PATH) -> "EmotionMatcher":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def score(self, text: str) -> Dict[str, float]:
+        """Puntaje acumulado por emoción para el texto."""
+        folded = fold_text(text)
+        n = len(folded)
+        scores = [0.0] * len(self.emotions)
+        # (inicio, emoción) -> aporte, para quedarse con el término más largo en la misma posición
+        contributions: Dict[tuple, float] = {}
+        int_end, neg_end = -2, -2
+        for start, end, payload in self._automaton.iter(folded):
+            if start > 0 and folded[start - 1].isalnum():
+                continue
+            kind = payload[0]
+            if kind != _TERM:
+                if end >= n or not folded[end].isalnum():
+                    if kind == _NEGATOR:
+                        neg_end = end
+                    else:
+                        int_end = end
+                continue
+            _, idx, weight, is_root = payload
+            if not is_root and end < n and folded[end].isalnum():
+                continue
+            if 0 <= neg_end < start and len(folded[neg_end:start].split()) <= 1:
+                weight = 0.0
+            elif int_end == start - 1:
+                weight *= self.intensifier_weight
+            key = (start, idx)
+            previous = contributions.get(key, 0.0)
+            contributions[key] = weight
+            scores[idx] += weight - previous
+        return dict(zip(self.emotions, scores))
+
+    def detect(self, text: str) -> Dict[str, Any]:
+        """Mismo formato que emotion_detection_function, más los puntajes por emoción."""
+        scores = self.score(text)
+        top_emotion: Optional[str] = max(scores, key=scores.get) if scores else None
+        top = scores.get(top_emotion, 0.0) if top_emotion else 0.0
+        if top <= 0:
+            return {"emocion": EMOCION_NEUTRAL, "nivel": "bajo", "tono_general": TONO_NEUTRAL,
+                    "confianza": 0.5, "scores": scores}
+        total = sum(s for s in scores.values() if s > 0)
+        nivel = "alto" if top >= self.level_alto else ("medio" if top >= self.level_medio else "bajo")
+        return {
+            "emocion": top_emotion,
+            "nivel": nivel,
+            "tono_general": self.tones[top_emotion],
+            "confianza": round(0.5 + 0.45 * top / total, 2),
+            "scores": scores,
+        }
+
+
+_default_matcher: Optional[EmotionMatcher] = None
+
+
+def get_emotion_matcher() -> EmotionMatcher:
+    """Matcher compartido, compilado una sola vez desde el léxico por defecto."""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = EmotionMatcher.from_file(os.getenv("ZENDA_LEXICO_EMOCIONES", LEXICO_PATH))
+    return _default_matcher
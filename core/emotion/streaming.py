@@ -0,0 +1,174 @@
+import math
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+from core.emotion.matcher import EMOCION_NEUTRAL, TONO_NEUTRAL
+
+# Rango de f0 de voz considerado por el proxy de pitch (Hz)
+F0_MIN = 70.0
+F0_MAX = 400.0
+# Correlación normalizada mínima para considerar un frame como sonoro
+UMBRAL_SONORO = 0.3
+
+
+class StreamingProsodyAnalyzer:
+    """
+    Análisis prosódico incremental de audio PCM (int16, mono) que llega en chunks.
+
+    Cada chunk se recorre con memoryview: los frames completos se leen con
+    np.frombuffer directamente sobre el chunk (sin copiarlo) y sólo el resto
+    que no completa un frame se guarda en un buffer reutilizable para el chunk
+    siguiente. Por frame se calcula energía (RMS), tasa de cruces por cero y un
+    proxy de pitch (pico de autocorrelación vía FFT, vectorizado por chunk); los
+    acumuladores son sumas, así que la estimación provisional sale en O(1) y
+    la latencia a la primera estimación depende del tamaño del chunk, no de la
+    duración del enunciado.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 32):
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(sample_rate * frame_ms / 1000))
+        self.frame_bytes = self.frame_len * 2
+        self._carry = bytearray(self.frame_bytes)
+        self._carry_view = memoryview(self._carry)
+        self._carry_fill = 0
+        self._n_fft = 1 << (2 * self.frame_len - 1).bit_length()
+        self._lag_min = max(1, int(sample_rate / F0_MAX))
+        self._lag_max = min(self.frame_len - 1, int(sample_rate / F0_MIN))
+        self.reset()
+
+    def reset(self) -> None:
+        self.frames = 0
+        self.voiced = 0
+        self._energy_db_sum = 0.0
+        self._zcr_sum = 0.0
+        self._pitch_sum = 0.0
+        self._pitch_sq_sum = 0.0
+        self._carry_fill = 0
+
+    @property
+    def seconds(self) -> float:
+        return self.frames * self.frame_len / self.sample_rate
+
+    def feed(self, chunk) -> Optional[Dict[str, Any]]:
+        """
+        Procesa un chunk (bytes, bytearray o memoryview de int16 LE).
+        Devuelve una estimación provisional si el chunk completó al menos un frame.
+        """
+        view = memoryview(chunk).cast("B")
+        pos = 0
+        before = self.frames
+        if self._carry_fill:
+            need = self.frame_bytes - self._carry_fill
+            take = min(need, len(view))
+            self._carry_view[self._carry_fill:self._carry_fill + take] = view[:take]
+            self._carry_fill += take
+            pos = take
+            if self._carry_fill == self.frame_bytes:
+                self._process(np.frombuffer(self._carry_view, dtype="<i2").reshape(1, -1))
+                self._carry_fill = 0
+        n_frames = (len(view) - pos) // self.frame_bytes
+        if n_frames:
+            end = pos + n_frames * self.frame_bytes
+            self._process(np.frombuffer(view[pos:end], dtype="<i2").reshape(n_frames, -1))
+            pos = end
+        rest = len(view) - pos
+        if rest:
+            self._carry_view[self._carry_fill:self._carry_fill + rest] = view[pos:]
+            self._carry_fill += rest
+        return self.estimate() if self.frames > before else None
+
+    def _process(self, frames: np.ndarray) -> None:
+        x = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(x * x, axis=1)) + 1e-9
+        energy_db = 20.0 * np.log10(rms)
+        signs = np.signbit(x)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        # Autocorrelación por frame vía FFT; el pico en [lag_min, lag_max] da el período
+        centered = x - x.mean(axis=1, keepdims=True)
+        spectrum = np.fft.rfft(centered, n=self._n_fft, axis=1)
+        acf = np.fft.irfft(spectrum * np.conj(spectrum), n=self._n_fft, axis=1)[:, :self._lag_max + 1]
+        window = acf[:, self._lag_min:]
+        lags = np.argmax(window, axis=1) + self._lag_min
+        peak = window[np.arange(len(lags)), lags - self._lag_min] / (acf[:, 0] + 1e-9)
+        is_voiced = peak >= UMBRAL_SONORO
+        pitch = self.sample_rate / lags[is_voiced]
+
+        self.frames += len(frames)
+        self.voiced += int(is_voiced.sum())
+        self._energy_db_sum += float(energy_db.sum())
+        self._zcr_sum += float(zcr.sum())
+        self._pitch_sum += float(pitch.sum())
+        self._pitch_sq_sum += float((pitch * pitch).sum())
+
+    def features(self) -> Dict[str, float]:
+        if not self.frames:
+            return {"energia_db": -120.0, "zcr": 0.0, "pitch_hz": 0.0, "pitch_cv": 0.0, "sonoro": 0.0, "segundos": 0.0}
+        pitch_mean = self._pitch_sum / self.voiced if self.voiced else 0.0
+        pitch_var = self._pitch_sq_sum / self.voiced - pitch_mean ** 2 if self.voiced else 0.0
+        return {
+            "energia_db": round(self._energy_db_sum / self.frames, 2),
+            "zcr": round(self._zcr_sum / self.frames, 4),
+            "pitch_hz": round(pitch_mean, 1),
+            "pitch_cv": round(math.sqrt(max(pitch_var, 0.0)) / pitch_mean, 3) if pitch_mean else 0.0,
+            "sonoro": round(self.voiced / self.frames, 3),
+            "segundos": round(self.seconds, 3),
+        }
+
+    def estimate(self, provisional: bool = True) -> Dict[str, Any]:
+        """
+        Estimación por activación (arousal) a partir de los rasgos acumulados:
+        activación alta -> ansiedad, muy baja con voz monótona -> tristeza.
+        La confianza crece con los segundos analizados.
+        """
+        f = self.features()
+        energia = min(max((f["energia_db"] + 40.0) / 25.0, 0.0), 1.0)
+        variacion = min(f["pitch_cv"] / 0.3, 1.0)
+        altura = min(max((f["pitch_hz"] - 100.0) / 200.0, 0.0), 1.0)
+        activacion = round(0.5 * energia + 0.3 * variacion + 0.2 * altura, 3)
+        confianza = round(min(0.9, 0.4 + 0.1 * f["segundos"]), 2)
+
+        if activacion >= 0.65:
+            emocion, tono = "ansiedad", "nervioso"
+            nivel = "alto" if activacion >= 0.8 else "medio"
+        elif activacion <= 0.25 and f["sonoro"] > 0.2:
+            emocion, tono, nivel = "tristeza", "melancolico", "medio" if activacion <= 0.15 else "bajo"
+        else:
+            emocion, tono, nivel = EMOCION_NEUTRAL, TONO_NEUTRAL, "bajo"
+            confianza = 0.5
+        return {
+            "emocion": emocion,
+            "nivel": nivel,
+            "tono_general": tono,
+            "confianza": confianza,
+            "provisional": provisional,
+            "prosodia": dict(f, activacion=activacion),
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """Estimación final del enunciado (descarta el resto que no completó un frame)."""
+        self._carry_fill = 0
+        return self.estimate(provisional=False)
+
+
+def iter_audio_emotion(chunks: Iterable[bytes], sample_rate: int = 16000,
+                       frame_ms: int = 32) -> Iterator[Dict[str, Any]]:
+    """Estimaciones provisionales por chunk y, al final, la estimación definitiva."""
+    analyzer = StreamingProsodyAnalyzer(sample_rate, frame_ms)
+    for chunk in chunks:
+        estimate = analyzer.feed(chunk)
+        if estimate is not None:
+            yield estimate
+    yield analyzer.finish()
+
+
+def analyze_audio(audio_bytes: bytes, sample_rate: int = 16000, chunk_ms: int = 256) -> Dict[str, Any]:
+    """Audio completo: se recorre en chunks sobre un memoryview, sin copias intermedias."""
+    analyzer = StreamingProsodyAnalyzer(sample_rate)
+    view = memoryview(audio_bytes)
+    step = max(analyzer.frame_bytes, int(sample_rate * chunk_ms / 1000) * 2)
+    for start in range(0, len(view), step):
+        analyzer.feed(view[start:start + step])
+    return analyzer.finish()
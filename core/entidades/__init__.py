@@ -0,0 +1,7 @@
+# Zenda - core/entidades/__init__.py
+
+from .store import (EntityStore, InMemoryEntityStore, SQLiteEntityStore, SupabaseEntityStore, new_entity, index_key,
+                    get_entity_store, set_entity_store)
+from .alias import EntityAliasIndex, alias_key, gender_variants, merge_entity_data, save_or_merge, get_alias_index
+from .mentions import EntityMentionIndex, get_mention_index, recall_entities
+from .relations import VISTAS, RelationshipIndex, get_relationship_index, emergency_contacts
@@ -0,0 +1,269 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core.entidades.store import EntityStore, get_entity_store
+from core.utils.text_utils import fold_text, normalize_name
+
+# Artículos y posesivos que no distinguen entidades ("mi jefe" == "el jefe" == "Jefe")
+_STOPWORDS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "lo",
+    "mi", "mis", "tu", "tus", "su", "sus", "nuestro", "nuestra", "nuestros", "nuestras",
+    "de", "del",
+}
+
+# Similitud (Jaccard de trigramas) mínima para considerar que dos nombres son la misma entidad
+UMBRAL_ALIAS = 0.6
+
+# Claves más cortas que esto sólo coinciden exactas (en nombres cortos un trigrama pesa demasiado)
+LARGO_MINIMO_SIMILITUD = 5
+
+# Terminaciones de género / número: "hermano" y "hermana", "Daniel" y "Daniela" son personas distintas
+_TERMINACIONES_GENERO = ("os", "as", "es", "o", "a", "e")
+
+
+def alias_key(name: str) -> str:
+    """Nombre normalizado y sin artículos/posesivos; si sólo quedaban esos, el nombre normalizado."""
+    words = normalize_name(name).split()
+    kept = [w for w in words if w not in _STOPWORDS]
+    return " ".join(kept or words)
+
+
+# Palabras como las separa normalize_name (letras y dígitos; el resto es separador)
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def alias_tokens(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Palabras del texto con las reglas de alias_key (plegado, sin puntuación ni
+    artículos/posesivos), como (inicio, fin, palabra) con posiciones en fold_text(text).
+    """
+    return [(m.start(), m.end(), m.group()) for m in _WORD_RE.finditer(fold_text(text or ""))
+            if m.group() not in _STOPWORDS]
+
+
+def _stem(word: str) -> str:
+    for suffix in _TERMINACIONES_GENERO:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def gender_variants(a: str, b: str) -> bool:
+    """True si dos claves distintas sólo difieren en terminaciones de género o número."""
+    words_a, words_b = a.split(), b.split()
+    return (a != b and len(words_a) == len(words_b)
+            and all(_stem(x) == _stem(y) for x, y in zip(words_a, words_b)))
+
+
+def _tipo(tipo: Optional[str]) -> str:
+    return normalize_name(tipo or "")
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def entity_aliases(entity: Dict[str, Any]) -> List[str]:
+    """Nombre de la entidad más los alias guardados en datos_entidad["aliases"]."""
+    datos = entity.get("datos_entidad") or {}
+    aliases = datos.get("aliases", []) if isinstance(datos, dict) else []
+    return [entity.get("nombre_entidad") or ""] + [a for a in aliases if isinstance(a, str)]
+
+
+def merge_entity_data(actual: Optional[Dict[str, Any]], nuevo: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combina datos_entidad: dicts recursivos, listas sin duplicados, el resto gana lo nuevo."""
+    merged = dict(actual or {})
+    for key, value in (nuevo or {}).items():
+        previous = merged.get(key)
+        if isinstance(previous, dict) and isinstance(value, dict):
+            merged[key] = merge_entity_data(previous, value)
+        elif isinstance(previous, list) and isinstance(value, list):
+            merged[key] = previous + [v for v in value if v not in previous]
+        else:
+            merged[key] = value
+    return merged
+
+
+class _ClientAliases:
+    __slots__ = ("keys_by_entity", "tipo_by_entity", "entities_by_key", "keys_by_gram", "grams_by_key")
+
+    def __init__(self):
+        self.keys_by_entity: Dict[str, Set[str]] = {}
+        self.tipo_by_entity: Dict[str, str] = {}
+        self.entities_by_key: Dict[str, Dict[str, None]] = {}
+        self.keys_by_gram: Dict[str, Set[str]] = {}
+        self.grams_by_key: Dict[str, Set[str]] = {}
+
+    def add(self, entity_id: str, names: Iterable[str], tipo: Optional[str] = None) -> None:
+        self.remove(entity_id)
+        keys = {k for k in (alias_key(n) for n in names) if k}
+        self.keys_by_entity[entity_id] = keys
+        self.tipo_by_entity[entity_id] = _tipo(tipo)
+        for key in keys:
+            bucket = self.entities_by_key.setdefault(key, {})
+            bucket[entity_id] = None
+            if key not in self.grams_by_key:
+                grams = self.grams_by_key[key] = trigrams(key)
+                for gram in grams:
+                    self.keys_by_gram.setdefault(gram, set()).add(key)
+
+    def remove(self, entity_id: str) -> None:
+        self.tipo_by_entity.pop(entity_id, None)
+        for key in self.keys_by_entity.pop(entity_id, ()):
+            bucket = self.entities_by_key.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(entity_id, None)
+            if not bucket:
+                del self.entities_by_key[key]
+                for gram in self.grams_by_key.pop(key, ()):
+                    keys = self.keys_by_gram.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self.keys_by_gram[gram]
+
+    def _entity(self, key: str, tipo: Optional[str]) -> Optional[str]:
+        for entity_id in self.entities_by_key.get(key, ()):
+            if tipo is None or self.tipo_by_entity.get(entity_id) == tipo:
+                return entity_id
+        return None
+
+    def best(self, key: str, tipo: Optional[str] = None, threshold: float = 0.0) -> Optional[Tuple[str, float]]:
+        """
+        Mejor entidad para la clave (con tipo, sólo entre las de ese tipo_entidad):
+        exacta, o por trigramas si la clave es larga, el puntaje llega a threshold y
+        los nombres no son variantes de género del mismo ("Martín" / "Martina").
+        """
+        tipo = None if tipo is None else _tipo(tipo)
+        exact = self._entity(key, tipo)
+        if exact is not None:
+            return exact, 1.0
+        if len(key) < LARGO_MINIMO_SIMILITUD:
+            return None
+        query = trigrams(key)
+        shared: Dict[str, int] = {}
+        for gram in query:
+            for candidate in self.keys_by_gram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scored = []
+        for candidate, common in shared.items():
+            score = common / (len(query) + len(self.grams_by_key[candidate]) - common)
+            if score >= threshold and len(candidate) >= LARGO_MINIMO_SIMILITUD and not gender_variants(key, candidate):
+                scored.append((score, candidate))
+        for score, candidate in sorted(scored, reverse=True):
+            entity_id = self._entity(candidate, tipo)
+            if entity_id is not None:
+                return entity_id, score
+        return None
+
+
+class EntityAliasIndex:
+    """
+    Índice de alias por cliente sobre nombre_entidad y datos_entidad["aliases"].
+
+    Coincidencia exacta por clave normalizada (sin artículos ni posesivos) en O(1);
+    si no hay, similitud de Jaccard por trigramas usando un índice invertido
+    trigrama -> claves, así sólo se puntúan los candidatos que comparten algún
+    trigrama. La similitud no aplica a claves cortas ni a nombres que sólo
+    difieren en el género ("hermano" / "hermana"). Cada cliente se carga del almacén la primera vez que se consulta y
+    después se mantiene al día con los listeners del almacén.
+    """
+
+    def __init__(self, store: EntityStore, threshold: float = UMBRAL_ALIAS):
+        self.store = store
+        self.threshold = threshold
+        self._clients: Dict[str, _ClientAliases] = {}
+        self._versions: Dict[str, int] = {}  # escrituras vistas por cliente
+        self._lock = threading.RLock()
+        store.add_listener(self._on_store_event)
+
+    def _client(self, id_cliente: str) -> _ClientAliases:
+        key = str(id_cliente)
+        with self._lock:
+            aliases = self._clients.get(key)
+            version = self._versions.get(key, 0)
+        if aliases is not None:
+            return aliases
+        # La carga consulta el almacén fuera del lock propio: el almacén notifica
+        # con su lock tomado y no debe esperar a este índice. Si hubo una escritura
+        # del cliente mientras tanto, la carga se usa pero no se guarda.
+        loaded = _ClientAliases()
+        for entity in self.store.find(key):
+            loaded.add(entity["id"], entity_aliases(entity), entity.get("tipo_entidad"))
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return loaded
+            return self._clients.setdefault(key, loaded)
+
+    def _on_store_event(self, event: str, entity: Dict[str, Any]) -> None:
+        with self._lock:
+            key = str(entity["id_cliente"])
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if event == "reload":
+                self._clients.pop(str(entity["id_cliente"]), None)
+                return
+            aliases = self._clients.get(str(entity["id_cliente"]))
+            if aliases is None:
+                return  # el cliente se carga completo en su primera consulta
+            if event == "delete":
+                aliases.remove(entity["id"])
+            else:
+                aliases.add(entity["id"], entity_aliases(entity), entity.get("tipo_entidad"))
+
+    def resolve(self, id_cliente: str, nombre: str, tipo_entidad: Optional[str] = None
+                ) -> Optional[Tuple[str, float]]:
+        """
+        (entity_id, similitud) de la entidad que mejor coincide, si supera el umbral.
+        Con tipo_entidad sólo se consideran entidades de ese tipo (así lo usa save_or_merge).
+        """
+        key = alias_key(nombre)
+        if not key:
+            return None
+        aliases = self._client(id_cliente)
+        with self._lock:
+            return aliases.best(key, tipo_entidad, self.threshold)
+
+    def close(self) -> None:
+        self.store.remove_listener(self._on_store_event)
+
+
+def save_or_merge(id_cliente: str, entity: Dict[str, Any], index: Optional[EntityAliasIndex] = None
+                  ) -> Tuple[Dict[str, Any], bool]:
+    """
+    Guarda una entidad nueva (armada con new_entity) o, si su nombre resuelve a una
+    existente del cliente del mismo tipo_entidad, combina datos_entidad y registra
+    el nombre como alias.
+    Devuelve (entidad guardada, combinada).
+    """
+    index = index or get_alias_index()
+    match = index.resolve(id_cliente, entity.get("nombre_entidad") or "", entity.get("tipo_entidad"))
+    if match is None:
+        return index.store.put(entity), False
+    existing = index.store.get(match[0], id_cliente=id_cliente)
+    if existing is None:
+        return index.store.put(entity), False
+    datos = merge_entity_data(existing.get("datos_entidad"), entity.get("datos_entidad"))
+    nombre = entity.get("nombre_entidad") or ""
+    aliases = datos.get("aliases", [])
+    if alias_key(nombre) not in {alias_key(n) for n in entity_aliases(existing)}:
+        datos["aliases"] = aliases + [nombre]
+    return index.store.update(existing["id"], {"datos_entidad": datos}, id_cliente=id_cliente), True
+
+
+_index: Optional[EntityAliasIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_alias_index() -> EntityAliasIndex:
+    """Índice de alias del almacén compartido (se rehace si se reemplazó el almacén)."""
+    global _index
+    store = get_entity_store()
+    with _index_lock:
+        if _index is None or _index.store is not store:
+            if _index is not None:
+                _index.close()
+            _index = EntityAliasIndex(store)
+        return _index
@@ -0,0 +1,153 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.entidades.alias import alias_key, alias_tokens, entity_aliases
+from core.entidades.store import EntityStore, get_entity_store
+from core.utils.aho_corasick import AhoCorasick
+
+# Alias más cortos que esto no se buscan en el texto (demasiado ruido: "yo", "ex")
+MIN_ALIAS_LEN = 3
+
+# Claves de datos_entidad que no aportan al prompt
+_DATOS_INTERNOS = {"aliases", "auto_detected", "detected_at", "session_id_origen"}
+
+
+def resumen_datos(datos: Optional[Dict[str, Any]], max_keys: int = 6, max_len: int = 120) -> Dict[str, Any]:
+    """Datos clave de una entidad para el contexto del turno: pocos campos y textos cortos."""
+    resumen: Dict[str, Any] = {}
+    for key, value in (datos or {}).items():
+        if key in _DATOS_INTERNOS or value in (None, "", [], {}):
+            continue
+        if isinstance(value, str) and len(value) > max_len:
+            value = value[:max_len] + "..."
+        elif isinstance(value, (dict, list)):
+            value = str(value)[:max_len]
+        resumen[key] = value
+        if len(resumen) >= max_keys:
+            break
+    return resumen
+
+
+class _ClientMentions:
+    __slots__ = ("automaton", "entities")
+
+    def __init__(self, entities: List[Dict[str, Any]]):
+        self.automaton = AhoCorasick()
+        self.entities: Dict[str, Dict[str, Any]] = {}
+        for entity in entities:
+            keys = {alias_key(n) for n in entity_aliases(entity)}
+            keys = {k for k in keys if len(k) >= MIN_ALIAS_LEN}
+            if not keys:
+                continue
+            self.entities[entity["id"]] = {
+                "id": entity["id"],
+                "nombre_entidad": entity.get("nombre_entidad"),
+                "tipo_entidad": entity.get("tipo_entidad"),
+                "tipo_relacion": entity.get("tipo_relacion"),
+                "datos": resumen_datos(entity.get("datos_entidad")),
+            }
+            for key in keys:
+                self.automaton.add(key, entity["id"])
+        self.automaton.build()
+
+
+class EntityMentionIndex:
+    """
+    Recuperación de entidades por mención, turno a turno.
+
+    Por cliente se compila un autómata Aho-Corasick con las claves de alias de
+    todas sus entidades (nombre y datos_entidad["aliases"], sin artículos ni
+    posesivos); cada input del cliente se pliega y se recorre una sola vez,
+    exigiendo límites de palabra. Los listeners del almacén invalidan el
+    autómata del cliente, que se recompila en el próximo turno.
+    """
+
+    def __init__(self, store: EntityStore):
+        self.store = store
+        self._clients: Dict[str, _ClientMentions] = {}
+        self._versions: Dict[str, int] = {}  # escrituras vistas por cliente
+        self._lock = threading.Lock()
+        store.add_listener(self._on_store_event)
+
+    def _on_store_event(self, event: str, entity: Dict[str, Any]) -> None:
+        key = str(entity["id_cliente"])
+        with self._lock:
+            self._clients.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _client(self, id_cliente: str) -> _ClientMentions:
+        key = str(id_cliente)
+        with self._lock:
+            mentions = self._clients.get(key)
+            version = self._versions.get(key, 0)
+        if mentions is None:
+            # Se compila fuera del lock (el almacén notifica con su lock tomado); si
+            # hubo una escritura mientras tanto, se usa pero no se guarda
+            mentions = _ClientMentions(self.store.find(key, estado="activo"))
+            with self._lock:
+                if self._versions.get(key, 0) == version:
+                    mentions = self._clients.setdefault(key, mentions)
+        return mentions
+
+    def recall(self, id_cliente: str, text: str, max_entities: int = 5) -> List[Dict[str, Any]]:
+        """Entidades del cliente mencionadas en el texto, en orden de aparición."""
+        if not text:
+            return []
+        mentions = self._client(id_cliente)
+        if not mentions.entities:
+            return []
+        # Mismas reglas que alias_key: sin puntuación ni artículos ("Ana-María", "Universidad de
+        # Buenos Aires"); cada palabra recuerda su posición en el texto plegado
+        tokens = alias_tokens(text)
+        normalized = " ".join(word for _, _, word in tokens)
+        starts: Dict[int, int] = {}
+        ends: Dict[int, int] = {}
+        offset = 0
+        for start, end, word in tokens:
+            starts[offset] = start
+            ends[offset + len(word)] = end
+            offset += len(word) + 1
+        # Por posición de inicio, la coincidencia más larga ("martin perez" antes que "martin")
+        best: Dict[int, tuple] = {}
+        for start, end, entity_id in mentions.automaton.iter(normalized):
+            if start not in starts or end not in ends:
+                continue
+            start, end = starts[start], ends[end]
+            if start not in best or end > best[start][0]:
+                best[start] = (end, entity_id)
+        found: List[Dict[str, Any]] = []
+        seen = set()
+        covered = -1
+        for start in sorted(best):
+            end, entity_id = best[start]
+            if start < covered or entity_id in seen:
+                continue
+            covered = end
+            seen.add(entity_id)
+            found.append(dict(mentions.entities[entity_id]))
+            if len(found) >= max_entities:
+                break
+        return found
+
+    def close(self) -> None:
+        self.store.remove_listener(self._on_store_event)
+
+
+_index: Optional[EntityMentionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_mention_index() -> EntityMentionIndex:
+    """Índice de menciones del almacén compartido (se rehace si se reemplazó el almacén)."""
+    global _index
+    store = get_entity_store()
+    with _index_lock:
+        if _index is None or _index.store is not store:
+            if _index is not None:
+                _index.close()
+            _index = EntityMentionIndex(store)
+        return _index
+
+
+def recall_entities(id_cliente: str, text: str, max_entities: int = 5) -> List[Dict[str, Any]]:
+    return get_mention_index().recall(id_cliente, text, max_entities)
@@ -0,0 +1,209 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from core.entidades.mentions import resumen_datos
+from core.entidades.store import EntityStore, get_entity_store
+from core.utils.text_utils import normalize_name
+
+# Vistas precalculadas: valores de tipo_entidad / tipo_relacion que caen en cada una
+VISTAS: Dict[str, set] = {
+    "familia": {
+        "padre", "madre", "hermano", "hermana", "hijo", "hija", "abuelo", "abuela", "tio", "tia",
+        "primo", "prima", "pareja", "esposo", "esposa", "suegro", "suegra", "familia", "familiar",
+    },
+    "trabajo": {
+        "jefe", "jefa", "colega", "companero", "companera", "companero de trabajo", "empresa",
+        "empleador", "equipo", "laboral", "trabajo", "cliente laboral",
+    },
+    "emergencia": {"contacto emergencia", "contacto de emergencia", "emergencia"},
+}
+VISTAS = {vista: {normalize_name(t) for t in tipos} for vista, tipos in VISTAS.items()}
+
+
+def relation_key(value: Any) -> Optional[str]:
+    return normalize_name(str(value)) if value else None
+
+
+def entity_views(entity: Dict[str, Any]) -> List[str]:
+    """Vistas a las que pertenece una entidad por su tipo, su relación o datos_entidad["contacto_emergencia"]."""
+    tipos = {relation_key(entity.get("tipo_entidad")), relation_key(entity.get("tipo_relacion"))}
+    views = [vista for vista, valores in VISTAS.items() if tipos & valores]
+    datos = entity.get("datos_entidad") or {}
+    if isinstance(datos, dict) and datos.get("contacto_emergencia") and "emergencia" not in views:
+        views.append("emergencia")
+    return views
+
+
+def entity_links(entity: Dict[str, Any]) -> List[tuple]:
+    """Aristas entidad -> entidad de datos_entidad["relaciones"]: [{"id": ..., "tipo": ...}]."""
+    datos = entity.get("datos_entidad") or {}
+    links = datos.get("relaciones", []) if isinstance(datos, dict) else []
+    return [(link["id"], relation_key(link.get("tipo")) or "relacionado")
+            for link in links if isinstance(link, dict) and link.get("id")]
+
+
+class _ClientGraph:
+    """Grafo social de un cliente: el cliente es el nodo central; las entidades, sus vecinos."""
+
+    __slots__ = ("nodes", "by_relation", "views", "out_links", "in_links")
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.by_relation: Dict[str, Dict[str, None]] = {}     # tipo (relación o entidad) -> ids
+        self.views: Dict[str, Dict[str, None]] = {v: {} for v in VISTAS}
+        self.out_links: Dict[str, Dict[str, Dict[str, None]]] = {}  # id -> tipo -> ids destino
+        self.in_links: Dict[str, Dict[str, Dict[str, None]]] = {}   # id -> tipo -> ids origen
+
+    def add(self, entity: Dict[str, Any]) -> None:
+        entity_id = entity["id"]
+        self.remove(entity_id)
+        node = {
+            "id": entity_id,
+            "nombre_entidad": entity.get("nombre_entidad"),
+            "tipo_entidad": entity.get("tipo_entidad"),
+            "tipo_relacion": entity.get("tipo_relacion"),
+            "datos": resumen_datos(entity.get("datos_entidad")),
+            "_tipos": {t for t in (relation_key(entity.get("tipo_entidad")),
+                                   relation_key(entity.get("tipo_relacion"))) if t},
+            "_vistas": entity_views(entity),
+        }
+        self.nodes[entity_id] = node
+        for tipo in node["_tipos"]:
+            self.by_relation.setdefault(tipo, {})[entity_id] = None
+        for vista in node["_vistas"]:
+            self.views[vista][entity_id] = None
+        for target, tipo in entity_links(entity):
+            self.out_links.setdefault(entity_id, {}).setdefault(tipo, {})[target] = None
+            self.in_links.setdefault(target, {}).setdefault(tipo, {})[entity_id] = None
+
+    def remove(self, entity_id: str) -> None:
+        node = self.nodes.pop(entity_id, None)
+        if node is None:
+            return
+        for tipo in node["_tipos"]:
+            bucket = self.by_relation.get(tipo)
+            if bucket is not None:
+                bucket.pop(entity_id, None)
+                if not bucket:
+                    del self.by_relation[tipo]
+        for vista in node["_vistas"]:
+            self.views[vista].pop(entity_id, None)
+        for tipo, targets in self.out_links.pop(entity_id, {}).items():
+            for target in targets:
+                incoming = self.in_links.get(target, {}).get(tipo)
+                if incoming is not None:
+                    incoming.pop(entity_id, None)
+                    if not incoming:
+                        del self.in_links[target][tipo]
+                        if not self.in_links[target]:
+                            del self.in_links[target]
+
+    def public(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        node = self.nodes.get(entity_id)
+        if node is None:
+            return None
+        return {k: v for k, v in node.items() if not k.startswith("_")}
+
+
+class RelationshipIndex:
+    """
+    Índice de adyacencia por cliente sobre las entidades y sus relaciones.
+
+    - by_relation(cliente, tipo): entidades con ese tipo_entidad o tipo_relacion.
+    - view(cliente, vista): vistas precalculadas "familia", "trabajo", "emergencia".
+    - related(cliente, entidad): vecinos por tipo desde datos_entidad["relaciones"]
+      (salientes y entrantes, p. ej. jefe -> empresa).
+
+    Todas son búsquedas en dicts (microsegundos). Cada cliente se carga del almacén
+    en su primera consulta y después se actualiza en cada escritura con los
+    listeners del almacén, entidad por entidad.
+    """
+
+    def __init__(self, store: EntityStore):
+        self.store = store
+        self._clients: Dict[str, _ClientGraph] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        store.add_listener(self._on_store_event)
+
+    def _on_store_event(self, event: str, entity: Dict[str, Any]) -> None:
+        key = str(entity["id_cliente"])
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            graph = self._clients.get(key)
+            if graph is None:
+                return
+            if event == "reload":
+                del self._clients[key]
+            elif event == "delete" or entity.get("estado") != "activo":
+                graph.remove(entity["id"])
+            else:
+                graph.add(entity)
+
+    def _client(self, id_cliente: str) -> _ClientGraph:
+        key = str(id_cliente)
+        with self._lock:
+            graph = self._clients.get(key)
+            version = self._versions.get(key, 0)
+        if graph is not None:
+            return graph
+        loaded = _ClientGraph()
+        for entity in self.store.find(key, estado="activo"):
+            loaded.add(entity)
+        with self._lock:
+            if self._versions.get(key, 0) != version:
+                return loaded
+            return self._clients.setdefault(key, loaded)
+
+    def _nodes(self, graph: _ClientGraph, ids) -> List[Dict[str, Any]]:
+        return [node for node in (graph.public(i) for i in ids) if node is not None]
+
+    def by_relation(self, id_cliente: str, tipo: str) -> List[Dict[str, Any]]:
+        graph = self._client(id_cliente)
+        with self._lock:
+            return self._nodes(graph, list(graph.by_relation.get(relation_key(tipo), ())))
+
+    def view(self, id_cliente: str, vista: str) -> List[Dict[str, Any]]:
+        if vista not in VISTAS:
+            raise ValueError(f"Vista desconocida: {vista}")
+        graph = self._client(id_cliente)
+        with self._lock:
+            return self._nodes(graph, list(graph.views[vista]))
+
+    def related(self, id_cliente: str, entity_id: str, tipo: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Vecinos de una entidad agrupados por tipo de relación (las entrantes con prefijo "<-")."""
+        graph = self._client(id_cliente)
+        wanted = relation_key(tipo) if tipo else None
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        with self._lock:
+            for prefix, links in (("", graph.out_links.get(entity_id, {})), ("<-", graph.in_links.get(entity_id, {}))):
+                for rel, ids in links.items():
+                    if wanted is None or rel == wanted:
+                        nodes = self._nodes(graph, list(ids))
+                        if nodes:
+                            result[prefix + rel] = nodes
+        return result
+
+    def close(self) -> None:
+        self.store.remove_listener(self._on_store_event)
+
+
+_index: Optional[RelationshipIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_relationship_index() -> RelationshipIndex:
+    """Índice de relaciones del almacén compartido (se rehace si se reemplazó el almacén)."""
+    global _index
+    store = get_entity_store()
+    with _index_lock:
+        if _index is None or _index.store is not store:
+            if _index is not None:
+                _index.close()
+            _index = RelationshipIndex(store)
+        return _index
+
+
+def emergency_contacts(id_cliente: str) -> List[Dict[str, Any]]:
+    """Contactos de emergencia del cliente (vista precalculada)."""
+    return get_relationship_index().view(id_cliente, "emergencia")
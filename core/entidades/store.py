@@ -0,0 +1,642 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import uuid
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from core.cache.single_flight import SingleFlight
+from core.utils.sqlite_pool import SQLitePool
+from core.utils.text_utils import normalize_name
+
+# Campos de una entidad (mismo orden que EntidadModel)
+ENTITY_FIELDS = [
+    "id", "id_cliente", "tipo_entidad", "nombre_entidad", "datos_entidad",
+    "tipo_relacion", "estado", "created_at", "modified_at",
+]
+
+# Campos con índice secundario dentro de la partición de cada cliente
+INDEXED_FIELDS = ("tipo_entidad", "nombre_entidad", "estado")
+
+
+def index_key(field: str, value: Any) -> Optional[str]:
+    """Clave de índice: tipo y nombre normalizados ("Jefe" == "jefe"), estado tal cual."""
+    if value is None:
+        return None
+    if field == "estado":
+        return str(value)
+    return normalize_name(str(value))
+
+
+def new_entity(id_cliente: str, entity_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Arma una entidad nueva con los valores por defecto de entidades_function."""
+    now = datetime.now()
+    return {
+        "id": str(uuid.uuid4()),
+        "id_cliente": str(id_cliente),
+        "tipo_entidad": entity_data.get("tipo_entidad", "Concepto"),
+        "nombre_entidad": entity_data.get("nombre_entidad", ""),
+        "datos_entidad": entity_data.get("datos_entidad", {}),
+        "tipo_relacion": entity_data.get("tipo_relacion"),
+        "estado": entity_data.get("estado", "activo"),
+        "created_at": now,
+        "modified_at": now,
+    }
+
+
+class EntityStore(ABC):
+    """
+    Almacén de entidades particionado por cliente.
+    Las búsquedas siempre van acotadas a un id_cliente y usan los índices
+    secundarios de INDEXED_FIELDS; nunca recorren las entidades de otros clientes.
+
+    Los listeners (add_listener) reciben ("put", entidad) o ("delete", entidad)
+    después de cada escritura; así se mantienen índices derivados (alias,
+    menciones) sin releer el almacén. Dentro de transaction() se notifica en el
+    momento, y si la transacción se revierte llega ("reload", {"id_cliente": ...})
+    por cada cliente tocado, para que el listener descarte lo que tenga de él.
+    """
+
+    def __init__(self):
+        self._listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def add_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Dict[str, Any]], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event: str, entity: Dict[str, Any]) -> None:
+        for listener in list(self._listeners):
+            listener(event, entity)
+
+    @contextmanager
+    def transaction(self) -> Iterator["EntityStore"]:
+        """Agrupa varias operaciones: todas se confirman o ninguna. Anidada, se une a la externa."""
+        yield self
+
+    def _notify_rollback(self, clients: Iterable[str]) -> None:
+        for id_cliente in clients:
+            self._notify("reload", {"id_cliente": id_cliente})
+
+    @abstractmethod
+    def put(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get(self, entity_id: str, id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Entidad por id; con id_cliente, sólo si pertenece a ese cliente (igual en update / delete)."""
+
+    @abstractmethod
+    def update(self, entity_id: str, changes: Dict[str, Any],
+               id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def delete(self, entity_id: str, id_cliente: Optional[str] = None) -> bool:
+        ...
+
+    @abstractmethod
+    def find(self, id_cliente: str, tipo_entidad: Optional[str] = None, nombre: Optional[str] = None,
+             estado: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        ...
+
+    def find_many(self, ids_cliente: Iterable[str], estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Entidades de varios clientes (lecturas por bloques de jobs batch)."""
+        return [entity for id_cliente in ids_cliente for entity in self.find(id_cliente, estado=estado)]
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def _apply_changes(entity: Dict[str, Any], changes: Dict[str, Any]) -> Dict[str, Any]:
+        updated = dict(entity)
+        updated.update({k: v for k, v in changes.items() if k not in ("id", "id_cliente", "created_at")})
+        updated["modified_at"] = datetime.now()
+        return updated
+
+
+class _ClientPartition:
+    """Entidades de un cliente más sus índices (dicts como conjuntos ordenados por inserción)."""
+
+    __slots__ = ("by_id", "indexes")
+
+    def __init__(self):
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.indexes: Dict[str, Dict[str, Dict[str, None]]] = {f: {} for f in INDEXED_FIELDS}
+
+    def add(self, entity: Dict[str, Any]) -> None:
+        """Agrega o reemplaza en el lugar (conserva el orden de inserción de la entidad)."""
+        previous = self.by_id.get(entity["id"])
+        self.by_id[entity["id"]] = entity
+        for field in INDEXED_FIELDS:
+            key = index_key(field, entity.get(field))
+            old_key = index_key(field, previous.get(field)) if previous is not None else None
+            if previous is not None and old_key == key:
+                continue
+            if old_key is not None:
+                self._unindex(field, old_key, entity["id"])
+            if key is not None:
+                self.indexes[field].setdefault(key, {})[entity["id"]] = None
+
+    def _unindex(self, field: str, key: str, entity_id: str) -> None:
+        bucket = self.indexes[field].get(key)
+        if bucket is not None:
+            bucket.pop(entity_id, None)
+            if not bucket:
+                del self.indexes[field][key]
+
+    def copy(self) -> "_ClientPartition":
+        clone = _ClientPartition()
+        clone.by_id = dict(self.by_id)
+        clone.indexes = {f: {k: dict(b) for k, b in idx.items()} for f, idx in self.indexes.items()}
+        return clone
+
+    def remove(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        entity = self.by_id.pop(entity_id, None)
+        if entity is None:
+            return None
+        for field in INDEXED_FIELDS:
+            key = index_key(field, entity.get(field))
+            if key is not None:
+                self._unindex(field, key, entity_id)
+        return entity
+
+
+class InMemoryEntityStore(EntityStore):
+    """Almacén en memoria: find() cuesta O(resultado) intersecando desde el índice más chico."""
+
+    def __init__(self):
+        super().__init__()
+        self._partitions: Dict[str, _ClientPartition] = {}
+        self._owner: Dict[str, str] = {}  # id de entidad -> id_cliente
+        self._lock = threading.RLock()
+        # Durante una transacción: copia previa de cada partición tocada (None si no existía)
+        self._undo: Optional[Dict[str, Optional[_ClientPartition]]] = None
+
+    @contextmanager
+    def transaction(self) -> Iterator["InMemoryEntityStore"]:
+        with self._lock:
+            if self._undo is not None:
+                yield self
+                return
+            self._undo = {}
+            try:
+                yield self
+            except BaseException:
+                undo, self._undo = self._undo, None
+                for id_cliente, saved in undo.items():
+                    current = self._partitions.pop(id_cliente, None)
+                    for entity_id in (current.by_id if current else ()):
+                        self._owner.pop(entity_id, None)
+                    if saved is not None:
+                        self._partitions[id_cliente] = saved
+                        for entity_id in saved.by_id:
+                            self._owner[entity_id] = id_cliente
+                self._notify_rollback(undo)
+                raise
+            self._undo = None
+
+    def _touch(self, id_cliente: Optional[str]) -> None:
+        if self._undo is not None and id_cliente is not None and id_cliente not in self._undo:
+            partition = self._partitions.get(id_cliente)
+            self._undo[id_cliente] = partition.copy() if partition is not None else None
+
+    def put(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        entity = dict(entity)
+        entity["id_cliente"] = str(entity["id_cliente"])
+        with self._lock:
+            owner = self._owner.get(entity["id"])
+            self._touch(owner)
+            self._touch(entity["id_cliente"])
+            previous = self._remove(entity["id"]) if owner not in (None, entity["id_cliente"]) else None
+            self._partitions.setdefault(entity["id_cliente"], _ClientPartition()).add(entity)
+            self._owner[entity["id"]] = entity["id_cliente"]
+        if previous is not None:
+            self._notify("delete", dict(previous))
+        self._notify("put", dict(entity))
+        return dict(entity)
+
+    def get(self, entity_id: str, id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            owner = self._owner.get(entity_id)
+            if owner is None or (id_cliente is not None and owner != str(id_cliente)):
+                return None
+            return dict(self._partitions[owner].by_id[entity_id])
+
+    def update(self, entity_id: str, changes: Dict[str, Any],
+               id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            current = self.get(entity_id, id_cliente)
+            if current is None:
+                return None
+            return self.put(self._apply_changes(current, changes))
+
+    def delete(self, entity_id: str, id_cliente: Optional[str] = None) -> bool:
+        with self._lock:
+            owner = self._owner.get(entity_id)
+            if owner is None or (id_cliente is not None and owner != str(id_cliente)):
+                return False
+            self._touch(owner)
+            entity = self._remove(entity_id)
+        if entity is None:
+            return False
+        self._notify("delete", dict(entity))
+        return True
+
+    def _remove(self, entity_id: str) -> Optional[Dict[str, Any]]:
+        owner = self._owner.pop(entity_id, None)
+        if owner is None:
+            return None
+        partition = self._partitions[owner]
+        entity = partition.remove(entity_id)
+        if not partition.by_id:
+            del self._partitions[owner]
+        return entity
+
+    def find(self, id_cliente: str, tipo_entidad: Optional[str] = None, nombre: Optional[str] = None,
+             estado: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        filters = {"tipo_entidad": tipo_entidad, "nombre_entidad": nombre, "estado": estado}
+        with self._lock:
+            partition = self._partitions.get(str(id_cliente))
+            if partition is None:
+                return []
+            buckets = [
+                partition.indexes[field].get(index_key(field, value), {})
+                for field, value in filters.items() if value is not None
+            ]
+            if not buckets:
+                ids = partition.by_id
+            else:
+                buckets.sort(key=len)
+                ids = (i for i in buckets[0] if all(i in b for b in buckets[1:]))
+            result = []
+            for entity_id in ids:
+                if limit is not None and len(result) >= limit:
+                    break
+                result.append(dict(partition.by_id[entity_id]))
+            return result
+
+
+_SQLITE_DDL = """
+CREATE TABLE IF NOT EXISTS entidades (
+    id TEXT PRIMARY KEY,
+    id_cliente TEXT NOT NULL,
+    tipo_entidad TEXT,
+    tipo_norm TEXT,
+    nombre_entidad TEXT,
+    nombre_norm TEXT,
+    datos_entidad TEXT,
+    tipo_relacion TEXT,
+    estado TEXT,
+    created_at TEXT,
+    modified_at TEXT
+)
+"""
+
+_SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_entidades_cliente_tipo ON entidades (id_cliente, tipo_norm)",
+    "CREATE INDEX IF NOT EXISTS ix_entidades_cliente_nombre ON entidades (id_cliente, nombre_norm)",
+    "CREATE INDEX IF NOT EXISTS ix_entidades_cliente_estado ON entidades (id_cliente, estado)",
+]
+
+_SQLITE_COLUMNS = [
+    "id", "id_cliente", "tipo_entidad", "tipo_norm", "nombre_entidad", "nombre_norm",
+    "datos_entidad", "tipo_relacion", "estado", "created_at", "modified_at",
+]
+
+_SQL_SELECT = f"SELECT {', '.join(_SQLITE_COLUMNS)} FROM entidades"
+_SQL_GET = f"{_SQL_SELECT} WHERE id = ?"
+# ON CONFLICT ... DO UPDATE (y no INSERT OR REPLACE) conserva el rowid: el orden de find() no cambia
+_SQL_UPSERT = (
+    f"INSERT INTO entidades ({', '.join(_SQLITE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in _SQLITE_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in _SQLITE_COLUMNS[1:])}"
+)
+_SQL_DELETE = "DELETE FROM entidades WHERE id = ?"
+# Variantes acotadas al cliente (leer / actualizar / eliminar desde las tools)
+_SQL_GET_CLIENTE = f"{_SQL_GET} AND id_cliente = ?"
+_SQL_DELETE_CLIENTE = f"{_SQL_DELETE} AND id_cliente = ?"
+
+# Clientes por consulta IN en find_many
+_IN_CHUNK = 500
+
+
+def _to_row(entity: Dict[str, Any]) -> tuple:
+    values = dict(entity)
+    values["id_cliente"] = str(values["id_cliente"])
+    values["tipo_norm"] = index_key("tipo_entidad", values.get("tipo_entidad"))
+    values["nombre_norm"] = index_key("nombre_entidad", values.get("nombre_entidad"))
+    values["datos_entidad"] = json.dumps(values.get("datos_entidad"), default=str)
+    for col in ("created_at", "modified_at"):
+        if isinstance(values.get(col), datetime):
+            values[col] = values[col].isoformat()
+    return tuple(values.get(col) for col in _SQLITE_COLUMNS)
+
+
+def _from_row(row: tuple) -> Dict[str, Any]:
+    values = dict(zip(_SQLITE_COLUMNS, row))
+    values.pop("tipo_norm")
+    values.pop("nombre_norm")
+    values["datos_entidad"] = json.loads(values["datos_entidad"]) if values["datos_entidad"] else None
+    for col in ("created_at", "modified_at"):
+        if values.get(col):
+            values[col] = datetime.fromisoformat(values[col])
+    return values
+
+
+class SQLiteEntityStore(EntityStore):
+    """
+    Almacén persistente sobre SQLite (WAL) para ejecuciones locales, con un pool de
+    conexiones compartido entre tools y sentencias preparadas de texto fijo.
+    Guarda tipo y nombre normalizados en columnas propias, indexadas junto con id_cliente.
+
+    get() y find() idénticos y concurrentes (fuera de una transacción) comparten
+    una sola consulta; cada escritura desacopla las consultas en vuelo del cliente.
+    """
+
+    def __init__(self, path: str = ":memory:", pool_size: int = 4, read_timeout: Optional[float] = 5.0):
+        super().__init__()
+        self.path = path
+        self._pool = SQLitePool(path, size=pool_size)
+        self._tx = threading.local()  # conexión y clientes tocados de la transacción del hilo
+        self._flight = SingleFlight(timeout=read_timeout)
+        with self._pool.transaction() as conn:
+            conn.execute(_SQLITE_DDL)
+            for ddl in _SQLITE_INDEXES:
+                conn.execute(ddl)
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteEntityStore"]:
+        if getattr(self._tx, "conn", None) is not None:
+            yield self
+            return
+        clients: set = set()
+        try:
+            with self._pool.transaction() as conn:
+                self._tx.conn, self._tx.clients = conn, clients
+                try:
+                    yield self
+                finally:
+                    self._tx.conn = self._tx.clients = None
+        except BaseException:
+            self._notify_rollback(clients)
+            raise
+
+    @contextmanager
+    def _connection(self, write: bool = False) -> Iterator[Any]:
+        """La conexión de la transacción en curso del hilo o, si no hay, una del pool."""
+        conn = getattr(self._tx, "conn", None)
+        if conn is not None:
+            yield conn
+        elif write:
+            with self._pool.transaction() as conn:
+                yield conn
+        else:
+            with self._pool.connection() as conn:
+                yield conn
+
+    def _read(self, key: tuple, sql: str, params: Any) -> List[tuple]:
+        """Filas de una lectura; fuera de transacción, coalescida con las idénticas en vuelo."""
+        if getattr(self._tx, "conn", None) is not None:
+            # La transacción del hilo ve sus propias escrituras: no se comparte
+            return self._tx.conn.execute(sql, params).fetchall()
+
+        def query() -> List[tuple]:
+            with self._pool.connection() as conn:
+                return conn.execute(sql, params).fetchall()
+
+        return self._flight.do(key, query)
+
+    def _changed(self, event: str, entity: Dict[str, Any]) -> None:
+        id_cliente, entity_id = entity["id_cliente"], entity.get("id")
+        self._flight.forget_where(lambda k: k[1] == (entity_id if k[0] == "get" else id_cliente))
+        clients = getattr(self._tx, "clients", None)
+        if clients is not None:
+            clients.add(entity["id_cliente"])
+        self._notify(event, entity)
+
+    def put(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        row = _to_row(entity)
+        with self._connection(write=True) as conn:
+            previous = conn.execute(_SQL_GET, (row[0],)).fetchone()
+            conn.execute(_SQL_UPSERT, row)
+        if previous is not None and previous[1] != row[1]:
+            self._changed("delete", _from_row(previous))
+        entity = _from_row(row)
+        self._changed("put", entity)
+        return dict(entity)
+
+    def get(self, entity_id: str, id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        if id_cliente is None:
+            rows = self._read(("get", entity_id), _SQL_GET, (entity_id,))
+        else:
+            rows = self._read(("get", entity_id, str(id_cliente)), _SQL_GET_CLIENTE, (entity_id, str(id_cliente)))
+        return _from_row(rows[0]) if rows else None
+
+    @staticmethod
+    def _get_for_write(conn: Any, entity_id: str, id_cliente: Optional[str]) -> Optional[tuple]:
+        if id_cliente is None:
+            return conn.execute(_SQL_GET, (entity_id,)).fetchone()
+        return conn.execute(_SQL_GET_CLIENTE, (entity_id, str(id_cliente))).fetchone()
+
+    def update(self, entity_id: str, changes: Dict[str, Any],
+               id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        with self._connection(write=True) as conn:
+            row = self._get_for_write(conn, entity_id, id_cliente)
+            if row is None:
+                return None
+            new_row = _to_row(self._apply_changes(_from_row(row), changes))
+            conn.execute(_SQL_UPSERT, new_row)
+        entity = _from_row(new_row)
+        self._changed("put", entity)
+        return dict(entity)
+
+    def delete(self, entity_id: str, id_cliente: Optional[str] = None) -> bool:
+        with self._connection(write=True) as conn:
+            row = self._get_for_write(conn, entity_id, id_cliente)
+            if row is None:
+                return False
+            if id_cliente is None:
+                conn.execute(_SQL_DELETE, (entity_id,))
+            else:
+                conn.execute(_SQL_DELETE_CLIENTE, (entity_id, str(id_cliente)))
+        self._changed("delete", _from_row(row))
+        return True
+
+    def find(self, id_cliente: str, tipo_entidad: Optional[str] = None, nombre: Optional[str] = None,
+             estado: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Como mucho 8 textos de SQL distintos (filtros presentes), preparados una vez por conexión
+        where, params = ["id_cliente = ?"], [str(id_cliente)]
+        for column, value in (("tipo_norm", index_key("tipo_entidad", tipo_entidad)),
+                              ("nombre_norm", index_key("nombre_entidad", nombre)),
+                              ("estado", estado)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        params.append(-1 if limit is None else int(limit))
+        sql = f"{_SQL_SELECT} WHERE {' AND '.join(where)} ORDER BY rowid LIMIT ?"
+        # Cada llamador arma sus propios dicts a partir de las filas compartidas
+        rows = self._read(("find", str(id_cliente), sql, tuple(params)), sql, params)
+        return [_from_row(r) for r in rows]
+
+    def find_many(self, ids_cliente: Iterable[str], estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        # Una consulta IN por cada _IN_CHUNK clientes (lejos del límite de parámetros de SQLite)
+        ids = [str(i) for i in ids_cliente]
+        rows: List[tuple] = []
+        with self._connection() as conn:
+            for start in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[start:start + _IN_CHUNK]
+                where = f"id_cliente IN ({', '.join('?' * len(chunk))})" + (" AND estado = ?" if estado else "")
+                params = chunk + ([estado] if estado else [])
+                rows.extend(conn.execute(f"{_SQL_SELECT} WHERE {where} ORDER BY rowid", params).fetchall())
+        return [_from_row(r) for r in rows]
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def _to_record(entity: Dict[str, Any]) -> Dict[str, Any]:
+    record = {field: entity.get(field) for field in ENTITY_FIELDS}
+    record["id_cliente"] = str(record["id_cliente"])
+    for col in ("created_at", "modified_at"):
+        if isinstance(record.get(col), datetime):
+            record[col] = record[col].isoformat()
+    return record
+
+
+def _from_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    values = {field: record.get(field) for field in ENTITY_FIELDS}
+    values["id_cliente"] = str(values["id_cliente"])
+    for col in ("created_at", "modified_at"):
+        if isinstance(values.get(col), str):
+            values[col] = datetime.fromisoformat(values[col])
+    return values
+
+
+class SupabaseEntityStore(EntityStore):
+    """
+    Almacén sobre la tabla 'entidades' de Supabase, con el cliente compartido de
+    core.repositorios. La tabla no tiene tipo y nombre normalizados: find() filtra
+    por cliente y estado en el servidor, y por tipo / nombre al recorrer las filas.
+    Sin transacciones: cada operación se confirma por separado.
+    """
+
+    def __init__(self, client: Optional[Any] = None, table: str = "entidades"):
+        super().__init__()
+        self._client = client
+        self.table = table
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            from core.repositorios.supabase_backend import get_supabase_client
+            self._client = get_supabase_client()
+        return self._client
+
+    def _table(self) -> Any:
+        return self.client.table(self.table)
+
+    @staticmethod
+    def _scoped(query: Any, entity_id: str, id_cliente: Optional[str]) -> Any:
+        query = query.eq("id", entity_id)
+        return query if id_cliente is None else query.eq("id_cliente", str(id_cliente))
+
+    def put(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        record = _to_record(entity)
+        previous = self.get(record["id"])
+        entity = _from_record(self._table().upsert(record).execute().data[0])
+        if previous is not None and previous["id_cliente"] != entity["id_cliente"]:
+            self._notify("delete", previous)
+        self._notify("put", dict(entity))
+        return dict(entity)
+
+    def get(self, entity_id: str, id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        rows = self._scoped(self._table().select("*"), entity_id, id_cliente).limit(1).execute().data
+        return _from_record(rows[0]) if rows else None
+
+    def update(self, entity_id: str, changes: Dict[str, Any],
+               id_cliente: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        current = self.get(entity_id, id_cliente)
+        if current is None:
+            return None
+        return self.put(self._apply_changes(current, changes))
+
+    def delete(self, entity_id: str, id_cliente: Optional[str] = None) -> bool:
+        rows = self._scoped(self._table().delete(), entity_id, id_cliente).execute().data
+        if not rows:
+            return False
+        self._notify("delete", _from_record(rows[0]))
+        return True
+
+    def _fetch(self, column: str, values: Any, estado: Optional[str]) -> Iterator[Dict[str, Any]]:
+        from core.repositorios.supabase_backend import fetch_all
+
+        def build() -> Any:
+            query = self._table().select("*")
+            query = query.in_(column, values) if isinstance(values, list) else query.eq(column, values)
+            if estado is not None:
+                query = query.eq("estado", estado)
+            # Orden total para paginar con .range(): alta y, para desempatar, id
+            return query.order("created_at").order("id")
+
+        return (_from_record(row) for row in fetch_all(build))
+
+    def find(self, id_cliente: str, tipo_entidad: Optional[str] = None, nombre: Optional[str] = None,
+             estado: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        filters = [(field, index_key(field, value))
+                   for field, value in (("tipo_entidad", tipo_entidad), ("nombre_entidad", nombre))
+                   if value is not None]
+        result = []
+        for entity in self._fetch("id_cliente", str(id_cliente), estado):
+            if limit is not None and len(result) >= limit:
+                break
+            if all(index_key(field, entity.get(field)) == key for field, key in filters):
+                result.append(entity)
+        return result
+
+    def find_many(self, ids_cliente: Iterable[str], estado: Optional[str] = None) -> List[Dict[str, Any]]:
+        ids = [str(i) for i in ids_cliente]
+        result: List[Dict[str, Any]] = []
+        for start in range(0, len(ids), _IN_CHUNK):
+            result.extend(self._fetch("id_cliente", ids[start:start + _IN_CHUNK], estado))
+        return result
+
+
+_store: Optional[EntityStore] = None
+_store_lock = threading.Lock()
+
+
+def _default_store() -> EntityStore:
+    # Sin ZENDA_ENTIDADES_BACKEND sigue a ZENDA_DB_BACKEND: con la base real no se lee el SQLite local
+    backend = os.getenv("ZENDA_ENTIDADES_BACKEND") or os.getenv("ZENDA_DB_BACKEND", "sqlite")
+    if backend == "memory":
+        return InMemoryEntityStore()
+    if backend == "supabase":
+        return SupabaseEntityStore()
+    data_dir = os.getenv("ZENDA_DATA_DIR", "data")
+    return SQLiteEntityStore(os.path.join(data_dir, "entidades.db"))
+
+
+def get_entity_store() -> EntityStore:
+    """
+    Almacén compartido de entidades: una única instancia para entidades_tool y
+    save_context_info_tool (SQLite local por defecto, Supabase con ZENDA_DB_BACKEND=supabase,
+    ZENDA_ENTIDADES_BACKEND=memory para tests).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _default_store()
+    return _store
+
+
+def set_entity_store(store: Optional[EntityStore]) -> None:
+    """Reemplaza el almacén compartido (tests, o para inyectar otro backend)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,6 @@
+# Zenda - core/repositorios/__init__.py
+
+from .base import TABLAS, Backend, Repository, column_kind, json_value
+from .sqlite_backend import SQLiteBackend, SQLiteRepository
+from .supabase_backend import PAGE_SIZE, SupabaseBackend, SupabaseRepository, fetch_all, get_supabase_client
+from .registry import get_backend, get_repository, set_backend
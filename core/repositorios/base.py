@@ -0,0 +1,151 @@
+import typing
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from schemas import (ClienteModel, CtacteModel, EspecialidadModel, MarketingModel, PautaModel, QaModel, SesionModel, TarifaModel, TemaEspecialidadModel, TemaModel, TokenModel)
+
+# Tabla -> (modelo, clave primaria). bitacora y entidades no están: tienen sus propios
+# almacenes (core.bitacora y core.entidades) y una copia acá divergiría de ellos. Ambos
+# siguen a ZENDA_DB_BACKEND y, en Supabase, usan el mismo cliente (get_supabase_client).
+TABLAS: Dict[str, Tuple[Type[BaseModel], str]] = {
+    "clientes": (ClienteModel, "id_cliente"),
+    "sesiones": (SesionModel, "id_sesion"),
+    "qa": (QaModel, "id"),
+    "ctacte": (CtacteModel, "id"),
+    "tokens": (TokenModel, "id_token"),
+    "especialidades": (EspecialidadModel, "id_especialidad"),
+    "marketing": (MarketingModel, "cod_mktg"),
+    "tarifas": (TarifaModel, "id"),
+    "pautas": (PautaModel, "codigo"),
+    "temas": (TemaModel, "id_tema"),
+    "tema_especialidad": (TemaEspecialidadModel, "id"),
+}
+
+# Valores por consulta IN en find_in
+IN_CHUNK = 500
+
+
+def column_kind(annotation: Any) -> str:
+    """Tipo de columna de un campo del modelo: "json", "bool", "int", "float" o "text"."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return column_kind(args[0]) if len(args) == 1 else "text"
+    if origin is typing.Literal:
+        return column_kind(type(typing.get_args(annotation)[0]))
+    if annotation in (dict, list) or origin in (dict, list):
+        return "json"
+    if annotation is bool:
+        return "bool"
+    if annotation is int:
+        return "int"
+    if annotation is float:
+        return "float"
+    return "text"
+
+
+def json_value(value: Any) -> Any:
+    """Valor serializable como lo guarda PostgREST (UUID y fechas como texto ISO)."""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_value(v) for v in value]
+    return value
+
+
+class Repository(ABC):
+    """
+    Acceso a una tabla de schemas, igual para todos los backends.
+
+    Las filas son dicts con los valores como los devuelve PostgREST (UUID y fechas
+    como texto, jsonb como dict/list); to_model() las valida con el modelo de la
+    tabla. Los nombres de columna se validan contra el modelo: nunca llegan al
+    SQL / a la consulta sin pasar por esa lista.
+    """
+
+    def __init__(self, tabla: str):
+        if tabla not in TABLAS:
+            raise ValueError(f"Tabla desconocida: {tabla}")
+        self.tabla = tabla
+        self.model, self.key = TABLAS[tabla]
+        self.columns: List[str] = list(self.model.model_fields)
+        self.kinds: Dict[str, str] = {name: column_kind(field.annotation)
+                                      for name, field in self.model.model_fields.items()}
+
+    def _check_columns(self, names: Iterable[str]) -> None:
+        unknown = [n for n in names if n not in self.kinds]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas en {self.tabla}: {unknown}")
+
+    def _select_columns(self, columns: Optional[Sequence[str]]) -> List[str]:
+        if columns is None:
+            return self.columns
+        columns = list(columns)
+        self._check_columns(columns)
+        return columns
+
+    def to_model(self, row: Dict[str, Any]) -> BaseModel:
+        return self.model.model_validate(row)
+
+    @abstractmethod
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def upsert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Inserta o reemplaza la fila completa (las columnas que faltan quedan en NULL)."""
+
+    @abstractmethod
+    def update(self, key: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: Any) -> bool:
+        ...
+
+    @abstractmethod
+    def find(self, filters: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+             desc: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Filas que cumplen los filtros de igualdad."""
+
+    @abstractmethod
+    def find_in(self, column: str, values: Iterable[Any], filters: Optional[Dict[str, Any]] = None,
+                order_by: Optional[str] = None, desc: bool = False, columns: Optional[Sequence[str]] = None,
+                not_null: Iterable[str] = (), first_per_value: bool = False) -> List[Dict[str, Any]]:
+        """
+        Filas con column IN values (una consulta cada IN_CHUNK valores); order_by vale dentro
+        de cada bloque. columns limita las columnas devueltas, not_null exige columnas no nulas
+        y first_per_value deja sólo la primera fila (según order_by) de cada valor de column.
+        """
+
+
+class Backend(ABC):
+    """Conexión compartida (pool) y un repositorio por tabla."""
+
+    def __init__(self):
+        self._repositories: Dict[str, Repository] = {}
+
+    def repository(self, tabla: str) -> Repository:
+        repo = self._repositories.get(tabla)
+        if repo is None:
+            repo = self._repositories.setdefault(tabla, self._make_repository(tabla))
+        return repo
+
+    @abstractmethod
+    def _make_repository(self, tabla: str) -> Repository:
+        ...
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,41 @@
+import os
+import threading
+from typing import Optional
+
+from core.repositorios.base import Backend, Repository
+from core.repositorios.sqlite_backend import SQLiteBackend
+from core.repositorios.supabase_backend import SupabaseBackend
+
+_backend: Optional[Backend] = None
+_backend_lock = threading.Lock()
+
+
+def _default_backend() -> Backend:
+    if os.getenv("ZENDA_DB_BACKEND", "sqlite") == "supabase":
+        return SupabaseBackend()
+    data_dir = os.getenv("ZENDA_DATA_DIR", "data")
+    return SQLiteBackend(os.path.join(data_dir, "zenda.db"))
+
+
+def get_backend() -> Backend:
+    """
+    Backend compartido por todas las tools: SQLite local por defecto
+    (ZENDA_DATA_DIR/zenda.db), ZENDA_DB_BACKEND=supabase para la base real.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _default_backend()
+    return _backend
+
+
+def set_backend(backend: Optional[Backend]) -> None:
+    """Reemplaza el backend compartido (tests / benchmarks); None vuelve al de por defecto."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def get_repository(tabla: str) -> Repository:
+    return get_backend().repository(tabla)
@@ -0,0 +1,176 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from core.repositorios.base import IN_CHUNK, Backend, Repository, json_value
+from core.utils.sqlite_pool import SQLitePool
+
+_SQL_TYPES = {"json": "TEXT", "bool": "INTEGER", "int": "INTEGER", "float": "REAL", "text": "TEXT"}
+
+# Columnas con índice secundario cuando la tabla las tiene
+_INDEXED = ("id_cliente", "session_id")
+
+
+class SQLiteRepository(Repository):
+    """
+    Repositorio sobre una tabla SQLite creada a partir del modelo.
+
+    Todo el SQL es parametrizado y de texto estable (uno por operación y forma de
+    filtro), así lo reutiliza la caché de sentencias preparadas de cada conexión.
+    Una clave primaria entera que falta en insert() la asigna SQLite (rowid).
+    """
+
+    def __init__(self, backend: "SQLiteBackend", tabla: str):
+        super().__init__(tabla)
+        self._pool = backend.pool
+        definitions = ", ".join(f"{c} {_SQL_TYPES[self.kinds[c]]}{' PRIMARY KEY' if c == self.key else ''}"
+                                for c in self.columns)
+        with self._pool.transaction() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {tabla} ({definitions})")
+            for column in _INDEXED:
+                if column in self.kinds and column != self.key:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{tabla}_{column} ON {tabla} ({column})")
+        self._select = f"SELECT {', '.join(self.columns)} FROM {tabla}"
+        self._sql_get = f"{self._select} WHERE {self.key} = ?"
+        self._sql_insert = (f"INSERT INTO {tabla} ({', '.join(self.columns)}) "
+                            f"VALUES ({', '.join('?' * len(self.columns))})")
+        others = [c for c in self.columns if c != self.key]
+        self._sql_upsert = (f"{self._sql_insert} ON CONFLICT({self.key}) DO UPDATE SET "
+                            + ", ".join(f"{c} = excluded.{c}" for c in others))
+        self._sql_delete = f"DELETE FROM {tabla} WHERE {self.key} = ?"
+        self._sql_update: Dict[tuple, str] = {}
+
+    def _encode(self, column: str, value: Any) -> Any:
+        value = json_value(value)
+        if value is not None and self.kinds[column] == "json":
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def _decode(self, row: tuple, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        record = dict(zip(columns or self.columns, row))
+        for column, value in record.items():
+            if value is None:
+                continue
+            kind = self.kinds[column]
+            if kind == "json":
+                record[column] = json.loads(value)
+            elif kind == "bool":
+                record[column] = bool(value)
+        return record
+
+    def _row(self, record: Dict[str, Any]) -> List[Any]:
+        self._check_columns(record)
+        if record.get(self.key) is None and self.kinds[self.key] != "int":
+            raise ValueError(f"Falta la clave {self.key} para {self.tabla}")
+        return [self._encode(c, record.get(c)) for c in self.columns]
+
+    def _where(self, filters: Optional[Dict[str, Any]]) -> tuple:
+        filters = filters or {}
+        self._check_columns(filters)
+        clauses, params = [], []
+        for column in sorted(filters):
+            if filters[column] is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(self._encode(column, filters[column]))
+        return clauses, params
+
+    def _order(self, order_by: Optional[str], desc: bool) -> str:
+        if order_by is None:
+            return " ORDER BY rowid"
+        self._check_columns([order_by])
+        return f" ORDER BY {order_by}{' DESC' if desc else ''}"
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            row = conn.execute(self._sql_get, (json_value(key),)).fetchone()
+        return self._decode(row) if row else None
+
+    def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        row = self._row(record)
+        with self._pool.transaction() as conn:
+            cursor = conn.execute(self._sql_insert, row)
+            key = row[self.columns.index(self.key)]
+            stored = conn.execute(self._sql_get, (cursor.lastrowid if key is None else key,)).fetchone()
+        return self._decode(stored)
+
+    def upsert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        row = self._row(record)
+        with self._pool.transaction() as conn:
+            cursor = conn.execute(self._sql_upsert, row)
+            key = row[self.columns.index(self.key)]
+            stored = conn.execute(self._sql_get, (cursor.lastrowid if key is None else key,)).fetchone()
+        return self._decode(stored)
+
+    def update(self, key: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        columns = tuple(sorted(c for c in changes if c != self.key))
+        self._check_columns(columns)
+        if not columns:
+            return self.get(key)
+        sql = self._sql_update.get(columns)
+        if sql is None:
+            sql = self._sql_update.setdefault(columns, f"UPDATE {self.tabla} SET "
+                                              + ", ".join(f"{c} = ?" for c in columns)
+                                              + f" WHERE {self.key} = ?")
+        params = [self._encode(c, changes[c]) for c in columns] + [json_value(key)]
+        with self._pool.transaction() as conn:
+            if conn.execute(sql, params).rowcount == 0:
+                return None
+            stored = conn.execute(self._sql_get, (json_value(key),)).fetchone()
+        return self._decode(stored)
+
+    def delete(self, key: Any) -> bool:
+        with self._pool.transaction() as conn:
+            return conn.execute(self._sql_delete, (json_value(key),)).rowcount > 0
+
+    def find(self, filters: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+             desc: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        clauses, params = self._where(filters)
+        sql = self._select + (f" WHERE {' AND '.join(clauses)}" if clauses else "")
+        sql += self._order(order_by, desc) + " LIMIT ?"
+        params.append(-1 if limit is None else int(limit))
+        with self._pool.connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._decode(r) for r in rows]
+
+    def find_in(self, column: str, values: Iterable[Any], filters: Optional[Dict[str, Any]] = None,
+                order_by: Optional[str] = None, desc: bool = False, columns: Optional[Sequence[str]] = None,
+                not_null: Iterable[str] = (), first_per_value: bool = False) -> List[Dict[str, Any]]:
+        self._check_columns([column])
+        selected = self._select_columns(columns)
+        not_null = list(not_null)
+        self._check_columns(not_null)
+        clauses, params = self._where(filters)
+        clauses += [f"{c} IS NOT NULL" for c in not_null]
+        order = self._order(order_by, desc)
+        names = ", ".join(selected)
+        values = [self._encode(column, v) for v in values]
+        rows: List[tuple] = []
+        with self._pool.connection() as conn:
+            for start in range(0, len(values), IN_CHUNK):
+                chunk = values[start:start + IN_CHUNK]
+                where = " AND ".join([f"{column} IN ({', '.join('?' * len(chunk))})"] + clauses)
+                if first_per_value:
+                    # Primera fila de cada valor según el mismo orden, con una función de ventana
+                    sql = (f"SELECT {names} FROM (SELECT {names}, {order_by or 'rowid'} AS _orden, "
+                           f"ROW_NUMBER() OVER (PARTITION BY {column}{order}) AS _n FROM {self.tabla} "
+                           f"WHERE {where}) WHERE _n = 1 ORDER BY _orden{' DESC' if order_by and desc else ''}")
+                else:
+                    sql = f"SELECT {names} FROM {self.tabla} WHERE {where}{order}"
+                rows.extend(conn.execute(sql, chunk + params).fetchall())
+        return [self._decode(r, selected) for r in rows]
+
+
+class SQLiteBackend(Backend):
+    """Base SQLite local (pruebas offline y benchmarks) con un único pool para todos los repositorios."""
+
+    def __init__(self, path: str = ":memory:", pool_size: int = 4):
+        super().__init__()
+        self.path = path
+        self.pool = SQLitePool(path, size=pool_size)
+
+    def _make_repository(self, tabla: str) -> Repository:
+        return SQLiteRepository(self, tabla)
+
+    def close(self) -> None:
+        self.pool.close()
@@ -0,0 +1,150 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from core.repositorios.base import IN_CHUNK, Backend, Repository, json_value
+
+# Filas por página; no debe superar el max-rows del servidor PostgREST (1000 por defecto)
+PAGE_SIZE = 1000
+
+_client: Any = None
+_client_lock = threading.Lock()
+
+
+def get_supabase_client() -> Any:
+    """
+    Cliente Supabase compartido (SUPABASE_URL / SUPABASE_KEY), creado una sola vez:
+    su sesión HTTP mantiene las conexiones abiertas entre consultas.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from supabase import create_client
+                url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+                if not url or not key:
+                    raise RuntimeError("Variables SUPABASE_URL o SUPABASE_KEY no encontradas")
+                _client = create_client(url, key)
+    return _client
+
+
+def fetch_all(build: Callable[[], Any], page_size: int = PAGE_SIZE, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Todas las filas de una consulta, de a páginas con .range() hasta que vuelve una
+    página corta (PostgREST corta cada respuesta en max-rows sin avisar). build() arma
+    la consulta de nuevo en cada página y debe tener un orden total para que las
+    páginas no se superpongan. start saltea las primeras filas (offset).
+    """
+    while True:
+        page = build().range(start, start + page_size - 1).execute().data
+        yield from page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+
+class SupabaseRepository(Repository):
+    """Repositorio sobre una tabla de Supabase (PostgREST): filtros eq / in_ parametrizados por el cliente."""
+
+    def __init__(self, backend: "SupabaseBackend", tabla: str):
+        super().__init__(tabla)
+        self._backend = backend
+
+    def _table(self) -> Any:
+        return self._backend.client.table(self.tabla)
+
+    def _filtered(self, query: Any, filters: Optional[Dict[str, Any]]) -> Any:
+        filters = filters or {}
+        self._check_columns(filters)
+        for column, value in filters.items():
+            query = query.is_(column, "null") if value is None else query.eq(column, json_value(value))
+        return query
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        rows = self._table().select("*").eq(self.key, json_value(key)).limit(1).execute().data
+        return rows[0] if rows else None
+
+    def insert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_columns(record)
+        return self._table().insert(json_value(record)).execute().data[0]
+
+    def upsert(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        self._check_columns(record)
+        full = {c: record.get(c) for c in self.columns if c in record or c != self.key}
+        return self._table().upsert(json_value(full)).execute().data[0]
+
+    def update(self, key: Any, changes: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        changes = {c: v for c, v in changes.items() if c != self.key}
+        self._check_columns(changes)
+        if not changes:
+            return self.get(key)
+        rows = self._table().update(json_value(changes)).eq(self.key, json_value(key)).execute().data
+        return rows[0] if rows else None
+
+    def delete(self, key: Any) -> bool:
+        return bool(self._table().delete().eq(self.key, json_value(key)).execute().data)
+
+    def _ordered(self, query: Any, order_by: Optional[str], desc: bool) -> Any:
+        # La clave primaria desempata: las páginas de .range() necesitan un orden total
+        if order_by is not None:
+            self._check_columns([order_by])
+            query = query.order(order_by, desc=desc)
+        return query.order(self.key) if order_by != self.key else query
+
+    def find(self, filters: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+             desc: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        def build() -> Any:
+            return self._ordered(self._filtered(self._table().select("*"), filters), order_by, desc)
+
+        if limit is not None:
+            return build().limit(int(limit)).execute().data
+        return list(fetch_all(build))
+
+    def find_in(self, column: str, values: Iterable[Any], filters: Optional[Dict[str, Any]] = None,
+                order_by: Optional[str] = None, desc: bool = False, columns: Optional[Sequence[str]] = None,
+                not_null: Iterable[str] = (), first_per_value: bool = False) -> List[Dict[str, Any]]:
+        self._check_columns([column])
+        selected = self._select_columns(columns)
+        if first_per_value and column not in selected:
+            selected = [column] + selected
+        names = ", ".join(selected)
+        not_null = list(not_null)
+        self._check_columns(not_null)
+        values = [json_value(v) for v in values]
+        rows: List[Dict[str, Any]] = []
+        for start in range(0, len(values), IN_CHUNK):
+            chunk = values[start:start + IN_CHUNK]
+
+            def build() -> Any:
+                query = self._filtered(self._table().select(names).in_(column, chunk), filters)
+                for name in not_null:
+                    query = query.not_.is_(name, "null")
+                return self._ordered(query, order_by, desc)
+
+            if not first_per_value:
+                rows.extend(fetch_all(build))
+                continue
+            # PostgREST no tiene DISTINCT ON: se pagina y se queda la primera fila de cada valor
+            seen = set()
+            for row in fetch_all(build):
+                if row.get(column) not in seen:
+                    seen.add(row.get(column))
+                    rows.append(row)
+        return rows
+
+
+class SupabaseBackend(Backend):
+    """Supabase con un único cliente compartido por todos los repositorios."""
+
+    def __init__(self, client: Any = None):
+        super().__init__()
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = get_supabase_client()
+        return self._client
+
+    def _make_repository(self, tabla: str) -> Repository:
+        return SupabaseRepository(self, tabla)
@@ -0,0 +1,14 @@
+# Zenda - core/session/__init__.py
+
+from .turn_buffer import (CAPACIDAD_TURNOS, TurnRecord, TurnRingBuffer, TurnBufferRegistry, get_turn_buffer, record_turn,
+                          add_turn_listener, drop_turn_buffer)
+from .emotion_trajectory import (EMOCIONES_NEGATIVAS, EmotionTrajectory, EmotionTrajectoryRegistry,
+                                 get_emotion_trajectory, update_emotion_trajectory, drop_emotion_trajectory)
+from .warmup import DEADLINE_DEFAULT, warm_up, warm_up_async, degraded
+from .context_store import (SessionContextStore, VersionConflict, apply_patch, diff_context, unchanged_paths,
+                            get_context_store, drop_session_context)
+from .context_window import (PRESUPUESTO_TURNOS, PRESUPUESTO_RESUMEN, ContextWindow, ContextWindowRegistry,
+                             estimate_tokens, resumen_extractivo, prompt_budget, get_context_window,
+                             new_context_window, fallback_context_window, session_context_window,
+                             drop_context_window)
+from .lifecycle import close_session
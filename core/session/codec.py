@@ -0,0 +1,318 @@
+import struct
+import zlib
+from datetime import date, datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple
+from uuid import UUID
+
+from schemas import SessionContext
+
+try:  # Acelerador opcional: mismo formato, empaquetado en C
+    import msgpack
+except ImportError:  # pragma: no cover - depende del entorno
+    msgpack = None
+
+# Tipos ext de msgpack propios
+EXT_UUID = 1        # 16 bytes
+EXT_DATETIME = 2    # isoformat UTF-8
+EXT_DATE = 3        # isoformat UTF-8
+
+# Valores internados de los campos enumerados: se guardan como índice (1 byte)
+ENUMS: Dict[str, Tuple[str, ...]] = {
+    "fase_actual": ("Inicio_Sesion", "Desarrollo_Sesion", "Cierre_Sesion"),
+    "modo_asistencia": ("Integral", "Rotativo", "Especialidad", "Urgente"),
+    "motivo_tt": ("S", "F"),
+}
+
+MAGIC = b"ZC\x01"
+FIELDS: List[str] = list(SessionContext.model_fields)
+# Huella del esquema: un snapshot de otra versión de SessionContext no se decodifica en silencio
+SCHEMA_CRC = zlib.crc32(",".join(FIELDS).encode())
+_HEADER = MAGIC + struct.pack(">I", SCHEMA_CRC)
+_ENUM_POS = [(FIELDS.index(name), values, {v: i for i, v in enumerate(values)}) for name, values in ENUMS.items()]
+
+
+# --- msgpack en Python puro (mismo formato que msgpack.packb(use_bin_type=True)) ---
+
+_B = struct.Struct(">B")
+_H = struct.Struct(">H")
+_I = struct.Struct(">I")
+_BD = struct.Struct(">Bd")
+_BB = struct.Struct(">BB")
+_BH = struct.Struct(">BH")
+_BI = struct.Struct(">BI")
+_BQ = struct.Struct(">BQ")
+_Bb = struct.Struct(">Bb")
+_Bh = struct.Struct(">Bh")
+_Bi = struct.Struct(">Bi")
+_Bq = struct.Struct(">Bq")
+_FIXINT = [bytes((i,)) for i in range(128)]
+_FIXSTR = [bytes((0xA0 | i,)) for i in range(32)]
+
+
+def _pack_str(obj: str, out: List[bytes]) -> None:
+    data = obj.encode("utf-8")
+    n = len(data)
+    if n < 32:
+        out.append(_FIXSTR[n])
+    elif n < 0x100:
+        out.append(_BB.pack(0xD9, n))
+    elif n < 0x10000:
+        out.append(_BH.pack(0xDA, n))
+    else:
+        out.append(_BI.pack(0xDB, n))
+    out.append(data)
+
+
+def _pack_int(obj: int, out: List[bytes]) -> None:
+    if 0 <= obj < 128:
+        out.append(_FIXINT[obj])
+    elif -32 <= obj < 0:
+        out.append(_B.pack(obj & 0xFF))
+    elif obj >= 0:
+        if obj < 0x100:
+            out.append(_BB.pack(0xCC, obj))
+        elif obj < 0x10000:
+            out.append(_BH.pack(0xCD, obj))
+        elif obj < 0x100000000:
+            out.append(_BI.pack(0xCE, obj))
+        else:
+            out.append(_BQ.pack(0xCF, obj))
+    elif obj >= -0x80:
+        out.append(_Bb.pack(0xD0, obj))
+    elif obj >= -0x8000:
+        out.append(_Bh.pack(0xD1, obj))
+    elif obj >= -0x80000000:
+        out.append(_Bi.pack(0xD2, obj))
+    else:
+        out.append(_Bq.pack(0xD3, obj))
+
+
+def _pack_ext(code: int, data: bytes, out: List[bytes]) -> None:
+    n = len(data)
+    fixed = {1: 0xD4, 2: 0xD5, 4: 0xD6, 8: 0xD7, 16: 0xD8}.get(n)
+    if fixed is not None:
+        out.append(_BB.pack(fixed, code))
+    elif n < 0x100:
+        out.append(bytes((0xC7, n, code)))
+    elif n < 0x10000:
+        out.append(_BH.pack(0xC8, n) + _B.pack(code))
+    else:
+        out.append(_BI.pack(0xC9, n) + _B.pack(code))
+    out.append(data)
+
+
+def _pack_dict(obj: dict, out: List[bytes]) -> None:
+    n = len(obj)
+    out.append(_B.pack(0x80 | n) if n < 16 else _BH.pack(0xDE, n) if n < 0x10000 else _BI.pack(0xDF, n))
+    for key, value in obj.items():
+        _PACKERS.get(type(key), _pack_other)(key, out)
+        _PACKERS.get(type(value), _pack_other)(value, out)
+
+
+def _pack_list(obj: Any, out: List[bytes]) -> None:
+    n = len(obj)
+    out.append(_B.pack(0x90 | n) if n < 16 else _BH.pack(0xDC, n) if n < 0x10000 else _BI.pack(0xDD, n))
+    for value in obj:
+        _PACKERS.get(type(value), _pack_other)(value, out)
+
+
+def _pack_bytes(obj: bytes, out: List[bytes]) -> None:
+    n = len(obj)
+    out.append(_BB.pack(0xC4, n) if n < 0x100 else _BH.pack(0xC5, n) if n < 0x10000 else _BI.pack(0xC6, n))
+    out.append(bytes(obj))
+
+
+def _pack_other(obj: Any, out: List[bytes]) -> None:
+    if obj is None:
+        out.append(b"\xc0")
+    elif isinstance(obj, bool):
+        out.append(b"\xc3" if obj else b"\xc2")
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, str):
+        _pack_str(obj, out)
+    elif isinstance(obj, dict):
+        _pack_dict(obj, out)
+    elif isinstance(obj, (list, tuple)):
+        _pack_list(obj, out)
+    else:
+        code, data = _ext(obj)
+        _pack_ext(code, data, out)
+
+
+_PACKERS: Dict[type, Callable[[Any, List[bytes]], None]] = {
+    str: _pack_str,
+    int: _pack_int,
+    bool: lambda obj, out: out.append(b"\xc3" if obj else b"\xc2"),
+    type(None): lambda obj, out: out.append(b"\xc0"),
+    float: lambda obj, out: out.append(_BD.pack(0xCB, obj)),
+    dict: _pack_dict,
+    list: _pack_list,
+    tuple: _pack_list,
+    bytes: _pack_bytes,
+    UUID: lambda obj, out: _pack_ext(EXT_UUID, obj.bytes, out),
+}
+
+
+def _ext(obj: Any) -> Tuple[int, bytes]:
+    if isinstance(obj, UUID):
+        return EXT_UUID, obj.bytes
+    if isinstance(obj, datetime):
+        return EXT_DATETIME, obj.isoformat().encode()
+    if isinstance(obj, date):
+        return EXT_DATE, obj.isoformat().encode()
+    raise TypeError(f"Tipo no serializable: {type(obj).__name__}")
+
+
+def _from_ext(code: int, data: bytes) -> Any:
+    if code == EXT_UUID:
+        return UUID(bytes=bytes(data))
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(bytes(data).decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(bytes(data).decode())
+    raise ValueError(f"Tipo ext desconocido: {code}")
+
+
+def pack_value(obj: Any) -> bytes:
+    out: List[bytes] = []
+    _PACKERS.get(type(obj), _pack_other)(obj, out)
+    return b"".join(out)
+
+
+def unpack_value(data: bytes) -> Any:
+    """Decodifica un valor msgpack (los casos frecuentes primero: fixstr, fixmap, fixarray, fixint)."""
+    pos = 0
+
+    def take(n: int) -> bytes:
+        nonlocal pos
+        start = pos
+        pos += n
+        return data[start:pos]
+
+    def value() -> Any:
+        nonlocal pos
+        b = data[pos]
+        pos += 1
+        if 0xA0 <= b < 0xC0:
+            end = pos + (b & 0x1F)
+            text = data[pos:end].decode("utf-8")
+            pos = end
+            return text
+        if 0x80 <= b < 0x90:
+            result = {}
+            for _ in range(b & 0x0F):
+                key = value()
+                result[key] = value()
+            return result
+        if 0x90 <= b < 0xA0:
+            return [value() for _ in range(b & 0x0F)]
+        if b < 0x80:
+            return b
+        if b >= 0xE0:
+            return b - 0x100
+        if b == 0xC0:
+            return None
+        if b == 0xC2:
+            return False
+        if b == 0xC3:
+            return True
+        if 0xD9 <= b <= 0xDB:
+            return take(int.from_bytes(take(1 << (b - 0xD9)), "big")).decode("utf-8")
+        if b == 0xCB:
+            return struct.unpack(">d", take(8))[0]
+        if 0xCC <= b <= 0xCF:
+            return int.from_bytes(take(1 << (b - 0xCC)), "big")
+        if 0xD0 <= b <= 0xD3:
+            return int.from_bytes(take(1 << (b - 0xD0)), "big", signed=True)
+        if b in (0xDC, 0xDD):
+            return [value() for _ in range(int.from_bytes(take(2 if b == 0xDC else 4), "big"))]
+        if b in (0xDE, 0xDF):
+            result = {}
+            for _ in range(int.from_bytes(take(2 if b == 0xDE else 4), "big")):
+                key = value()
+                result[key] = value()
+            return result
+        if 0xD4 <= b <= 0xD8:
+            code = take(1)[0]
+            return _from_ext(code, take(1 << (b - 0xD4)))
+        if 0xC7 <= b <= 0xC9:
+            n = int.from_bytes(take(1 << (b - 0xC7)), "big")
+            code = take(1)[0]
+            return _from_ext(code, take(n))
+        if 0xC4 <= b <= 0xC6:
+            return bytes(take(int.from_bytes(take(1 << (b - 0xC4)), "big")))
+        if b == 0xCA:
+            return struct.unpack(">f", take(4))[0]
+        raise ValueError(f"Byte de formato inválido: {b:#x}")
+
+    return value()
+
+
+def _default_hook(obj: Any) -> Any:
+    code, data = _ext(obj)
+    return msgpack.ExtType(code, data)
+
+
+if msgpack is not None:
+    def _packb(obj: Any) -> bytes:
+        return msgpack.packb(obj, default=_default_hook, use_bin_type=True)
+
+    def _unpackb(data: bytes) -> Any:
+        return msgpack.unpackb(data, ext_hook=_from_ext, raw=False, strict_map_key=False)
+else:
+    _packb, _unpackb = pack_value, unpack_value
+
+
+# --- SessionContext ---
+
+def encode_context(ctx: SessionContext) -> bytes:
+    """
+    Snapshot binario de un SessionContext: cabecera (magic + huella del esquema) y
+    un array msgpack con los campos en orden, sin nombres. Los UUID van como ext de
+    16 bytes y fase_actual / modo_asistencia / motivo_tt como índice de ENUMS. Los
+    campos extra (SessionContext admite extra="allow") van al final, en un map.
+    """
+    values = [getattr(ctx, name) for name in FIELDS]
+    for pos, _, index in _ENUM_POS:
+        value = values[pos]
+        if value in index:
+            values[pos] = index[value]
+    if ctx.model_extra:
+        values.append(ctx.model_extra)
+    return _HEADER + _packb(values)
+
+
+def decode_context(data: bytes) -> SessionContext:
+    """SessionContext desde encode_context (sin revalidar: los tipos vienen del codec)."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("No es un snapshot de SessionContext")
+    if struct.unpack(">I", data[len(MAGIC):len(_HEADER)])[0] != SCHEMA_CRC:
+        raise ValueError("Snapshot de otra versión de SessionContext")
+    values = _unpackb(data[len(_HEADER):])
+    for pos, table, _ in _ENUM_POS:
+        if type(values[pos]) is int:
+            values[pos] = table[values[pos]]
+    fields = dict(zip(FIELDS, values))
+    if len(values) > len(FIELDS):
+        fields.update(values[len(FIELDS)])
+    return SessionContext.model_construct(**fields)
+
+
+def dump_sessions(contexts: Iterable[SessionContext], fp: BinaryIO) -> int:
+    """Escribe un snapshot por sesión, cada uno precedido por su largo (4 bytes); devuelve cuántos."""
+    count = 0
+    for ctx in contexts:
+        frame = encode_context(ctx)
+        fp.write(_I.pack(len(frame)))
+        fp.write(frame)
+        count += 1
+    return count
+
+
+def load_sessions(fp: BinaryIO) -> Iterator[SessionContext]:
+    while True:
+        size = fp.read(4)
+        if not size:
+            return
+        yield decode_context(fp.read(_I.unpack(size)[0]))
@@ -0,0 +1,227 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class VersionConflict(Exception):
+    """El contexto de la sesión cambió desde la versión que leyó quien escribe."""
+
+    def __init__(self, session_id: str, expected: int, actual: int):
+        super().__init__(f"Sesión {session_id}: versión esperada {expected}, actual {actual}")
+        self.session_id = session_id
+        self.expected = expected
+        self.actual = actual
+
+
+def _escape(key: Any) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _split(path: str) -> List[str]:
+    if not path.startswith("/"):
+        raise ValueError(f"Ruta inválida: {path!r}")
+    return [p.replace("~1", "/").replace("~0", "~") for p in path[1:].split("/")]
+
+
+def diff_context(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[Dict[str, Any]]:
+    """
+    Parche (estilo JSON Patch: add / replace / remove) que lleva old a new.
+
+    Los dicts se comparan campo a campo; una lista que sólo creció al final
+    (interacciones_recientes) genera un "add" por elemento nuevo en ".../-".
+    El resto de los cambios reemplaza el valor completo.
+    """
+    ops: List[Dict[str, Any]] = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        child = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": child, "value": value})
+            continue
+        previous = old[key]
+        if previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            ops.extend(diff_context(previous, value, child))
+        elif (isinstance(previous, list) and isinstance(value, list)
+              and len(value) > len(previous) and value[:len(previous)] == previous):
+            ops.extend({"op": "add", "path": f"{child}/-", "value": item} for item in value[len(previous):])
+        else:
+            ops.append({"op": "replace", "path": child, "value": value})
+    return ops
+
+
+def apply_patch(doc: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Documento nuevo con el parche aplicado; doc no se modifica.
+
+    Sólo se copian los contenedores del camino de cada operación (el resto se
+    comparte con doc), y si una operación falla no queda nada a medio aplicar.
+    """
+    root = dict(doc)
+    copied = {id(root)}
+    for op in ops:
+        parts = _split(op["path"])
+        parent: Any = root
+        for part in parts[:-1]:
+            index = int(part) if isinstance(parent, list) else part
+            child = parent[index]
+            if id(child) not in copied:
+                child = dict(child) if isinstance(child, dict) else list(child)
+                parent[index] = child
+                copied.add(id(child))
+            parent = child
+        last, kind = parts[-1], op["op"]
+        value = copy.deepcopy(op.get("value"))
+        if isinstance(parent, list):
+            if kind == "add":
+                parent.append(value) if last == "-" else parent.insert(int(last), value)
+            elif kind == "replace":
+                parent[int(last)] = value
+            elif kind == "remove":
+                del parent[int(last)]
+            else:
+                raise ValueError(f"Operación desconocida: {kind}")
+        else:
+            if kind == "add":
+                parent[last] = value
+            elif kind == "replace":
+                if last not in parent:
+                    raise KeyError(op["path"])
+                parent[last] = value
+            elif kind == "remove":
+                del parent[last]
+            else:
+                raise ValueError(f"Operación desconocida: {kind}")
+    return root
+
+
+_MISSING = object()
+
+
+def _lookup(doc: Any, parts: List[str]) -> Any:
+    for part in parts:
+        try:
+            doc = doc[int(part)] if isinstance(doc, list) else doc[part]
+        except (KeyError, IndexError, ValueError, TypeError):
+            return _MISSING
+    return doc
+
+
+def touched_paths(ops: List[Dict[str, Any]]) -> List[str]:
+    """Rutas que toca un parche (un "add" al final de una lista toca la lista entera)."""
+    paths = []
+    for op in ops:
+        path = op["path"]
+        if path.endswith("/-"):
+            path = path[:-2]
+        paths.append(path)
+    return paths
+
+
+def unchanged_paths(base: Dict[str, Any], current: Dict[str, Any], ops: List[Dict[str, Any]]) -> bool:
+    """True si ninguna ruta que toca el parche cambió entre base y current."""
+    for path in touched_paths(ops):
+        parts = _split(path) if path else []
+        if _lookup(base, parts) != _lookup(current, parts):
+            return False
+    return True
+
+
+class SessionContextStore:
+    """
+    Estado del SessionContext por sesión, versionado y actualizado por parches.
+
+    Cada escritura aplica sólo lo que cambió (write() calcula el parche contra el
+    estado guardado) y sube la versión. Con expected_version la escritura es
+    optimista: si otro escritor cambió la sesión después de esa versión se lanza
+    VersionConflict y no se aplica nada. Acota las sesiones vivas como
+    TurnBufferRegistry (se descarta la menos usada).
+    """
+
+    def __init__(self, max_sessions: int = 10000):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def version(self, session_id: str) -> int:
+        with self._lock:
+            entry = self._sessions.get(str(session_id))
+            return entry[0] if entry else 0
+
+    def get(self, session_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._sessions.get(str(session_id))
+        if entry is None:
+            return None
+        return entry[0], copy.deepcopy(entry[1])
+
+    def _check(self, key: str, expected_version: Optional[int]) -> Tuple[int, Dict[str, Any]]:
+        version, state = self._sessions.get(key, (0, {}))
+        if expected_version is not None and expected_version != version:
+            raise VersionConflict(key, expected_version, version)
+        return version, state
+
+    def _store(self, key: str, version: int, state: Dict[str, Any]) -> None:
+        self._sessions[key] = (version, state)
+        self._sessions.move_to_end(key)
+        if len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def patch(self, session_id: str, ops: List[Dict[str, Any]], expected_version: Optional[int] = None) -> int:
+        """Aplica un parche ya calculado; devuelve la versión nueva."""
+        key = str(session_id)
+        with self._lock:
+            version, state = self._check(key, expected_version)
+            if not ops:
+                return version
+            self._store(key, version + 1, apply_patch(state, ops))
+            return version + 1
+
+    def write(self, session_id: str, state: Dict[str, Any], expected_version: Optional[int] = None
+              ) -> Tuple[int, List[Dict[str, Any]]]:
+        """Guarda el estado completo como parche contra el guardado; devuelve (versión, parche)."""
+        key = str(session_id)
+        with self._lock:
+            version, current = self._check(key, expected_version)
+            ops = diff_context(current, state)
+            if not ops:
+                return version, ops
+            self._store(key, version + 1, apply_patch(current, ops))
+            return version + 1, ops
+
+    def rebase(self, session_id: str, base: Dict[str, Any], ops: List[Dict[str, Any]],
+               expected_version: Optional[int] = None) -> int:
+        """
+        Aplica sobre la versión actual un parche calculado contra base (el estado que
+        leyó quien escribe), siempre que el otro escritor no haya tocado ninguna de sus
+        rutas; si las tocó, VersionConflict y no se aplica nada. Devuelve la versión nueva.
+        """
+        key = str(session_id)
+        with self._lock:
+            version, current = self._sessions.get(key, (0, {}))
+            if not unchanged_paths(base, current, ops):
+                raise VersionConflict(key, version if expected_version is None else expected_version, version)
+            if not ops:
+                return version
+            self._store(key, version + 1, apply_patch(current, ops))
+            return version + 1
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(str(session_id), None)
+
+
+_store = SessionContextStore()
+
+
+def get_context_store() -> SessionContextStore:
+    return _store
+
+
+def drop_session_context(session_id: str) -> None:
+    """Libera el estado al cerrar la sesión."""
+    _store.drop(session_id)
@@ -0,0 +1,260 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.session.turn_buffer import TurnRecord, TurnRingBuffer, add_turn_listener, get_turn_buffer
+
+# Presupuestos por defecto (tokens) de los turnos recientes y del resumen de la sesión
+PRESUPUESTO_TURNOS = 1500
+PRESUPUESTO_RESUMEN = 400
+
+# Sin tokenizador: ~4 caracteres por token en español
+CHARS_POR_TOKEN = 4
+
+# Largo máximo (caracteres) de cada línea del resumen extractivo
+LINEA_RESUMEN_MAX = 160
+
+# resumir(resumen_anterior, turnos_desalojados, presupuesto_tokens) -> resumen nuevo
+Summarizer = Callable[[str, List[Dict[str, Any]], int], str]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimación barata de tokens de un texto (redondea hacia arriba)."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_POR_TOKEN - 1) // CHARS_POR_TOKEN
+
+
+def _turn_tokens(record: TurnRecord) -> int:
+    # Texto más el envoltorio {"actor": ..., "text": ...} con el que va al prompt
+    return estimate_tokens(record.texto) + estimate_tokens(record.actor) + 4
+
+
+def _resumen_linea(turno: Dict[str, Any]) -> str:
+    texto = " ".join(str(turno.get("text", "")).split())
+    for fin in (". ", "? ", "! "):
+        corte = texto.find(fin)
+        if 0 < corte < LINEA_RESUMEN_MAX:
+            texto = texto[:corte + 1]
+            break
+    if len(texto) > LINEA_RESUMEN_MAX:
+        texto = texto[:LINEA_RESUMEN_MAX - 1] + "…"
+    return f"{turno.get('actor', '?')}: {texto}"
+
+
+def resumen_extractivo(resumen: str, turnos: List[Dict[str, Any]], presupuesto: int) -> str:
+    """
+    Resumen por defecto: una línea por turno desalojado (primera oración, recortada)
+    agregada al final; si no entra en el presupuesto se descartan las líneas más viejas.
+    El costo depende del presupuesto, no del largo de la sesión.
+    """
+    lineas = resumen.split("\n") if resumen else []
+    lineas.extend(_resumen_linea(t) for t in turnos)
+    tokens = sum(estimate_tokens(l) + 1 for l in lineas)
+    inicio = 0
+    while tokens > presupuesto and inicio < len(lineas):
+        tokens -= estimate_tokens(lineas[inicio]) + 1
+        inicio += 1
+    return "\n".join(lineas[inicio:])
+
+
+class ContextWindow:
+    """
+    Turnos recientes de una sesión dentro de un presupuesto de tokens, leídos del
+    buffer circular de la sesión (TurnRingBuffer): la ventana no guarda turnos, sólo
+    el número del primero que entra y el resumen corrido.
+
+    Al superar el presupuesto salen los turnos más viejos (el último siempre queda) y
+    se pliegan en el resumen con resumir(); el resumen tiene su propio presupuesto.
+    Entran a lo sumo capacity - 1 turnos: el más viejo del buffer, el próximo en
+    pisarse, ya está plegado.
+    """
+
+    def __init__(self, presupuesto: int = PRESUPUESTO_TURNOS, presupuesto_resumen: int = PRESUPUESTO_RESUMEN,
+                 resumir: Optional[Summarizer] = None, buffer: Optional[TurnRingBuffer] = None):
+        self.presupuesto = presupuesto
+        self.presupuesto_resumen = presupuesto_resumen
+        self.resumir = resumir or resumen_extractivo
+        # Sin buffer de sesión (ventanas sueltas / de respaldo): uno propio
+        self.buffer = buffer if buffer is not None else TurnRingBuffer()
+        self._inicio = 0  # número (TurnRingBuffer.total) del primer turno de la ventana
+        self._tokens = 0
+        self.resumen = ""
+        self.plegados = 0  # turnos plegados en el resumen desde el inicio de la sesión
+        self._lock = threading.Lock()
+
+    def sync(self) -> List[Dict[str, Any]]:
+        """Incorpora los turnos nuevos del buffer; devuelve los desalojados al resumen."""
+        with self._lock:
+            total, records = self.buffer.since(self._inicio)
+            maximo = max(1, self.buffer.capacity - 1)
+            tokens = quedan = 0
+            for record in reversed(records):
+                record_tokens = _turn_tokens(record)
+                if quedan and (quedan >= maximo or tokens + record_tokens > self.presupuesto):
+                    break
+                tokens += record_tokens
+                quedan += 1
+            desalojados = [record.to_dict() for record in records[:len(records) - quedan]]
+            self._inicio = total - quedan
+            self._tokens = tokens
+            if desalojados:
+                self.resumen = self.resumir(self.resumen, desalojados, self.presupuesto_resumen)
+                self.plegados += len(desalojados)
+            return desalojados
+
+    def append(self, turno: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Agrega un turno ({"actor", "text"}) al buffer; devuelve los turnos desalojados al resumen."""
+        self.buffer.append(TurnRecord(turno.get("actor", "?"), turno.get("text", "")))
+        return self.sync()
+
+    def extend(self, turnos: List[Dict[str, Any]]) -> None:
+        for turno in turnos:
+            self.append(turno)
+
+    def turnos(self) -> List[Dict[str, Any]]:
+        self.sync()
+        with self._lock:
+            return [record.to_dict() for record in self.buffer.since(self._inicio)[1]]
+
+    @property
+    def tokens(self) -> int:
+        self.sync()
+        return self._tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        self.sync()
+        with self._lock:
+            return {
+                "resumen": self.resumen,
+                "turnos": [record.to_dict() for record in self.buffer.since(self._inicio)[1]],
+                "tokens_resumen": estimate_tokens(self.resumen),
+                "tokens_turnos": self._tokens,
+                "plegados": self.plegados,
+            }
+
+    def __len__(self) -> int:
+        self.sync()
+        return len(self.buffer.since(self._inicio)[1])
+
+
+class ContextWindowRegistry:
+    """
+    Ventanas por sesión sobre el buffer de turnos de cada una (get_turn_buffer), con
+    el mismo descarte LRU que TurnBufferRegistry. Si el buffer de la sesión se libera
+    o se reemplaza, la ventana se rearma sobre el nuevo.
+    """
+
+    def __init__(self, presupuesto: int = PRESUPUESTO_TURNOS, presupuesto_resumen: int = PRESUPUESTO_RESUMEN,
+                 resumir: Optional[Summarizer] = None, max_sessions: int = 10000):
+        self.presupuesto = presupuesto
+        self.presupuesto_resumen = presupuesto_resumen
+        self.resumir = resumir
+        self.max_sessions = max_sessions
+        self._windows: "OrderedDict[str, ContextWindow]" = OrderedDict()
+        # Ventanas armadas con interacciones_recientes: (ventana, turnos incorporados, último turno)
+        self._fallbacks: "OrderedDict[str, Tuple[ContextWindow, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def new_window(self, buffer: Optional[TurnRingBuffer] = None) -> ContextWindow:
+        return ContextWindow(self.presupuesto, self.presupuesto_resumen, self.resumir, buffer)
+
+    def _window_for(self, key: str, buffer: TurnRingBuffer) -> ContextWindow:
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and window.buffer is buffer:
+                self._windows.move_to_end(key)
+                return window
+            window = self._windows[key] = self.new_window(buffer)
+            self._windows.move_to_end(key)
+            if len(self._windows) > self.max_sessions:
+                self._windows.popitem(last=False)
+            return window
+
+    def get(self, session_id: str, create: bool = True) -> Optional[ContextWindow]:
+        """Ventana sobre el buffer de la sesión (create crea el buffer si no existe)."""
+        buffer = get_turn_buffer(session_id, create)
+        if buffer is None:
+            return None
+        return self._window_for(str(session_id), buffer)
+
+    def fallback(self, session_id: str, turnos: List[Dict[str, Any]]) -> ContextWindow:
+        """
+        Ventana de una sesión sin turnos registrados, armada con sus turnos (append-only,
+        como interacciones_recientes). Se guarda entre prompts y sólo incorpora los turnos
+        nuevos; si la lista ya no empieza como la vista, se rearma.
+        """
+        key = str(session_id)
+        with self._lock:
+            entry = self._fallbacks.get(key)
+            if entry is not None:
+                self._fallbacks.move_to_end(key)
+            window, vistos, ultimo = entry or (self.new_window(), 0, None)
+            if len(turnos) < vistos or (vistos and turnos[vistos - 1] != ultimo):
+                window, vistos = self.new_window(), 0
+            window.extend(turnos[vistos:])
+            self._fallbacks[key] = (window, len(turnos), turnos[-1] if turnos else None)
+            if len(self._fallbacks) > self.max_sessions:
+                self._fallbacks.popitem(last=False)
+            return window
+
+    def session_window(self, session_id: str, turnos: List[Dict[str, Any]]) -> ContextWindow:
+        """
+        La ventana de la sesión: sobre su buffer si la bitácora ya registró turnos y, si
+        no, la de respaldo armada con turnos (interacciones_recientes).
+        """
+        buffer = get_turn_buffer(session_id, create=False)
+        if buffer is not None and len(buffer):
+            return self._window_for(str(session_id), buffer)
+        return self.fallback(session_id, turnos)
+
+    def on_turn(self, session_id: str, buffer: TurnRingBuffer) -> None:
+        # Cada turno registrado se pliega a tiempo, antes de que el buffer lo pise
+        self._window_for(session_id, buffer).sync()
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._windows.pop(str(session_id), None)
+            self._fallbacks.pop(str(session_id), None)
+
+
+_registry = ContextWindowRegistry()
+add_turn_listener(_registry.on_turn)
+
+
+def get_context_window(session_id: str, create: bool = True) -> Optional[ContextWindow]:
+    return _registry.get(session_id, create)
+
+
+def new_context_window() -> ContextWindow:
+    """Ventana suelta con la configuración del registro (para sesiones sin turnos registrados)."""
+    return _registry.new_window()
+
+
+def fallback_context_window(session_id: str, turnos: List[Dict[str, Any]]) -> ContextWindow:
+    return _registry.fallback(session_id, turnos)
+
+
+def session_context_window(session_id: str, turnos: List[Dict[str, Any]]) -> ContextWindow:
+    return _registry.session_window(session_id, turnos)
+
+
+def drop_context_window(session_id: str) -> None:
+    """Libera la ventana al cerrar la sesión."""
+    _registry.drop(session_id)
+
+
+def prompt_budget(secciones: Dict[str, str], presupuesto: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Reparto de tokens del prompt por sección: {"secciones": {nombre: tokens},
+    "total", "presupuesto", "excedido"}. Sirve para loguear qué parte del prompt
+    se lleva el costo de cada turno.
+    """
+    tokens = {nombre: estimate_tokens(texto) for nombre, texto in secciones.items()}
+    total = sum(tokens.values())
+    return {
+        "secciones": tokens,
+        "total": total,
+        "presupuesto": presupuesto,
+        "excedido": presupuesto is not None and total > presupuesto,
+    }
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# Emociones que cuentan como carga negativa para el DT
+EMOCIONES_NEGATIVAS = ("frustracion", "ansiedad", "tristeza", "enojo")
+
+# Puntaje equivalente cuando la detección sólo trae "nivel" (sin "scores")
+PUNTAJE_POR_NIVEL = {"bajo": 0.5, "medio": 1.0, "alto": 2.0}
+
+
+class EmotionTrajectory:
+    """
+    Estado emocional incremental de una sesión: O(1) por turno, sin releer la bitácora.
+
+    Mantiene por emoción un promedio exponencial (EWMA) y el pico observado;
+    la emoción dominante y cuántos turnos lleva en ese estado; y la "carga
+    negativa" (suma de EWMAs de EMOCIONES_NEGATIVAS) con su tendencia suavizada
+    (> 0 empeorando, < 0 mejorando).
+    """
+
+    __slots__ = ("alpha", "beta", "ewma", "pico", "pico_turno", "estado", "turnos_en_estado",
+                 "turnos", "carga", "tendencia", "ts", "_lock")
+
+    def __init__(self, alpha: float = 0.4, beta: float = 0.5):
+        self.alpha = alpha  # peso del turno actual en los EWMA
+        self.beta = beta    # suavizado de la tendencia
+        self.ewma: Dict[str, float] = {}
+        self.pico: Dict[str, float] = {}
+        self.pico_turno: Dict[str, int] = {}
+        self.estado = "neutral"
+        self.turnos_en_estado = 0
+        self.turnos = 0
+        self.carga = 0.0
+        self.tendencia = 0.0
+        self.ts: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scores(resultado: Dict[str, Any]) -> Dict[str, float]:
+        scores = resultado.get("scores")
+        if scores:
+            return scores
+        emocion = resultado.get("emocion", "neutral")
+        if emocion == "neutral":
+            return {}
+        return {emocion: PUNTAJE_POR_NIVEL.get(resultado.get("nivel"), 1.0)}
+
+    def update(self, resultado: Dict[str, Any]) -> None:
+        """Incorpora la salida de emotion_detection_function de un turno."""
+        scores = self._scores(resultado)
+        emocion = resultado.get("emocion", "neutral")
+        with self._lock:
+            self.turnos += 1
+            for e in set(self.ewma).union(scores):
+                valor = float(scores.get(e, 0.0))
+                self.ewma[e] = self.alpha * valor + (1 - self.alpha) * self.ewma.get(e, 0.0)
+                if valor > self.pico.get(e, 0.0):
+                    self.pico[e] = valor
+                    self.pico_turno[e] = self.turnos
+            if emocion == self.estado:
+                self.turnos_en_estado += 1
+            else:
+                self.estado = emocion
+                self.turnos_en_estado = 1
+            carga = sum(self.ewma.get(e, 0.0) for e in EMOCIONES_NEGATIVAS)
+            self.tendencia = self.beta * (carga - self.carga) + (1 - self.beta) * self.tendencia
+            self.carga = carga
+            self.ts = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "turnos_en_estado": self.turnos_en_estado,
+                "turnos": self.turnos,
+                "ewma": {e: round(v, 3) for e, v in self.ewma.items()},
+                "pico": dict(self.pico),
+                "pico_turno": dict(self.pico_turno),
+                "carga_negativa": round(self.carga, 3),
+                "tendencia": round(self.tendencia, 3),
+            }
+
+
+class EmotionTrajectoryRegistry:
+    """Trayectorias por sesión, con el mismo descarte LRU que TurnBufferRegistry."""
+
+    def __init__(self, max_sessions: int = 10000, alpha: float = 0.4):
+        self.max_sessions = max_sessions
+        self.alpha = alpha
+        self._trajectories: "OrderedDict[str, EmotionTrajectory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, create: bool = True) -> Optional[EmotionTrajectory]:
+        key = str(session_id)
+        with self._lock:
+            trajectory = self._trajectories.get(key)
+            if trajectory is not None:
+                self._trajectories.move_to_end(key)
+                return trajectory
+            if not create:
+                return None
+            trajectory = self._trajectories[key] = EmotionTrajectory(self.alpha)
+            if len(self._trajectories) > self.max_sessions:
+                self._trajectories.popitem(last=False)
+            return trajectory
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._trajectories.pop(str(session_id), None)
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return list(self._trajectories)
+
+
+_registry = EmotionTrajectoryRegistry()
+
+
+def get_emotion_trajectory(session_id: str, create: bool = True) -> Optional[EmotionTrajectory]:
+    return _registry.get(session_id, create)
+
+
+def update_emotion_trajectory(session_id: str, resultado: Dict[str, Any]) -> EmotionTrajectory:
+    trajectory = _registry.get(session_id)
+    trajectory.update(resultado)
+    return trajectory
+
+
+def drop_emotion_trajectory(session_id: str) -> None:
+    """Libera la trayectoria al cerrar la sesión."""
+    _registry.drop(session_id)
@@ -0,0 +1,18 @@
+from core.session.context_store import drop_session_context
+from core.session.context_window import drop_context_window
+from core.session.emotion_trajectory import drop_emotion_trajectory
+from core.session.turn_buffer import drop_turn_buffer
+
+
+def close_session(session_id: str) -> None:
+    """
+    Libera el estado en memoria de una sesión cerrada: ventana de contexto, contexto
+    versionado, buffer de turnos y trayectoria emocional. Lo persistente (bitácora,
+    sesiones) queda en la base; sin esto cada registro retiene la sesión hasta que
+    su LRU la desaloja.
+    """
+    session_id = str(session_id)
+    drop_context_window(session_id)
+    drop_session_context(session_id)
+    drop_turn_buffer(session_id)
+    drop_emotion_trajectory(session_id)
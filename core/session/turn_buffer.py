@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Tipos de evento de bitácora que cuentan como turno de conversación
+TURN_EVENT_TYPES = {"msg"}
+
+# Turnos por sesión: el buffer es también la base de la ventana de contexto
+# (core.session.context_window), así que cubre su presupuesto de tokens
+CAPACIDAD_TURNOS = 64
+
+
+class TurnRecord:
+    """Registro compacto de un turno (actor + texto), sin dicts por entrada."""
+
+    __slots__ = ("ts", "actor", "tipo", "texto", "canal")
+
+    def __init__(self, actor: str, texto: str, tipo: str = "msg", canal: Optional[str] = None,
+                 ts: Optional[float] = None):
+        self.ts = time.time() if ts is None else ts
+        self.actor = actor
+        self.tipo = tipo
+        self.texto = texto
+        self.canal = canal
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Mismo formato que SessionContext.interacciones_recientes
+        return {"actor": self.actor, "text": self.texto}
+
+
+class TurnRingBuffer:
+    """Buffer circular de capacidad fija con los últimos turnos de una sesión."""
+
+    __slots__ = ("capacity", "_slots", "_next", "_size", "_lock", "total")
+
+    def __init__(self, capacity: int = CAPACIDAD_TURNOS):
+        self.capacity = capacity
+        self._slots: List[Optional[TurnRecord]] = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.total = 0  # turnos vistos desde el inicio de la sesión
+
+    def append(self, record: TurnRecord) -> None:
+        with self._lock:
+            self._slots[self._next] = record
+            self._next = (self._next + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+            self.total += 1
+
+    def last(self, n: Optional[int] = None) -> List[TurnRecord]:
+        """Los últimos n turnos (todos si n es None), del más viejo al más nuevo."""
+        with self._lock:
+            n = self._size if n is None else max(0, min(n, self._size))
+            start = (self._next - n) % self.capacity
+            return [self._slots[(start + i) % self.capacity] for i in range(n)]
+
+    def since(self, index: int) -> Tuple[int, List[TurnRecord]]:
+        """
+        (total, turnos desde el número index que siguen en el buffer), del más viejo al
+        más nuevo; el primer turno de la sesión es el número 0.
+        """
+        with self._lock:
+            n = max(0, min(self.total - index, self._size))
+            start = (self._next - n) % self.capacity
+            return self.total, [self._slots[(start + i) % self.capacity] for i in range(n)]
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class TurnBufferRegistry:
+    """
+    Buffers por sesión. Acota también la cantidad de sesiones vivas:
+    al superar max_sessions se descarta la sesión menos usada.
+    """
+
+    def __init__(self, capacity: int = CAPACIDAD_TURNOS, max_sessions: int = 10000):
+        self.capacity = capacity
+        self.max_sessions = max_sessions
+        self._buffers: "OrderedDict[str, TurnRingBuffer]" = OrderedDict()
+        self._lock = threading.Lock()
+        # listener(session_id, buffer) después de cada turno registrado
+        self._listeners: List[Callable[[str, TurnRingBuffer], None]] = []
+
+    def add_listener(self, listener: Callable[[str, TurnRingBuffer], None]) -> None:
+        self._listeners.append(listener)
+
+    def get(self, session_id: str, create: bool = True) -> Optional[TurnRingBuffer]:
+        key = str(session_id)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                self._buffers.move_to_end(key)
+                return buffer
+            if not create:
+                return None
+            buffer = self._buffers[key] = TurnRingBuffer(self.capacity)
+            if len(self._buffers) > self.max_sessions:
+                self._buffers.popitem(last=False)
+            return buffer
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._buffers.pop(str(session_id), None)
+
+    def record(self, session_id: str, actor: str, tipo: str, texto: str, canal: Optional[str] = None) -> bool:
+        """Registra un evento de bitácora si corresponde a un turno de conversación."""
+        if tipo not in TURN_EVENT_TYPES:
+            return False
+        buffer = self.get(session_id)
+        buffer.append(TurnRecord(actor, texto, tipo, canal))
+        for listener in list(self._listeners):
+            listener(str(session_id), buffer)
+        return True
+
+
+_registry = TurnBufferRegistry()
+
+
+def get_turn_buffer(session_id: str, create: bool = True) -> Optional[TurnRingBuffer]:
+    return _registry.get(session_id, create)
+
+
+def record_turn(session_id: str, actor: str, tipo: str, texto: str, canal: Optional[str] = None) -> bool:
+    return _registry.record(session_id, actor, tipo, texto, canal)
+
+
+def add_turn_listener(listener: Callable[[str, TurnRingBuffer], None]) -> None:
+    """Avisa de cada turno registrado (así la ventana de contexto pliega antes de que se pise)."""
+    _registry.add_listener(listener)
+
+
+def drop_turn_buffer(session_id: str) -> None:
+    """Libera el buffer al cerrar la sesión."""
+    _registry.drop(session_id)
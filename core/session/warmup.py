@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Plazo por defecto de cada lectura del arranque de sesión (segundos)
+DEADLINE_DEFAULT = 1.0
+
+
+async def _fetch(pool: ThreadPoolExecutor, name: str, fn: Callable[[], Any], deadline: float,
+                 default: Any) -> Tuple[str, Any, str, float]:
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        value = await asyncio.wait_for(loop.run_in_executor(pool, fn), deadline)
+        estado = "ok"
+    except asyncio.TimeoutError:
+        value, estado = default, "timeout"
+    except Exception:
+        value, estado = default, "error"
+    return name, value, estado, (time.perf_counter() - start) * 1000
+
+
+async def warm_up_async(fetchers: Dict[str, Callable[[], Any]],
+                        deadlines: Optional[Dict[str, float]] = None,
+                        defaults: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Ejecuta las lecturas de arranque en paralelo, cada una con su plazo.
+
+    Una lectura que vence o falla se reemplaza por su valor en defaults (None si
+    no hay): el arranque tarda lo que la lectura más lenta dentro de su plazo, no
+    la suma. Devuelve (valores, meta) con meta = {"estado": {nombre: "ok" |
+    "timeout" | "error"}, "ms": {nombre: ms}, "total_ms": ms}.
+    """
+    deadlines = deadlines or {}
+    defaults = defaults or {}
+    start = time.perf_counter()
+    # Un executor por arranque, con un hilo por lectura. Una lectura colgada retiene
+    # sólo su propio hilo y no le quita hilos a los arranques de otras sesiones, como
+    # pasaba con un pool compartido. No es el executor por defecto del loop:
+    # asyncio.run() espera a sus hilos, y una lectura vencida no debe demorar el arranque.
+    pool = ThreadPoolExecutor(max_workers=max(1, len(fetchers)), thread_name_prefix="zenda-warmup")
+    try:
+        done = await asyncio.gather(*(
+            _fetch(pool, name, fn, deadlines.get(name, DEADLINE_DEFAULT), defaults.get(name))
+            for name, fn in fetchers.items()
+        ))
+    finally:
+        pool.shutdown(wait=False)
+    values = {name: value for name, value, _, _ in done}
+    meta = {
+        "estado": {name: estado for name, _, estado, _ in done},
+        "ms": {name: round(ms, 1) for name, _, _, ms in done},
+        "total_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+    return values, meta
+
+
+def warm_up(fetchers: Dict[str, Callable[[], Any]],
+            deadlines: Optional[Dict[str, float]] = None,
+            defaults: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Versión síncrona de warm_up_async (para los agentes, que no son async)."""
+    coro = warm_up_async(fetchers, deadlines, defaults)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # Llamada síncrona desde dentro de un loop: se corre en un loop aparte
+    result: Dict[str, Any] = {}
+
+    def run() -> None:
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as exc:
+            result["error"] = exc
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=run, name="zenda-warmup-loop")
+    thread.start()
+    thread.join()
+    if "value" in result:
+        return result["value"]
+    # El loop aparte falló: todas las lecturas quedan con su valor por defecto, como
+    # una lectura que falla en warm_up_async
+    defaults = defaults or {}
+    total_ms = round((time.perf_counter() - start) * 1000, 1)
+    values = {name: defaults.get(name) for name in fetchers}
+    meta = {
+        "estado": {name: "error" for name in fetchers},
+        "ms": {name: total_ms for name in fetchers},
+        "total_ms": total_ms,
+    }
+    return values, meta
+
+
+def degraded(meta: Dict[str, Any]) -> Dict[str, str]:
+    """Lecturas que no llegaron a tiempo o fallaron (se usó el valor por defecto)."""
+    return {name: estado for name, estado in meta["estado"].items() if estado != "ok"}
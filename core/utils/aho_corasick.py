@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    Autómata Aho-Corasick sobre caracteres.
+    Encuentra todas las apariciones de todos los patrones en una sola pasada
+    sobre el texto: O(len(texto) + coincidencias), independiente del tamaño del léxico.
+
+    Uso:
+        ac = AhoCorasick()
+        ac.add("estres", payload)
+        ac.build()
+        for start, end, payload in ac.iter(texto): ...
+    """
+
+    __slots__ = ("_goto", "_fail", "_own", "_out", "_built")
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[List[Tuple[int, Any]]] = [[]]
+        self._out: List[List[Tuple[int, Any]]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload: Any = None) -> None:
+        if not pattern:
+            raise ValueError("Patrón vacío")
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+            state = nxt
+        self._own[state].append((len(pattern), payload))
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        self._out = [list(own) for own in self._own]
+        queue = deque(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        self._built = True
+        return self
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """Genera (inicio, fin, payload) por cada coincidencia, en orden de fin."""
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for length, payload in out[state]:
+                    yield end - length, end, payload
+
+    def __len__(self) -> int:
+        return len(self._goto)
@@ -0,0 +1,83 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+
+class SQLitePoolTimeout(TimeoutError):
+    """No se liberó ninguna conexión del pool dentro del plazo."""
+
+
+class SQLitePool:
+    """
+    Pool acotado de conexiones SQLite a una misma base.
+
+    En archivo usa journal_mode=WAL (lectores concurrentes con un escritor) y
+    synchronous=NORMAL. Con ":memory:" el pool tiene una sola conexión (la
+    caché compartida de SQLite bloquea por tabla sin respetar busy_timeout).
+    Cada conexión mantiene su caché de sentencias preparadas (cached_statements),
+    así que el SQL debe armarse con parámetros y textos estables para reutilizarlas.
+    """
+
+    def __init__(self, path: str = ":memory:", size: int = 4, timeout: float = 5.0,
+                 cached_statements: int = 256):
+        self.path = path
+        self.timeout = timeout
+        self._wal = path != ":memory:"
+        self.size = size if self._wal else 1
+        if self._wal:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._cached_statements = cached_statements
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._idle.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout,
+                               check_same_thread=False, cached_statements=self._cached_statements)
+        if self._wal:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Presta una conexión; crea hasta `size` y después espera a que se libere una."""
+        if self._closed:
+            raise RuntimeError("Pool SQLite cerrado")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                conn = self._connect() if len(self._all) < self.size else None
+            if conn is None:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise SQLitePoolTimeout(
+                        f"Pool SQLite agotado: {self.size} conexiones ocupadas durante {self.timeout}s ({self.path})"
+                    ) from None
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Conexión dentro de una transacción (commit al salir, rollback ante excepción)."""
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
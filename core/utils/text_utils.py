@@ -0,0 +1,31 @@
+import unicodedata
+
+# Tabla de plegado para los caracteres acentuados más comunes en español / portugués / francés.
+# str.translate con una tabla precalculada es mucho más barato que normalizar NFKD por llamada.
+_FOLD_SRC = "áàâäãåéèêëíìîïóòôöõúùûüñçÁÀÂÄÃÅÉÈÊËÍÌÎÏÓÒÔÖÕÚÙÛÜÑÇ"
+_FOLD_DST = "aaaaaaeeeeiiiiooooouuuuncaaaaaaeeeeiiiiooooouuuunc"
+_FOLD_TABLE = str.maketrans(_FOLD_SRC, _FOLD_DST)
+
+
+def fold_text(text: str) -> str:
+    """
+    Minúsculas y sin acentos ("Estrés" -> "estres"). Conserva la longitud del texto
+    para los caracteres de la tabla, así las posiciones siguen siendo comparables.
+    """
+    folded = text.lower().translate(_FOLD_TABLE)
+    if folded.isascii():
+        return folded
+    # Caracteres fuera de la tabla: quitar marcas diacríticas una a una
+    return "".join(
+        c if c.isascii() else unicodedata.normalize("NFKD", c)[0]
+        for c in folded
+    )
+
+
+def normalize_name(name: str) -> str:
+    """
+    Clave de búsqueda para nombres de entidades: plegado, sin puntuación y con
+    espacios colapsados ("  Jefe   Martínez." -> "jefe martinez").
+    """
+    folded = fold_text(name or "")
+    return " ".join("".join(c if c.isalnum() else " " for c in folded).split())
@@ -0,0 +1,184 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+_LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+_LEVELS_BY_NAME = {name: level for level, name in _LEVEL_NAMES.items()}
+
+
+class ToolEvent:
+    """
+    Evento estructurado de una tool. El mensaje se formatea recién en el sink:
+    `msg % args`, donde cualquier arg invocable (p. ej. un lambda con json.dumps)
+    se evalúa en ese momento y nunca si el evento se filtra.
+    """
+
+    __slots__ = ("ts", "tool", "level", "msg", "args", "fields")
+
+    def __init__(self, tool: str, level: int, msg: str, args: tuple, fields: Dict[str, Any]):
+        self.ts = time.time()
+        self.tool = tool
+        self.level = level
+        self.msg = msg
+        self.args = args
+        self.fields = fields
+
+    def message(self) -> str:
+        if not self.args:
+            return self.msg
+        return self.msg % tuple(a() if callable(a) else a for a in self.args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ts": self.ts,
+            "tool": self.tool,
+            "level": _LEVEL_NAMES.get(self.level, str(self.level)),
+            "msg": self.message(),
+            **self.fields,
+        }
+
+
+class StdoutSink:
+    """Salida legible en consola, con el mismo formato "[TOOL]: ..." de siempre."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def __call__(self, event: ToolEvent) -> None:
+        line = f"[{event.tool}]: {event.message()}"
+        if event.fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in event.fields.items())
+        print(line, file=self.stream or sys.stdout)
+
+
+class FileSink:
+    """Un evento JSON por línea, para análisis posterior."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, event: ToolEvent) -> None:
+        line = json.dumps(event.to_dict(), default=str, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+class MetricsSink:
+    """
+    Cuenta eventos por (tool, nivel) y por nombre de evento; no formatea nada.
+    Los campos numéricos de eventos con nombre se suman en `sumas` por
+    (tool, evento, campo), p. ej. las operaciones de cada lote de entidades.
+    """
+
+    def __init__(self):
+        self.por_tool: Counter = Counter()
+        self.por_evento: Counter = Counter()
+        self.sumas: Counter = Counter()
+
+    def __call__(self, event: ToolEvent) -> None:
+        self.por_tool[(event.tool, _LEVEL_NAMES.get(event.level, event.level))] += 1
+        name = event.fields.get("evento")
+        if name:
+            self.por_evento[(event.tool, name)] += 1
+            for field, value in event.fields.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.sumas[(event.tool, name, field)] += value
+
+
+class ToolEventBus:
+    """
+    Bus de eventos de las tools con niveles, muestreo por nivel y sinks configurables.
+    Un evento por debajo del nivel activo cuesta una comparación de enteros.
+    """
+
+    def __init__(self, level: int = INFO, sinks: Optional[List[Callable[[ToolEvent], None]]] = None,
+                 sampling: Optional[Dict[int, float]] = None):
+        self.level = level
+        self.sinks = list(sinks) if sinks is not None else [StdoutSink()]
+        self.sampling = dict(sampling or {})
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def emit(self, tool: str, level: int, msg: str, *args: Any, **fields: Any) -> None:
+        if level < self.level:
+            return
+        rate = self.sampling.get(level)
+        if rate is not None and random.random() >= rate:
+            return
+        event = ToolEvent(tool, level, msg, args, fields)
+        for sink in self.sinks:
+            sink(event)
+
+
+class ToolLogger:
+    """Atajo ligado al nombre de una tool: log.info("Guardado %s", entity_id)."""
+
+    __slots__ = ("tool", "_bus")
+
+    def __init__(self, tool: str, bus: ToolEventBus):
+        self.tool = tool
+        self._bus = bus
+
+    def enabled(self, level: int) -> bool:
+        return level >= self._bus.level
+
+    def debug(self, msg: str, *args: Any, **fields: Any) -> None:
+        if DEBUG >= self._bus.level:
+            self._bus.emit(self.tool, DEBUG, msg, *args, **fields)
+
+    def info(self, msg: str, *args: Any, **fields: Any) -> None:
+        if INFO >= self._bus.level:
+            self._bus.emit(self.tool, INFO, msg, *args, **fields)
+
+    def warning(self, msg: str, *args: Any, **fields: Any) -> None:
+        self._bus.emit(self.tool, WARNING, msg, *args, **fields)
+
+    def error(self, msg: str, *args: Any, **fields: Any) -> None:
+        self._bus.emit(self.tool, ERROR, msg, *args, **fields)
+
+
+def _bus_from_env() -> ToolEventBus:
+    level = _LEVELS_BY_NAME.get(os.getenv("ZENDA_TOOL_LOG_LEVEL", "INFO").upper(), INFO)
+    sinks: List[Callable[[ToolEvent], None]] = [StdoutSink()]
+    log_file = os.getenv("ZENDA_TOOL_LOG_FILE")
+    if log_file:
+        sinks.append(FileSink(log_file))
+    return ToolEventBus(level=level, sinks=sinks)
+
+
+_bus = _bus_from_env()
+
+
+def get_tool_event_bus() -> ToolEventBus:
+    return _bus
+
+
+def get_tool_logger(tool: str) -> ToolLogger:
+    return ToolLogger(tool, _bus)
+
+
+def configure_tool_events(level: Optional[int] = None,
+                          sinks: Optional[List[Callable[[ToolEvent], None]]] = None,
+                          sampling: Optional[Dict[int, float]] = None) -> ToolEventBus:
+    """Reconfigura el bus compartido (los ToolLogger existentes ven el cambio)."""
+    if level is not None:
+        _bus.level = level
+    if sinks is not None:
+        _bus.sinks = list(sinks)
+    if sampling is not None:
+        _bus.sampling = dict(sampling)
+    return _bus
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 from uuid import UUID
+from core.session.emotion_trajectory import get_emotion_trajectory
+from core.session.context_window import ContextWindow, session_context_window
 
 class SessionContext(BaseModel):
     # Identificadores básicos
@@ -20,6 +22,7 @@ class SessionContext(BaseModel):
     # Memoria y contexto
     resumen_memoria_larga: Optional[str] = None
     interacciones_recientes: List[Dict[str, Any]] = []
+    entidades_mencionadas: List[Dict[str, Any]] = []  # entidades del cliente nombradas en el turno actual
     
     # Configuración de usuario
     preferencias_usuario: Dict[str, Any] = {}
@@ -35,6 +38,33 @@ class SessionContext(BaseModel):
     think_tool_activado: bool = False
     motivo_tt: Optional[str] = None  # "S" (Sensible), "F" (Falla)
     
+    def _ventana(self) -> ContextWindow:
+        """
+        Ventana de la sesión sobre su buffer circular de turnos (lo alimenta la
+        bitácora): la única fuente de turnos recientes. Si todavía no hay turnos
+        registrados, una armada con interacciones_recientes (guardada entre prompts).
+        """
+        return session_context_window(str(self.id_sesion), self.interacciones_recientes)
+
+    def ultimas_interacciones(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Vista de los últimos n turnos (todos los del buffer si n es None)."""
+        return [record.to_dict() for record in self._ventana().buffer.last(n)]
+
+    def ventana_contexto(self) -> Dict[str, Any]:
+        """
+        Turnos recientes dentro del presupuesto de tokens más el resumen corrido de
+        lo que fue saliendo de la ventana (ver ContextWindow.snapshot).
+        """
+        return self._ventana().snapshot()
+
+    def estado_emocional(self) -> Optional[Dict[str, Any]]:
+        """
+        Trayectoria emocional de la sesión (EWMA por emoción, pico, turnos en el
+        estado actual, carga negativa y su tendencia). None si aún no hubo detecciones.
+        """
+        trajectory = get_emotion_trajectory(str(self.id_sesion), create=False)
+        return trajectory.snapshot() if trajectory is not None else None
+    
     class Config:
         # Permitir campos adicionales para extensibilidad
         extra = "allow"
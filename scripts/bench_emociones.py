@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+bench_emociones.py
+Compara la detección de emociones anterior (scans `any(word in texto)` por emoción)
+con el EmotionMatcher compilado (Aho-Corasick), y cómo escala cada uno con el léxico.
+También mide el scoring por lotes (core.emotion.batch) para backfills; objetivo: 100k msg/s.
+
+USO:
+python scripts/bench_emociones.py [n_mensajes] [procesos]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import copy
+import json
+import random
+import time
+
+from core.emotion.batch import score_emotions
+from core.emotion.matcher import EmotionMatcher, LEXICO_PATH
+
+MENSAJES = [
+    "Hola, tengo un problema con mi jefe, me siento frustrada.",
+    "Sí, me siento agotado y a veces creo que no sirvo para esto.",
+    "Estoy muy ansiosa por la entrevista de mañana, no duermo del estrés.",
+    "Hoy fue un buen día, estoy contenta con cómo salió la reunión.",
+    "No sé qué hacer, mi pareja y yo discutimos otra vez por lo mismo.",
+    "Me da miedo perder el trabajo y no poder pagar el alquiler.",
+    "La verdad estoy harto de que nadie me escuche en la oficina.",
+    "Quería contarte que empecé a hacer ejercicio tres veces por semana.",
+]
+
+
+def legacy_detect(input_text, lexico=None):
+    """Implementación anterior de emotion_detection_function (sin prints)."""
+    lexico = lexico or [
+        ("frustracion", ["frustrado", "agotado", "no puedo", "harto"]),
+        ("alegria", ["feliz", "alegre", "contento", "bien"]),
+        ("ansiedad", ["miedo", "ansioso", "nervioso", "preocupado"]),
+    ]
+    input_lower = input_text.lower()
+    for emocion, palabras in lexico:
+        if any(word in input_lower for word in palabras):
+            return emocion
+    return "neutral"
+
+
+def _medir(fn, textos):
+    start = time.perf_counter()
+    for t in textos:
+        fn(t)
+    elapsed = time.perf_counter() - start
+    return len(textos) / elapsed
+
+
+def _lexico_ampliado(factor):
+    """Léxico real + términos sintéticos que no aparecen en los mensajes."""
+    with open(LEXICO_PATH, "r", encoding="utf-8") as f:
+        lexico = json.load(f)
+    ampliado = copy.deepcopy(lexico)
+    for emocion, cfg in ampliado["emociones"].items():
+        for i in range(factor):
+            cfg["terminos"].append({"t": f"{emocion[:4]}zq{i}x", "peso": 1.0})
+    legacy = [(e, [t["t"] for t in cfg["terminos"]]) for e, cfg in ampliado["emociones"].items()]
+    return ampliado, legacy
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    random.seed(7)
+    textos = [random.choice(MENSAJES) for _ in range(n)]
+
+    print(f"{'terminos/emocion':>18} {'legacy msg/s':>14} {'matcher msg/s':>14}")
+    for factor in (0, 100, 1000):
+        lexico, legacy_lexico = _lexico_ampliado(factor)
+        matcher = EmotionMatcher(lexico)
+        legacy = _medir(lambda t: legacy_detect(t, legacy_lexico), textos)
+        compilado = _medir(matcher.detect, textos)
+        print(f"{factor + 10:>18} {legacy:>14,.0f} {compilado:>14,.0f}")
+
+    # Cobertura: casos que la versión anterior no detectaba (acentos / género / número)
+    matcher = EmotionMatcher.from_file()
+    for texto in ("Estoy frustrada", "Me siento ansiosa", "Mucho estrés", "Estamos agotadas"):
+        print(f"{texto!r:>22}: legacy={legacy_detect(texto):<12} matcher={matcher.detect(texto)['emocion']}")
+
+    # Lotes: backfill de n * 10 mensajes, en serie y (opcional) con pool de procesos
+    procesos = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    lote = textos * 10
+    for p in sorted({1, procesos}):
+        start = time.perf_counter()
+        score_emotions(lote, processes=p)
+        tasa = len(lote) / (time.perf_counter() - start)
+        print(f"batch procesos={p}: {tasa:,.0f} msg/s ({'OK' if tasa >= 100_000 else 'bajo'} objetivo 100k)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+bench_entidades_lote.py
+Compara guardar las entidades extraídas de cada turno con una llamada por entidad
+(una tool call y un commit por entidad) contra una acción "lote" por turno
+(una tool call y una transacción por turno), sobre SQLite en archivo.
+
+USO:
+python scripts/bench_entidades_lote.py [sesiones] [turnos_por_sesion]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import tempfile
+import time
+
+from core.entidades import SQLiteEntityStore, new_entity, save_or_merge, EntityAliasIndex
+
+NOMBRES = ["mi jefe", "Laura", "la empresa", "mi hermana", "el proyecto", "Martín", "la terapeuta", "mi pareja"]
+
+
+def _turnos(sesiones, turnos):
+    random.seed(3)
+    for s in range(sesiones):
+        cliente = f"cliente-{s % 20}"
+        for _ in range(turnos):
+            yield cliente, [{"nombre_entidad": random.choice(NOMBRES), "datos_entidad": {"turno": random.random()}}
+                            for _ in range(random.randint(0, 5))]
+
+
+def _correr(lote, sesiones, turnos):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteEntityStore(os.path.join(tmp, "entidades.db"))
+        index = EntityAliasIndex(store)
+        llamadas = operaciones = 0
+        start = time.perf_counter()
+        for cliente, entidades in _turnos(sesiones, turnos):
+            if not entidades:
+                continue
+            operaciones += len(entidades)
+            if lote:
+                llamadas += 1
+                with store.transaction():
+                    for data in entidades:
+                        save_or_merge(cliente, new_entity(cliente, data), index)
+            else:
+                for data in entidades:
+                    llamadas += 1
+                    save_or_merge(cliente, new_entity(cliente, data), index)
+        elapsed = time.perf_counter() - start
+        store.close()
+    return llamadas, operaciones, elapsed
+
+
+def main():
+    sesiones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    turnos = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    uno, ops, t_uno = _correr(False, sesiones, turnos)
+    lote, _, t_lote = _correr(True, sesiones, turnos)
+    print(f"operaciones: {ops} en {sesiones} sesiones")
+    print(f"una por entidad: {uno / sesiones:.1f} tool calls/sesión, {t_uno * 1000:.0f} ms")
+    print(f"lote por turno:  {lote / sesiones:.1f} tool calls/sesión, {t_lote * 1000:.0f} ms")
+    print(f"reducción de round-trips: {100 * (1 - lote / uno):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
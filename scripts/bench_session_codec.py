@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+bench_session_codec.py
+Compara snapshots de SessionContext con el codec binario (core/session/codec.py)
+contra model_dump_json / model_validate_json de Pydantic: tamaño total y tiempo
+de codificar y decodificar todas las sesiones.
+
+Ojo: no es la misma operación de lectura. model_validate_json valida cada campo;
+decode_context usa model_construct y confía en los tipos del codec (no valida).
+
+USO:
+python scripts/bench_session_codec.py [sesiones]
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import time
+import uuid
+
+from core.session import codec
+from schemas import SessionContext
+
+FRASES = ["Hoy tuve otra discusión con mi jefe.", "Me cuesta dormir desde hace semanas.",
+          "Entiendo, ¿qué sentiste en ese momento?", "Quisiera poder decirle que no.",
+          "¿Qué te gustaría que fuera distinto la próxima vez?"]
+
+
+def _sesiones(n):
+    random.seed(7)
+    for _ in range(n):
+        yield SessionContext(
+            id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4(),
+            fase_actual=random.choice(codec.ENUMS["fase_actual"]),
+            modo_asistencia=random.choice(codec.ENUMS["modo_asistencia"]),
+            guion_dt="Exploración inicial del problema del cliente.",
+            criterios={"foco": "rapport", "objetivo_inicial": "identificar_tema_principal"},
+            pautas_priorizadas=["ICF-1.1_escucha_activa", "ICF-2.0_preg_abiertas"],
+            resumen_memoria_larga="El cliente tiene un conflicto laboral y trabajó la gestión del estrés.",
+            interacciones_recientes=[{"actor": random.choice(["cliente", "zenda"]), "text": random.choice(FRASES)}
+                                     for _ in range(20)],
+            preferencias_usuario={"idioma": "es", "tono": "cercano", "voz": "femenina"},
+            especialidad_principal="ICF", especialidades_secundarias=["Ontología", "Gestalt"],
+        )
+
+
+def _medir(nombre, sesiones, encode, decode):
+    start = time.perf_counter()
+    blobs = [encode(s) for s in sesiones]
+    t_enc = time.perf_counter() - start
+    start = time.perf_counter()
+    for blob in blobs:
+        decode(blob)
+    t_dec = time.perf_counter() - start
+    n = len(sesiones)
+    print(f"{nombre:<30} {sum(map(len, blobs)) / n:7.0f} B/sesión  "
+          f"encode {t_enc / n * 1e6:6.1f} µs  decode {t_dec / n * 1e6:6.1f} µs")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    sesiones = list(_sesiones(n))
+    print(f"{n} sesiones, empaquetado: {'msgpack (C)' if codec.msgpack else 'Python puro'}")
+    _medir("model_dump_json (validado)", sesiones, lambda s: s.model_dump_json().encode(),
+           SessionContext.model_validate_json)
+    _medir("codec binario (sin validar)", sesiones, codec.encode_context, codec.decode_context)
+    print("decode del codec = model_construct, sin validación; model_validate_json valida cada campo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+from datetime import datetime, timedelta
+from core.bitacora import SQLiteBitacoraSink, BitacoraQuery, BitacoraArchive, archive_session, scan_archives
+
+def _sesion(sink, session_id, dia, n=40):
+    base = datetime(2025, 5, dia, 10, 0, 0)
+    sink.write_batch([{
+        "session_id": session_id,
+        "user_id": "22222222-2222-2222-2222-222222222222",
+        "event_id": f"{session_id}-{i}",
+        "created_at": base + timedelta(minutes=i),
+        "actor": "cliente" if i % 2 == 0 else "zenda",
+        "event_type": "alerta" if i == 7 else "msg",
+        "content_text": f"Me siento agotado con mi trabajo, turno {i}" if i != 3 else None,
+        "status": "ok",
+        "metadata": {"canal": "T", "tt": None, "guia": None},
+    } for i in range(n)])
+
+def test_archivo_columnar_con_proyeccion_y_predicados(tmp_path):
+    sink = SQLiteBitacoraSink(":memory:")
+    s1, s2 = "11111111-1111-1111-1111-111111111111", "33333333-3333-3333-3333-333333333333"
+    _sesion(sink, s1, dia=1)
+    _sesion(sink, s2, dia=20)
+    query = BitacoraQuery(sink)
+
+    path = archive_session(s1, str(tmp_path), query=query)
+    archive = BitacoraArchive(path)
+    originales = query.find(session_id=s1)
+    assert archive.read() == originales
+    assert os.path.getsize(path) < len(json.dumps(originales))
+
+    alertas = archive.read(columns=["content_text", "created_at"], event_types="alerta")
+    assert alertas == [{"content_text": "Me siento agotado con mi trabajo, turno 7",
+                        "created_at": "2025-05-01T10:07:00"}]
+    assert archive.read(event_types="interrupcion") == []
+    assert not archive.may_match(desde=datetime(2025, 5, 2))
+
+    archive_session(s2, str(tmp_path), query=query)
+    resultado = list(scan_archives(str(tmp_path), columns=["session_id", "actor"], event_types="alerta",
+                                   desde=datetime(2025, 5, 15)))
+    assert resultado == [{"session_id": s2, "actor": "zenda"}]
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import threading
+from core.bitacora import BitacoraBus
+
+def _entrada(session_id, actor, tipo, texto=""):
+    return {"session_id": session_id, "actor": actor, "event_type": tipo, "content_text": texto}
+
+def test_suscripcion_filtra_y_recibe_desde_otro_hilo():
+    async def escenario():
+        bus = BitacoraBus()
+        sub = bus.subscribe(session_id="s1", event_types=["emo", "alerta"])
+        todas = bus.subscribe()
+
+        def productor():
+            bus.publish(_entrada("s1", "cliente", "msg"))
+            bus.publish(_entrada("s1", "emo", "emo", "frustracion"))
+            bus.publish(_entrada("s2", "emo", "emo", "otra sesion"))
+            bus.publish(_entrada("s1", "sistema", "alerta", "riesgo"))
+
+        hilo = threading.Thread(target=productor)
+        hilo.start()
+        recibidas = []
+        async for entry in sub:
+            recibidas.append(entry["content_text"])
+            if len(recibidas) == 2:
+                sub.close()
+        hilo.join()
+        assert recibidas == ["frustracion", "riesgo"]
+        assert todas.stats()["recibidas"] == 4
+        assert bus.suscripciones == 1
+
+    asyncio.run(escenario())
+
+def test_buffer_acotado_descarta_y_cuenta_lag():
+    async def escenario():
+        bus = BitacoraBus()
+        sub = bus.subscribe(maxsize=3)
+        for i in range(10):
+            bus.publish(_entrada("s1", "cliente", "msg", str(i)))
+        assert sub.stats() == {"recibidas": 10, "entregadas": 0, "descartadas": 7, "pendientes": 3, "lag": 10}
+        assert (await sub.__anext__())["content_text"] == "7"
+        assert sub.stats()["entregadas"] == 1
+
+    asyncio.run(escenario())
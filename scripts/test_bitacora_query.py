@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import re
+from datetime import datetime, timedelta
+from core.bitacora import SQLiteBitacoraSink, BitacoraQuery, SupabaseBitacoraQuery, SupabaseBitacoraSink
+
+SESION = "11111111-1111-1111-1111-111111111111"
+CLIENTE = "22222222-2222-2222-2222-222222222222"
+
+def _sink_con_datos():
+    sink = SQLiteBitacoraSink(":memory:")
+    base = datetime(2025, 5, 1, 10, 0, 0)
+    filas = []
+    for i in range(20):
+        filas.append({
+            "session_id": SESION if i < 15 else "33333333-3333-3333-3333-333333333333",
+            "user_id": CLIENTE,
+            "event_id": f"ev-{i}",
+            "created_at": base + timedelta(minutes=i),
+            "actor": "cliente" if i % 2 == 0 else "zenda",
+            "event_type": "emo" if i % 5 == 0 else "msg",
+            "content_text": f"texto {i}",
+            "pautas_codigos": "ICF-1.1_escucha_activa,ICF-2.0_preg_abiertas" if i % 3 == 0 else None,
+            "status": "ok",
+            "metadata": {"canal": "T", "i": i},
+        })
+    sink.write_batch(filas)
+    return sink
+
+def test_query_filtra_proyecta_y_pagina():
+    query = BitacoraQuery(_sink_con_datos())
+    assert query.count(session_id=SESION) == 15
+    assert query.count(user_id=CLIENTE) == 20
+
+    emociones = query.find(session_id=SESION, event_types="emo", columns=["content_text", "metadata"])
+    assert [e["content_text"] for e in emociones] == ["texto 0", "texto 5", "texto 10"]
+    assert set(emociones[0]) == {"content_text", "metadata"}
+    assert emociones[1]["metadata"]["i"] == 5
+
+    pagina = query.find(session_id=SESION, actors=["zenda"], limit=3, offset=2, columns=["content_text"])
+    assert [e["content_text"] for e in pagina] == ["texto 5", "texto 7", "texto 9"]
+
+    rango = query.find(session_id=SESION, desde=datetime(2025, 5, 1, 10, 3), hasta=datetime(2025, 5, 1, 10, 6))
+    assert len(rango) == 4
+
+    con_pauta = query.find(session_id=SESION, pauta="ICF-2.0_preg_abiertas", columns=["id"])
+    assert len(con_pauta) == 5
+    assert query.find(session_id=SESION, pauta="ICF-2.0", columns=["id"]) == []
+    assert len(query.find(session_id=SESION, pauta="ICF-1.1_escucha_activa", columns=["id"])) == 5
+    assert query.find(session_id=SESION, pauta="ICF-1.1%", columns=["id"]) == []
+
+    resto = query.find(session_id=SESION, offset=12, columns=["content_text"])   # offset sin limit
+    assert [e["content_text"] for e in resto] == ["texto 12", "texto 13", "texto 14"]
+
+def test_query_rechaza_columnas_desconocidas():
+    query = BitacoraQuery(_sink_con_datos())
+    try:
+        query.find(session_id=SESION, columns=["id; DROP TABLE bitacora"])
+        assert False, "Debió lanzar ValueError"
+    except ValueError:
+        assert query.count() == 20
+
+
+class _ConsultaSupabase:
+    def __init__(self, cliente):
+        self.cliente, self.filtros = cliente, []
+
+    def __getattr__(self, nombre):
+        def metodo(*args, **kwargs):
+            self.filtros.append((nombre, args))
+            return self
+        return metodo
+
+    def range(self, inicio, fin):
+        self.inicio, self.fin = inicio, fin
+        return self
+
+    def execute(self):
+        self.cliente.consultas.append(self.filtros)
+        self.data = self.cliente.filas[self.inicio:min(self.fin + 1, self.inicio + 1000)]
+        return self
+
+
+class _ClienteSupabase:
+    def __init__(self, filas):
+        self.filas, self.consultas = filas, []
+
+    def table(self, nombre):
+        return _ConsultaSupabase(self)
+
+
+def test_query_supabase_offset_sin_limit_y_pauta_exacta():
+    cliente = _ClienteSupabase([{"id": i} for i in range(2500)])
+    query = SupabaseBitacoraQuery(SupabaseBitacoraSink(client=cliente))
+    filas = query.find(session_id=SESION, pauta="ICF-2.0", offset=10, columns=["id"])
+    assert [f["id"] for f in filas] == list(range(10, 2500))       # paginado hasta una página corta
+    assert len(cliente.consultas) == 3
+    (patron,) = [args[2] for nombre, args in cliente.consultas[0] if nombre == "filter"]
+    assert re.search(patron, "ICF-1.1_escucha_activa,ICF-2.0")
+    assert not re.search(patron, "ICF-2.0_preg_abiertas")
+    assert not re.search(patron, "XICF-2.0")
@@ -0,0 +1,186 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+from datetime import datetime
+from core.bitacora import BitacoraWriter, BitacoraBackpressureError, SQLiteBitacoraSink, BitacoraSink
+
+def _fila(i):
+    return {
+        "session_id": "11111111-1111-1111-1111-111111111111",
+        "user_id": "22222222-2222-2222-2222-222222222222",
+        "created_at": datetime.now(),
+        "actor": "cliente",
+        "event_type": "msg",
+        "content_text": f"mensaje {i}",
+        "status": "ok",
+        "metadata": {"canal": "T"},
+    }
+
+def test_writer_vuelca_en_lote_y_al_cerrar():
+    sink = SQLiteBitacoraSink(":memory:")
+    writer = BitacoraWriter(sink, batch_size=10, flush_interval=10).start()
+    for i in range(25):
+        writer.submit(_fila(i))
+    assert writer.flush(timeout=5)
+    assert sink.count() == 25
+    metrics = writer.metrics()
+    assert metrics["escritas"] == 25
+    assert metrics["lotes"] >= 3
+    assert metrics["profundidad_cola"] == 0
+    writer.submit(_fila(99))
+    writer.close()
+    assert writer.metrics()["escritas"] == 26
+
+class _SinkBloqueado(BitacoraSink):
+    def __init__(self):
+        self.liberar = threading.Event()
+    def write_batch(self, rows):
+        self.liberar.wait(5)
+
+def test_writer_backpressure_con_cola_llena():
+    sink = _SinkBloqueado()
+    writer = BitacoraWriter(sink, batch_size=1, flush_interval=0.01, max_queue=2, put_timeout=0.05).start()
+    try:
+        for i in range(10):
+            writer.submit(_fila(i))
+        assert False, "Debió lanzar BitacoraBackpressureError"
+    except BitacoraBackpressureError:
+        assert writer.metrics()["rechazos_backpressure"] == 1
+    finally:
+        sink.liberar.set()
+        writer.close()
+
+def test_wal_reproduce_lo_no_confirmado(tmp_path):
+    from core.bitacora import BitacoraWAL
+    wal = BitacoraWAL(str(tmp_path), fsync_every=1)
+    filas = [dict(_fila(i), event_id=f"ev-{i}") for i in range(5)]
+    lsns = [wal.append(f) for f in filas]
+    wal.ack(lsns[1])
+    # Simula una caída: el proceso muere sin confirmar el resto ni cerrar el WAL
+    with open(wal._file_path, "ab") as f:
+        f.write(b"99\t123\t{\"torn")
+
+    sink = SQLiteBitacoraSink(":memory:")
+    sink.write_batch([filas[2]])  # ya había llegado al sink antes de la caída
+    recuperado = BitacoraWAL(str(tmp_path))
+    assert recuperado.recover(sink) == 3
+    assert sink.count() == 3
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".wal")]
+    assert BitacoraWAL(str(tmp_path)).recover(sink) == 0
+
+class _SinkIntermitente(SQLiteBitacoraSink):
+    def __init__(self, fallas):
+        super().__init__(":memory:")
+        self.fallas = fallas
+    def write_batch(self, rows):
+        if self.fallas:
+            self.fallas -= 1
+            raise ConnectionError("sink caído")
+        super().write_batch(rows)
+
+def test_rechazo_por_backpressure_no_queda_en_el_wal(tmp_path):
+    from core.bitacora import BitacoraWAL
+    sink = _SinkBloqueado()
+    wal = BitacoraWAL(str(tmp_path))
+    writer = BitacoraWriter(sink, batch_size=1, flush_interval=0.01, max_queue=2, put_timeout=0.05, wal=wal).start()
+    aceptadas = 0
+    try:
+        for i in range(10):
+            writer.submit(dict(_fila(i), event_id=f"ev-{i}"))
+            aceptadas += 1
+    except BitacoraBackpressureError:
+        pass
+    finally:
+        sink.liberar.set()
+    assert wal._last_lsn == aceptadas
+    writer.close()
+
+def test_lote_descartado_se_reproduce_al_volver_el_sink(tmp_path):
+    from core.bitacora import BitacoraWAL
+    sink = _SinkIntermitente(fallas=1)
+    wal = BitacoraWAL(str(tmp_path))
+    writer = BitacoraWriter(sink, batch_size=5, flush_interval=10, max_retries=0, wal=wal).start()
+    for i in range(5):
+        writer.submit(dict(_fila(i), event_id=f"ev-{i}"))
+    assert writer.flush(timeout=5)
+    assert sink.count() == 0 and writer.metrics()["descartadas"] == 5 and wal.acked_lsn == 0
+    for i in range(5, 8):
+        writer.submit(dict(_fila(i), event_id=f"ev-{i}"))
+    assert writer.flush(timeout=5)
+    assert sink.count() == 8
+    assert wal.acked_lsn == 8 and not list(wal.pending())
+    writer.submit(dict(_fila(8), event_id="ev-8"))
+    assert writer.flush(timeout=5) and wal.acked_lsn == 9   # los acks siguen después del desbloqueo
+    writer.close()
+
+def test_envios_concurrentes_se_confirman_completos(tmp_path):
+    from core.bitacora import BitacoraWAL
+    sink = SQLiteBitacoraSink(":memory:")
+    wal = BitacoraWAL(str(tmp_path))
+    writer = BitacoraWriter(sink, batch_size=7, flush_interval=0.01, wal=wal).start()
+
+    def enviar(t):
+        for i in range(50):
+            writer.submit(dict(_fila(i), event_id=f"ev-{t}-{i}"))
+
+    hilos = [threading.Thread(target=enviar, args=(t,)) for t in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert writer.flush(timeout=5)
+    assert sink.count() == 400 and wal.acked_lsn == 400 and not list(wal.pending())
+    writer.close()
+
+def test_arranque_con_sink_caido_no_rompe(tmp_path, monkeypatch):
+    from core.bitacora import BitacoraWAL, get_bitacora_writer, set_bitacora_writer
+    from core.bitacora import writer as writer_mod
+    wal = BitacoraWAL(str(tmp_path / "bitacora_wal"))
+    wal.append(dict(_fila(0), event_id="ev-previo"))
+    wal.close()
+    sink = _SinkIntermitente(fallas=1)
+    monkeypatch.setenv("ZENDA_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(writer_mod, "_default_sink", lambda: sink)
+    set_bitacora_writer(None)
+    try:
+        writer = get_bitacora_writer()
+        writer.submit(dict(_fila(1), event_id="ev-nuevo"))
+        assert writer.flush(timeout=5)
+        assert sink.count() == 2   # lo pendiente del WAL llegó con el primer volcado
+        writer.close()
+    finally:
+        set_bitacora_writer(None)
+
+def test_sink_base_es_abstracto():
+    try:
+        BitacoraSink()
+        assert False, "Debió lanzar TypeError"
+    except TypeError:
+        pass
+
+
+def test_cierre_con_plazo_vencido_no_cierra_debajo_del_volcado():
+    liberar = threading.Event()
+
+    class _SinkLento(SQLiteBitacoraSink):
+        cerrado = False
+
+        def write_batch(self, rows):
+            liberar.wait(5)
+            super().write_batch(rows)
+
+        def close(self):
+            _SinkLento.cerrado = True
+            super().close()
+
+    sink = _SinkLento(":memory:")
+    writer = BitacoraWriter(sink, batch_size=1, flush_interval=10).start()
+    writer.submit(_fila(0))
+    writer.close(timeout=0.05)
+    assert not _SinkLento.cerrado       # el hilo sigue escribiendo: el sink queda abierto
+    assert sink.count() == 0
+    liberar.set()
+    writer._thread.join(5)
+    assert _SinkLento.cerrado           # lo cierra el hilo al terminar
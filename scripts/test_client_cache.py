@@ -0,0 +1,50 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.cache import ClientDataCache, TTLCache
+
+
+class _Reloj:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def test_ttl_y_lru():
+    reloj = _Reloj()
+    cache = TTLCache(maxsize=2, ttl=10, clock=reloj)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1          # "a" pasa a ser la más reciente
+    cache.put("c", 3)                   # desaloja "b"
+    assert cache.get("b") is None
+    reloj.t = 11
+    assert cache.get("a") is None       # vencida
+    stats = cache.stats()
+    assert stats["aciertos"] == 1
+    assert stats["fallos"] == 2
+    assert stats["desalojos"] == 1
+    assert stats["vencidas"] == 1
+
+
+def test_lectura_e_invalidacion():
+    cache = ClientDataCache(maxsize=8, ttl=60)
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        return {"preferencias": {"tono": "cercano"}, "entidades_iniciales": []}
+
+    datos = cache.get("c1", cargar)
+    datos["preferencias"]["tono"] = "formal"    # la copia no toca la caché
+    assert cache.get("c1", cargar)["preferencias"]["tono"] == "cercano"
+    assert len(cargas) == 1
+
+    cache.register_session("s1", "c1")
+    assert cache.invalidate_session("s1")
+    cache.get("c1", cargar)
+    assert len(cargas) == 2
+    assert cache.stats()["invalidaciones"] == 1
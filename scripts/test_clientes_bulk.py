@@ -0,0 +1,78 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.clientes import ClientDataSource, chunked, iter_clients_data
+
+
+class _FuenteFalsa(ClientDataSource):
+    """Clientes pares existen; cada uno tiene una entidad y dos sesiones (la reciente primero)."""
+
+    def __init__(self):
+        self.consultas = []
+
+    def fetch_clientes(self, ids):
+        self.consultas.append(("clientes", len(ids)))
+        return [{"id_cliente": i, "preferencias": {"tono": "cercano"}} for i in ids if int(i) % 2 == 0]
+
+    def fetch_entidades(self, ids):
+        self.consultas.append(("entidades", len(ids)))
+        return [{"id_cliente": i, "nombre_entidad": f"Jefe {i}"} for i in ids if int(i) % 2 == 0]
+
+    def fetch_sesiones(self, ids):
+        self.consultas.append(("sesiones", len(ids)))
+        return [row for i in ids if int(i) % 2 == 0
+                for row in ({"id_cliente": i, "historical_summary": f"reciente {i}", "csat": 9},
+                            {"id_cliente": i, "historical_summary": f"vieja {i}", "csat": 5})]
+
+
+def test_join_por_bloques():
+    fuente = _FuenteFalsa()
+    datos = dict(iter_clients_data(["2", "3", "2"], fuente, chunk_size=10))
+    assert list(datos) == ["2", "3"]
+    assert datos["2"]["preferencias"] == {"tono": "cercano"}
+    assert datos["2"]["entidades_iniciales"] == [{"nombre_entidad": "Jefe 2"}]
+    assert datos["2"]["resumen_memoria_larga"] == "reciente 2"
+    assert datos["2"]["CSAT"] == 9
+    assert datos["3"]["resumen_memoria_larga"] is None          # cliente inexistente: valores por defecto
+    assert datos["3"]["preferencias"]["idioma"] == "es"
+    assert len(fuente.consultas) == 3
+
+
+def test_100k_clientes_en_bloques_acotados():
+    fuente = _FuenteFalsa()
+    ids = (str(i) for i in range(100_000))       # generador: no se materializa la lista
+    total = sum(1 for _ in iter_clients_data(ids, fuente, chunk_size=500))
+    assert total == 100_000
+    assert len(fuente.consultas) == 3 * 200
+    assert max(n for _, n in fuente.consultas) == 500
+
+
+def test_chunked_es_perezoso():
+    bloques = chunked(iter(range(7)), 3)
+    assert next(bloques) == ["0", "1", "2"]
+    assert list(bloques) == [["3", "4", "5"], ["6"]]
+
+
+def test_fuente_base_es_abstracta():
+    try:
+        ClientDataSource()
+        assert False, "Debió lanzar TypeError"
+    except TypeError:
+        pass
+
+
+def test_datos_de_un_cliente_por_la_cache_compartida():
+    from core.cache import invalidate_client_data
+    from core.clientes import get_client_data, load_client_data
+    fuente = _FuenteFalsa()
+    assert load_client_data("4", fuente)["resumen_memoria_larga"] == "reciente 4"
+    assert len(fuente.consultas) == 3
+    invalidate_client_data("4")
+    try:
+        datos = get_client_data(4, fuente)
+        assert datos["entidades_iniciales"] == [{"nombre_entidad": "Jefe 4"}]
+        assert get_client_data("4", fuente) == datos
+        assert len(fuente.consultas) == 6        # la segunda lectura sale de la caché
+    finally:
+        invalidate_client_data("4")
@@ -0,0 +1,122 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uuid
+
+from core.session import (ContextWindow, TurnRingBuffer, close_session, drop_context_window, estimate_tokens,
+                          fallback_context_window, get_context_store, get_context_window, get_emotion_trajectory,
+                          get_turn_buffer, prompt_budget, record_turn, resumen_extractivo, update_emotion_trajectory)
+from schemas import SessionContext
+
+
+def _turno(i):
+    return {"actor": "cliente" if i % 2 else "zenda", "text": f"Turno {i}. " + "detalle " * 20}
+
+
+def test_respeta_presupuesto_y_pliega_al_resumen():
+    window = ContextWindow(presupuesto=200, presupuesto_resumen=60)
+    for i in range(10):
+        window.append(_turno(i))
+    snap = window.snapshot()
+    assert snap["tokens_turnos"] <= 200
+    assert snap["turnos"][-1] == _turno(9)
+    assert snap["plegados"] == 10 - len(snap["turnos"])
+    assert snap["tokens_resumen"] <= 60
+    assert snap["resumen"].splitlines()[-1].startswith(f"{_turno(9 - len(snap['turnos']))['actor']}: Turno")
+
+
+def test_ultimo_turno_queda_aunque_exceda():
+    window = ContextWindow(presupuesto=10)
+    window.append({"actor": "cliente", "text": "x" * 400})
+    assert len(window) == 1 and window.plegados == 0
+
+
+def test_costo_plano_en_sesiones_largas():
+    llamadas = []
+
+    def resumir(resumen, turnos, presupuesto):
+        llamadas.append(len(turnos))
+        return resumen_extractivo(resumen, turnos, presupuesto)
+
+    window = ContextWindow(presupuesto=300, presupuesto_resumen=80, resumir=resumir)
+    tamanos = []
+    for i in range(5000):
+        window.append(_turno(i))
+        if i in (100, 4999):
+            snap = window.snapshot()
+            tamanos.append((len(snap["turnos"]), snap["tokens_resumen"]))
+    assert tamanos[0][0] == tamanos[1][0]
+    assert tamanos[1][1] <= 80
+    assert max(llamadas) <= 2   # pliegue incremental: sólo los turnos que salen
+
+
+def test_resumen_extractivo_recorta_lineas():
+    resumen = resumen_extractivo("", [{"actor": "cliente", "text": "Primera oración. Segunda oración larga."},
+                                      {"actor": "zenda", "text": "y" * 500}], 1000)
+    lineas = resumen.splitlines()
+    assert lineas[0] == "cliente: Primera oración."
+    assert len(lineas[1]) <= len("zenda: ") + 160
+
+
+def test_registro_por_bitacora_y_sesion():
+    ctx = SessionContext(id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4(),
+                         interacciones_recientes=[_turno(i) for i in range(200)])
+    sesion = str(ctx.id_sesion)
+    respaldo = ctx.ventana_contexto()   # sin turnos registrados: desde interacciones_recientes, acotado igual
+    assert respaldo["plegados"] > 0 and respaldo["turnos"][-1] == _turno(199)
+    assert record_turn(sesion, "cliente", "msg", "me siento agotado")
+    assert not record_turn(sesion, "emo", "emo", "Emoción detectada")
+    assert ctx.ventana_contexto()["turnos"] == [{"actor": "cliente", "text": "me siento agotado"}]
+    assert ctx.ultimas_interacciones() == ctx.ventana_contexto()["turnos"]   # una sola fuente de turnos
+    close_session(sesion)
+
+
+def test_ventana_de_respaldo_se_reutiliza_entre_prompts():
+    sesion = str(uuid.uuid4())
+    turnos = [_turno(i) for i in range(50)]
+    ventana = fallback_context_window(sesion, turnos)
+    plegados = ventana.plegados
+    assert fallback_context_window(sesion, turnos) is ventana and ventana.plegados == plegados   # sin rearmar
+    turnos.append(_turno(50))
+    assert fallback_context_window(sesion, turnos) is ventana and ventana.turnos()[-1] == _turno(50)
+    otra = fallback_context_window(sesion, [_turno(100)])        # lista reemplazada: se rearma
+    assert otra is not ventana and otra.turnos() == [_turno(100)]
+    drop_context_window(sesion)
+    assert fallback_context_window(sesion, [_turno(100)]) is not otra
+
+
+def test_cerrar_sesion_libera_su_estado():
+    sesion = str(uuid.uuid4())
+    record_turn(sesion, "cliente", "msg", "hola")
+    update_emotion_trajectory(sesion, {"emocion": "alegria", "scores": {"alegria": 1.0}})
+    get_context_store().write(sesion, {"fase_actual": "Inicio_Sesion"})
+    close_session(sesion)
+    assert get_emotion_trajectory(sesion, create=False) is None
+    assert get_context_store().get(sesion) is None
+    assert get_turn_buffer(sesion, create=False) is None
+    assert get_context_window(sesion, create=False) is None
+
+
+def test_ventana_lee_del_buffer_y_pliega_antes_de_que_se_pise():
+    buffer = TurnRingBuffer(capacity=4)
+    window = ContextWindow(presupuesto=10000, presupuesto_resumen=10000, buffer=buffer)
+    for i in range(10):
+        window.append(_turno(i))
+    assert len(window) == 3                       # capacity - 1: el más viejo ya está plegado
+    assert window.turnos() == [_turno(i) for i in range(7, 10)]
+    assert window.plegados == 7 and len(window.resumen.splitlines()) == 7
+
+    sesion = str(uuid.uuid4())
+    for i in range(3):
+        record_turn(sesion, _turno(i)["actor"], "msg", _turno(i)["text"])
+    ventana = get_context_window(sesion, create=False)
+    assert ventana.buffer is get_turn_buffer(sesion) and ventana.turnos() == [_turno(i) for i in range(3)]
+    close_session(sesion)
+
+
+def test_reparto_por_seccion():
+    reparto = prompt_budget({"sistema": "a" * 400, "input": "hola"}, presupuesto=50)
+    assert reparto["secciones"] == {"sistema": 100, "input": 1}
+    assert reparto["total"] == 101 and reparto["excedido"]
+    assert estimate_tokens("") == 0 and estimate_tokens("abcde") == 2
@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from core.emotion import StreamingProsodyAnalyzer, analyze_audio, iter_audio_emotion
+
+SR = 16000
+
+def _tono(f0, amplitud, vibrato=0.0, segundos=2.0):
+    t = np.arange(int(SR * segundos)) / SR
+    fase = 2 * np.pi * np.cumsum(f0 * (1 + vibrato * np.sin(2 * np.pi * 3 * t))) / SR
+    return (amplitud * 32767 * np.sin(fase)).astype("<i2").tobytes()
+
+def test_prosodia_por_activacion():
+    assert analyze_audio(_tono(260, 0.6, 0.3))["emocion"] == "ansiedad"
+    assert analyze_audio(_tono(120, 0.02))["emocion"] == "tristeza"
+    assert analyze_audio(bytes(SR * 2))["emocion"] == "neutral"
+    assert abs(analyze_audio(_tono(200, 0.3))["prosodia"]["pitch_hz"] - 200) < 5
+
+def test_streaming_emite_provisionales_y_no_depende_del_corte():
+    audio = _tono(260, 0.6, 0.3)
+    chunks = [audio[i:i + 1001] for i in range(0, len(audio), 1001)]  # cortes impares, a mitad de muestra
+    estimaciones = list(iter_audio_emotion(chunks))
+    assert estimaciones[0]["provisional"] and estimaciones[0]["prosodia"]["segundos"] <= 0.064
+    assert not estimaciones[-1]["provisional"]
+    entero = StreamingProsodyAnalyzer(SR)
+    entero.feed(audio)
+    assert entero.finish()["prosodia"] == estimaciones[-1]["prosodia"]
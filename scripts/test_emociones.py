@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.emotion import EmotionBatchScorer, get_emotion_matcher, score_emotions
+from core.utils.aho_corasick import AhoCorasick
+
+def test_aho_corasick_encuentra_solapados():
+    ac = AhoCorasick()
+    for p in ("he", "she", "his", "hers"):
+        ac.add(p, p)
+    assert sorted(p for _, _, p in ac.iter("ushers")) == ["he", "hers", "she"]
+
+def test_matcher_pliega_acentos_e_inflexiones():
+    matcher = get_emotion_matcher()
+    assert matcher.detect("Estoy frustrada con mi jefe")["emocion"] == "frustracion"
+    assert matcher.detect("Me siento ansiosa")["emocion"] == "ansiedad"
+    assert matcher.detect("MUCHO ESTRÉS")["emocion"] == "ansiedad"
+    assert matcher.detect("Estamos agotadas")["emocion"] == "frustracion"
+    assert matcher.detect("También fui al cine")["emocion"] == "neutral"  # "bien" sólo como palabra
+
+def test_matcher_pesos_intensificadores_y_negacion():
+    matcher = get_emotion_matcher()
+    assert matcher.score("estoy frustrado")["frustracion"] == 1.5
+    assert matcher.score("estoy muy frustrado")["frustracion"] == 2.25
+    assert matcher.detect("estoy muy frustrado")["nivel"] == "alto"
+    assert matcher.score("no estoy feliz")["alegria"] == 0.0
+    # "no puedo más" cuenta una sola vez, con el término más largo
+    assert matcher.score("no puedo más")["frustracion"] == 2.0
+
+def test_batch_coincide_con_matcher():
+    matcher = get_emotion_matcher()
+    textos = ["No puedo más, estoy harta", "no estoy feliz", "Jamás estuve tan ANSIOSA",
+              "estoy muy frustrado", "", "También fui al cine", "Pánico total"]
+    scores, labels = EmotionBatchScorer().score(textos)
+    for texto, fila, label in zip(textos, scores, labels):
+        esperado = matcher.score(texto)
+        assert [round(float(x), 4) for x in fila] == [round(esperado[e], 4) for e in matcher.emotions]
+        assert label == matcher.detect(texto)["emocion"]
+    # Por lotes con chunks pequeños: mismo resultado y mismo orden
+    scores_chunks, labels_chunks = score_emotions(iter(textos), chunk_size=3)
+    assert (scores_chunks == scores).all() and list(labels_chunks) == list(labels)
+
+def test_batch_respeta_puntuacion_como_el_matcher():
+    import random
+    matcher = get_emotion_matcher()
+    textos = ["no, estoy feliz", "muy, feliz", "Estoy feliz. No. Estoy contento", "muy feliz", "no feliz",
+              "no muy feliz", "no estoy, feliz", "muy-feliz", "no ¡feliz!", "no, puedo más", "no  puedo más",
+              "nunca estuve feliz; ni contento", "re feliz\nno\nfeliz"]
+    palabras = ["no", "ni", "nunca", "muy", "tan", "re", "feliz", "contento", "frustrado", "ansiosa", "puedo",
+                "más", "estoy", "me", "rindo", "pánico", "harta", "bien", "hoy"]
+    separadores = [" ", "  ", ", ", ". ", "; ", "-", " ¡", "! ", "\n", "... "]
+    random.seed(3)
+    for _ in range(400):
+        partes = []
+        for _ in range(random.randint(1, 8)):
+            partes += [random.choice(palabras), random.choice(separadores)]
+        textos.append("".join(partes))
+    scores, labels = EmotionBatchScorer().score(textos)
+    for texto, fila, label in zip(textos, scores, labels):
+        esperado = matcher.detect(texto)
+        assert [round(float(x), 4) for x in fila] == [round(esperado["scores"][e], 4) for e in matcher.emotions], texto
+        assert label == esperado["emocion"], texto
+
+
+def test_batch_frases_con_negador_despues_de_otro_negador():
+    import random
+    matcher = get_emotion_matcher()
+    textos = ["No, no puedo más", "no no puedo más", "nunca no puedo", "no puedo más", "ni, no puedo más"]
+    palabras = ["no", "nunca", "ni", "jamás", "No", "muy", "puedo", "más", "feliz", "estoy", "harta", "bien"]
+    separadores = [" ", ", ", ". ", "  ", "-", "\n"]
+    random.seed(11)
+    for _ in range(2000):
+        partes = []
+        for _ in range(random.randint(1, 6)):
+            # Frases que empiezan con negador, seguido de otro negador
+            partes += [random.choice(palabras), random.choice(separadores)]
+            if random.random() < 0.3:
+                partes += [random.choice(["no", "nunca"]), random.choice(separadores), "no puedo más", random.choice(separadores)]
+        textos.append("".join(partes))
+    scores, _ = EmotionBatchScorer().score(textos)
+    for texto, fila in zip(textos, scores):
+        esperado = matcher.score(texto)
+        assert [round(float(x), 4) for x in fila] == [round(esperado[e], 4) for e in matcher.emotions], texto
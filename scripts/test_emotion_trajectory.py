@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uuid
+
+from core.emotion import get_emotion_matcher
+from core.session import EmotionTrajectory, drop_emotion_trajectory, update_emotion_trajectory
+from schemas import SessionContext
+
+def test_trayectoria_ewma_pico_y_tendencia():
+    trayectoria = EmotionTrajectory(alpha=0.5)
+    matcher = get_emotion_matcher()
+    for texto in ("hola", "estoy algo preocupada", "tengo mucha ansiedad", "estoy muy ansiosa, no duermo del estrés"):
+        trayectoria.update(matcher.detect(texto))
+    estado = trayectoria.snapshot()
+    assert estado["turnos"] == 4
+    assert estado["estado"] == "ansiedad" and estado["turnos_en_estado"] == 3
+    assert estado["pico_turno"]["ansiedad"] == 4
+    assert estado["tendencia"] > 0 and estado["carga_negativa"] > 1.0
+    # Sin "scores" se usa el nivel; los turnos neutrales bajan la carga
+    for _ in range(4):
+        trayectoria.update({"emocion": "neutral", "nivel": "bajo"})
+    estado = trayectoria.snapshot()
+    assert estado["estado"] == "neutral" and estado["tendencia"] < 0
+
+def test_session_context_expone_estado_emocional():
+    contexto = SessionContext(id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4())
+    assert contexto.estado_emocional() is None
+    update_emotion_trajectory(str(contexto.id_sesion), {"emocion": "frustracion", "nivel": "alto"})
+    assert contexto.estado_emocional()["ewma"]["frustracion"] > 0
+    drop_emotion_trajectory(str(contexto.id_sesion))
+    assert contexto.estado_emocional() is None
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.entidades import EntityAliasIndex, gender_variants, InMemoryEntityStore, SQLiteEntityStore, alias_key, new_entity, save_or_merge
+
+def test_alias_key_ignora_articulos_y_posesivos():
+    assert alias_key("mi jefe") == alias_key("el Jefe") == alias_key("JEFE.") == "jefe"
+    assert alias_key("la de") == "la de"  # sólo stopwords: se conserva el nombre
+
+def test_save_or_merge_combina_en_vez_de_duplicar(tmp_path):
+    store = SQLiteEntityStore(str(tmp_path / "entidades.db"))
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "Persona", "nombre_entidad": "Jefe",
+                                       "datos_entidad": {"rasgos": ["exigente"]}}))
+    index = EntityAliasIndex(store)
+
+    entidad, merged = save_or_merge("c1", new_entity("c1", {"tipo_entidad": "Persona", "nombre_entidad": "mi jefe",
+                                                            "datos_entidad": {"rasgos": ["impaciente"]}}), index)
+    assert merged and entidad["id"] == jefe["id"]
+    assert entidad["datos_entidad"]["rasgos"] == ["exigente", "impaciente"]
+
+    # Variación menor sobre un alias ya conocido (trigramas) y otro cliente sin cruce
+    store.update(jefe["id"], {"datos_entidad": dict(entidad["datos_entidad"], aliases=["Roberto Gómez"])})
+    assert index.resolve("c1", "roberto gomes")[0] == jefe["id"]
+    assert save_or_merge("c2", new_entity("c2", {"nombre_entidad": "el jefe"}), index)[1] is False
+
+    otra, merged = save_or_merge("c1", new_entity("c1", {"nombre_entidad": "Laura"}), index)
+    assert not merged and len(store.find("c1")) == 2
+    store.delete(otra["id"])
+    assert index.resolve("c1", "Laura") is None
+
+def test_indice_se_mantiene_con_listeners():
+    store = InMemoryEntityStore()
+    index = EntityAliasIndex(store)
+    assert index.resolve("c1", "Laura") is None  # carga la partición (vacía)
+    laura = store.put(new_entity("c1", {"nombre_entidad": "Laura"}))
+    assert index.resolve("c1", "laura")[0] == laura["id"]
+    store.update(laura["id"], {"nombre_entidad": "Lucía"})
+    assert index.resolve("c1", "Laura") is None and index.resolve("c1", "lucia")[0] == laura["id"]
+
+def test_no_combina_nombres_parecidos_de_personas_distintas():
+    store = InMemoryEntityStore()
+    index = EntityAliasIndex(store)
+    for nombre in ("mi hermano", "Daniel", "Gabriel", "Martín"):
+        store.put(new_entity("c1", {"tipo_entidad": "Persona", "nombre_entidad": nombre}))
+    for nombre in ("mi hermana", "Daniela", "Gabriela", "Martina", "mis hermanos"):
+        entidad, merged = save_or_merge("c1", new_entity("c1", {"tipo_entidad": "Persona", "nombre_entidad": nombre}),
+                                        index)
+        assert not merged, nombre
+    assert len(store.find("c1")) == 9
+    assert gender_variants("hermano", "hermana") and not gender_variants("roberto gomes", "roberto gomez")
+
+def test_solo_combina_con_el_mismo_tipo():
+    store = InMemoryEntityStore()
+    index = EntityAliasIndex(store)
+    store.put(new_entity("c1", {"tipo_entidad": "Organizacion", "nombre_entidad": "Mercado Libre"}))
+    persona, merged = save_or_merge("c1", new_entity("c1", {"tipo_entidad": "Persona", "nombre_entidad": "mercado libre"}),
+                                    index)
+    assert not merged
+    assert index.resolve("c1", "mercado libre", "Persona")[0] == persona["id"]
+    assert index.resolve("c1", "Ana", "Persona") is None
@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from core.entidades import EntityMentionIndex, InMemoryEntityStore, new_entity
+
+def test_recall_por_mencion_con_alias_y_limites_de_palabra():
+    store = InMemoryEntityStore()
+    index = EntityMentionIndex(store)
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": "Martín Pérez",
+                                       "tipo_relacion": "laboral",
+                                       "datos_entidad": {"aliases": ["mi jefe"], "empresa": "ACME", "auto_detected": True}}))
+    store.put(new_entity("c1", {"tipo_entidad": "persona", "nombre_entidad": "Martín"}))
+    store.put(new_entity("c2", {"tipo_entidad": "pareja", "nombre_entidad": "Laura"}))
+
+    encontradas = index.recall("c1", "Hoy MARTÍN PÉREZ me gritó otra vez; mi jefe no cambia.")
+    assert [e["id"] for e in encontradas] == [jefe["id"]]
+    assert encontradas[0]["tipo_relacion"] == "laboral" and encontradas[0]["datos"] == {"empresa": "ACME"}
+    assert [e["nombre_entidad"] for e in index.recall("c1", "Hablé con Martín")] == ["Martín"]
+    assert index.recall("c1", "Laura y los jefes") == []  # otro cliente / otra palabra
+
+    # Guardada a mitad de sesión: aparece en el turno siguiente
+    laura = store.put(new_entity("c1", {"tipo_entidad": "hermana", "nombre_entidad": "Laura"}))
+    assert [e["id"] for e in index.recall("c1", "laura me llamó")] == [laura["id"]]
+    store.update(laura["id"], {"estado": "inactivo"})
+    assert index.recall("c1", "laura me llamó") == []
+
+
+def test_recall_con_articulos_y_nombres_compuestos():
+    store = InMemoryEntityStore()
+    index = EntityMentionIndex(store)
+    uba = store.put(new_entity("c1", {"tipo_entidad": "institucion", "nombre_entidad": "Universidad de Buenos Aires"}))
+    ana = store.put(new_entity("c1", {"tipo_entidad": "amiga", "nombre_entidad": "Ana-María"}))
+
+    assert [e["id"] for e in index.recall("c1", "Estudio en la Universidad de Buenos Aires")] == [uba["id"]]
+    assert [e["id"] for e in index.recall("c1", "Hablé con Ana-María.")] == [ana["id"]]
+    assert [e["id"] for e in index.recall("c1", "ana maria y la universidad de buenos aires")] == [ana["id"], uba["id"]]
+    assert index.recall("c1", "Hablé con Anabel Mariano") == []  # sigue respetando los límites de palabra
@@ -0,0 +1,33 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from core.entidades import InMemoryEntityStore, RelationshipIndex, new_entity
+
+def test_vistas_y_adyacencia_incrementales():
+    store = InMemoryEntityStore()
+    index = RelationshipIndex(store)
+    empresa = store.put(new_entity("c1", {"tipo_entidad": "empresa", "nombre_entidad": "ACME"}))
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": "Martín",
+                                       "datos_entidad": {"relaciones": [{"id": empresa["id"], "tipo": "trabaja_en"}]}}))
+    madre = store.put(new_entity("c1", {"tipo_entidad": "madre", "nombre_entidad": "Rosa",
+                                        "datos_entidad": {"contacto_emergencia": True, "telefono": "555-1234"}}))
+    store.put(new_entity("c2", {"tipo_entidad": "padre", "nombre_entidad": "Otro"}))
+
+    assert {e["id"] for e in index.view("c1", "trabajo")} == {empresa["id"], jefe["id"]}
+    assert [e["id"] for e in index.view("c1", "familia")] == [madre["id"]]
+    assert index.view("c1", "emergencia")[0]["datos"]["telefono"] == "555-1234"
+    assert [e["id"] for e in index.by_relation("c1", "Jefe")] == [jefe["id"]]
+    assert [e["id"] for e in index.related("c1", jefe["id"])["trabaja en"]] == [empresa["id"]]
+    assert [e["id"] for e in index.related("c1", empresa["id"])["<-trabaja en"]] == [jefe["id"]]
+
+    # Escrituras posteriores actualizan el índice ya cargado
+    store.update(madre["id"], {"datos_entidad": {"telefono": "555-1234"}})
+    assert index.view("c1", "emergencia") == []
+    store.update(jefe["id"], {"estado": "inactivo"})
+    assert index.view("c1", "trabajo")[0]["id"] == empresa["id"] and len(index.view("c1", "trabajo")) == 1
+    assert index.related("c1", empresa["id"]) == {}
+    with pytest.raises(ValueError):
+        index.view("c1", "amigos")
@@ -0,0 +1,183 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from core.entidades import EntityStore, InMemoryEntityStore, SQLiteEntityStore, new_entity
+from core.utils.sqlite_pool import SQLitePool, SQLitePoolTimeout
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryEntityStore()
+    return SQLiteEntityStore(str(tmp_path / "entidades.db"))
+
+def test_find_por_cliente_tipo_nombre_y_estado(store):
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "Jefe", "nombre_entidad": "Martín Pérez"}))
+    store.put(new_entity("c1", {"tipo_entidad": "pareja", "nombre_entidad": "Laura"}))
+    store.put(new_entity("c2", {"tipo_entidad": "jefe", "nombre_entidad": "Otro"}))
+
+    assert [e["id"] for e in store.find("c1", tipo_entidad="jefe")] == [jefe["id"]]
+    assert [e["id"] for e in store.find("c1", nombre="  martin   PEREZ.")] == [jefe["id"]]
+    assert len(store.find("c1")) == 2 and len(store.find("c1", limit=1)) == 1
+    assert store.find("c3") == []
+
+    store.update(jefe["id"], {"estado": "inactivo", "tipo_entidad": "exjefe"})
+    assert store.find("c1", tipo_entidad="jefe") == []
+    assert [e["id"] for e in store.find("c1", tipo_entidad="exjefe", estado="inactivo")] == [jefe["id"]]
+    assert store.get(jefe["id"])["created_at"] == jefe["created_at"]
+
+    assert store.delete(jefe["id"]) and not store.delete(jefe["id"])
+    assert store.get(jefe["id"]) is None
+    assert store.find("c1", estado="inactivo") == []
+
+def test_sqlite_persiste_entre_aperturas(tmp_path):
+    path = str(tmp_path / "entidades.db")
+    store = SQLiteEntityStore(path)
+    entidad = store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": "Ana",
+                                          "datos_entidad": {"empresa": "ACME"}}))
+    store.close()
+    reabierto = SQLiteEntityStore(path)
+    assert reabierto.get(entidad["id"])["datos_entidad"] == {"empresa": "ACME"}
+
+def test_sqlite_pool_wal_y_concurrencia(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    for path in (str(tmp_path / "pool.db"), ":memory:"):
+        store = SQLiteEntityStore(path, pool_size=4)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": f"n{i}"})),
+                          range(200)))
+            conteos = list(pool.map(lambda _: len(store.find("c1", tipo_entidad="jefe")), range(16)))
+        assert conteos == [200] * 16
+        if path != ":memory:":
+            with store._pool.connection() as conn:
+                assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert len(store._pool._all) <= 4
+        store.close()
+
+def test_transaccion_confirma_o_revierte_todo(store):
+    from core.entidades import EntityAliasIndex
+    index = EntityAliasIndex(store)
+    base = store.put(new_entity("c1", {"nombre_entidad": "Ana"}))
+    assert index.resolve("c1", "ana")
+
+    with store.transaction():
+        store.put(new_entity("c1", {"nombre_entidad": "Beto"}))
+        store.update(base["id"], {"estado": "inactivo"})
+    assert len(store.find("c1")) == 2 and store.get(base["id"])["estado"] == "inactivo"
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.put(new_entity("c1", {"nombre_entidad": "Carla"}))
+            store.delete(base["id"])
+            assert index.resolve("c1", "carla")  # visible dentro de la transacción
+            raise RuntimeError("falla a mitad de lote")
+    assert [e["nombre_entidad"] for e in store.find("c1")] == ["Ana", "Beto"]
+    assert store.get(base["id"])["estado"] == "inactivo"
+    assert index.resolve("c1", "carla") is None and index.resolve("c1", "ana")
+
+
+def test_almacen_base_es_abstracto():
+    with pytest.raises(TypeError):
+        EntityStore()
+
+
+def test_leer_actualizar_eliminar_acotados_al_cliente(store):
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": "Martín"}))
+    assert store.get(jefe["id"], id_cliente="c2") is None
+    assert store.update(jefe["id"], {"estado": "inactivo"}, id_cliente="c2") is None
+    assert not store.delete(jefe["id"], id_cliente="c2")
+    assert store.get(jefe["id"], id_cliente="c1")["estado"] == "activo"
+    assert store.update(jefe["id"], {"estado": "inactivo"}, id_cliente="c1")["estado"] == "inactivo"
+    assert store.delete(jefe["id"], id_cliente="c1")
+
+
+def test_pool_agotado_lanza_timeout_descriptivo(tmp_path):
+    pool = SQLitePool(str(tmp_path / "pool.db"), size=1, timeout=0.05)
+    with pool.connection():
+        with pytest.raises(SQLitePoolTimeout, match="agotado"):
+            with pool.connection():
+                pass
+    pool.close()
+
+
+class _ConsultaEntidades:
+    """Consulta PostgREST falsa sobre una lista de filas: eq / in_ / upsert / delete."""
+
+    def __init__(self, filas):
+        self.filas, self.filtros, self.accion, self.payload = filas, [], "select", None
+
+    def select(self, *args):
+        return self
+
+    def eq(self, columna, valor):
+        self.filtros.append(lambda f: f.get(columna) == valor)
+        return self
+
+    def in_(self, columna, valores):
+        self.filtros.append(lambda f: f.get(columna) in valores)
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def range(self, inicio, fin):
+        return self
+
+    def upsert(self, payload):
+        self.accion, self.payload = "upsert", payload
+        return self
+
+    def delete(self):
+        self.accion = "delete"
+        return self
+
+    def execute(self):
+        if self.accion == "upsert":
+            self.filas[:] = [f for f in self.filas if f["id"] != self.payload["id"]] + [dict(self.payload)]
+            self.data = [dict(self.payload)]
+            return self
+        self.data = [dict(f) for f in self.filas if all(c(f) for c in self.filtros)]
+        if self.accion == "delete":
+            self.filas[:] = [f for f in self.filas if not all(c(f) for c in self.filtros)]
+        return self
+
+
+class _SupabaseEntidades:
+    def __init__(self):
+        self.filas = []
+
+    def table(self, nombre):
+        assert nombre == "entidades"
+        return _ConsultaEntidades(self.filas)
+
+
+def test_supabase_filtra_por_cliente_y_nombre_normalizado():
+    from core.entidades import SupabaseEntityStore
+    store = SupabaseEntityStore(_SupabaseEntidades())
+    jefe = store.put(new_entity("c1", {"tipo_entidad": "Jefe", "nombre_entidad": "Martín Pérez"}))
+    store.put(new_entity("c1", {"tipo_entidad": "pareja", "nombre_entidad": "Laura", "estado": "inactivo"}))
+    store.put(new_entity("c2", {"tipo_entidad": "jefe", "nombre_entidad": "Otro"}))
+
+    assert [e["id"] for e in store.find("c1", tipo_entidad="jefe", nombre="martin perez")] == [jefe["id"]]
+    assert [e["nombre_entidad"] for e in store.find("c1", estado="activo")] == ["Martín Pérez"]
+    assert len(store.find_many(["c1", "c2"], estado="activo")) == 2
+    assert store.get(jefe["id"], id_cliente="c2") is None
+    assert store.update(jefe["id"], {"estado": "inactivo"}, id_cliente="c1")["estado"] == "inactivo"
+    assert not store.delete(jefe["id"], id_cliente="c2")
+    assert store.delete(jefe["id"], id_cliente="c1") and store.get(jefe["id"]) is None
+
+
+def test_almacen_por_defecto_sigue_al_backend_de_la_base(monkeypatch):
+    from core.entidades import SupabaseEntityStore, get_entity_store, set_entity_store
+    monkeypatch.delenv("ZENDA_ENTIDADES_BACKEND", raising=False)
+    monkeypatch.setenv("ZENDA_DB_BACKEND", "supabase")
+    set_entity_store(None)
+    try:
+        assert isinstance(get_entity_store(), SupabaseEntityStore)  # no lee el SQLite local
+    finally:
+        set_entity_store(None)
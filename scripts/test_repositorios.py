@@ -0,0 +1,185 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import datetime
+
+import pytest
+
+from core.clientes import RepositoryClientSource, iter_clients_data
+from core.entidades import InMemoryEntityStore, new_entity, set_entity_store
+from core.repositorios import Backend, Repository, SQLiteBackend, SupabaseBackend, TABLAS, set_backend
+
+
+def test_todas_las_tablas_crud_sqlite():
+    backend = SQLiteBackend()
+    for tabla in TABLAS:
+        backend.repository(tabla)          # crea la tabla desde el modelo
+
+    sesiones = backend.repository("sesiones")
+    sesion = sesiones.insert({"id_sesion": "s1", "id_cliente": "c1", "fecha_inicio": datetime(2025, 1, 1),
+                              "qa_labels": ["memoria"], "finalizo_ok": True})
+    assert sesion["fecha_inicio"] == "2025-01-01T00:00:00"
+    assert sesion["qa_labels"] == ["memoria"] and sesion["finalizo_ok"] is True
+    assert sesiones.update("s1", {"historical_summary": "Resumen", "csat": 9})["csat"] == 9
+    assert sesiones.update("no-existe", {"csat": 1}) is None
+
+    qa = backend.repository("qa")
+    primero = qa.insert({"session_id": "s1", "codigo_pauta": "ICF-1", "impacto": 1, "metadata": {"a": 1}})
+    segundo = qa.insert({"session_id": "s1", "codigo_pauta": "ICF-2", "impacto": 2})
+    assert (primero["id"], segundo["id"]) == (1, 2)      # clave entera asignada por SQLite
+    assert [r["codigo_pauta"] for r in qa.find({"session_id": "s1"}, order_by="id", desc=True)] == ["ICF-2", "ICF-1"]
+    assert len(qa.find({"session_id": "s1"}, limit=1)) == 1
+    assert qa.delete(primero["id"]) and not qa.delete(primero["id"])
+    backend.close()
+
+
+def test_columnas_validadas_contra_el_modelo():
+    repo = SQLiteBackend().repository("clientes")
+    with pytest.raises(ValueError):
+        repo.find({"id_cliente; DROP TABLE clientes": "x"})
+    with pytest.raises(ValueError):
+        repo.insert({"alias": "sin clave"})
+    with pytest.raises(ValueError):
+        SQLiteBackend().repository("no_existe")
+    with pytest.raises(TypeError):
+        Repository("clientes")                          # bases abstractas
+    with pytest.raises(TypeError):
+        Backend()
+    for tabla in ("bitacora", "entidades"):            # tienen sus propios almacenes
+        with pytest.raises(ValueError):
+            SQLiteBackend().repository(tabla)
+
+
+def test_find_in_por_bloques():
+    repo = SQLiteBackend().repository("clientes")
+    for i in range(1200):
+        repo.insert({"id_cliente": f"c{i}", "alias": f"Cliente {i}", "preferencias": {"tono": "cercano"}})
+    filas = repo.find_in("id_cliente", [f"c{i}" for i in range(0, 1200, 2)])
+    assert len(filas) == 600
+    assert filas[0]["preferencias"] == {"tono": "cercano"}
+
+
+def test_fuente_de_clientes_sobre_repositorios():
+    backend = SQLiteBackend()
+    store = InMemoryEntityStore()
+    set_backend(backend)
+    set_entity_store(store)
+    try:
+        backend.repository("clientes").insert({"id_cliente": "c1", "alias": "Ana", "preferencias": {"tono": "cercano"}})
+        sesiones = backend.repository("sesiones")
+        sesiones.insert({"id_sesion": "s1", "id_cliente": "c1", "fecha_inicio": datetime(2025, 1, 1),
+                         "historical_summary": "vieja"})
+        sesiones.insert({"id_sesion": "s2", "id_cliente": "c1", "fecha_inicio": datetime(2025, 2, 1),
+                         "historical_summary": "reciente", "csat": 8})
+        store.put(new_entity("c1", {"tipo_entidad": "jefe", "nombre_entidad": "Martín"}))
+        datos = dict(iter_clients_data(["c1", "c2"], RepositoryClientSource()))
+        assert datos["c1"]["preferencias"] == {"tono": "cercano"}
+        assert datos["c1"]["resumen_memoria_larga"] == "reciente"
+        assert datos["c1"]["CSAT"] == 8
+        assert [e["nombre_entidad"] for e in datos["c1"]["entidades_iniciales"]] == ["Martín"]
+        assert datos["c2"]["resumen_memoria_larga"] is None
+    finally:
+        set_backend(None)
+        set_entity_store(None)
+
+
+class _ConsultaFalsa:
+    def __init__(self, registro, data):
+        self.registro, self.data = registro, data
+
+    def __getattr__(self, nombre):
+        def metodo(*args, **kwargs):
+            self.registro.append((nombre, args))
+            return self
+        return metodo
+
+    def execute(self):
+        return self
+
+
+class _ClienteFalso:
+    def __init__(self, data):
+        self.registro, self.data = [], data
+
+    def table(self, nombre):
+        self.registro.append(("table", (nombre,)))
+        return _ConsultaFalsa(self.registro, self.data)
+
+
+def test_supabase_arma_consultas_parametrizadas():
+    cliente = _ClienteFalso([{"id_sesion": "s1", "csat": 9}])
+    repo = SupabaseBackend(cliente).repository("sesiones")
+    assert repo.update("s1", {"csat": 9}) == {"id_sesion": "s1", "csat": 9}
+    assert ("eq", ("id_sesion", "s1")) in cliente.registro
+    repo.find_in("id_cliente", [f"c{i}" for i in range(501)], order_by="fecha_inicio", desc=True)
+    assert [args[1] for nombre, args in cliente.registro if nombre == "in_"] == [
+        [f"c{i}" for i in range(500)], ["c500"]]
+
+
+def test_find_in_ultima_sesion_por_cliente_sqlite():
+    sesiones = SQLiteBackend().repository("sesiones")
+    for i in range(3):
+        sesiones.insert({"id_sesion": f"a{i}", "id_cliente": "c1", "fecha_inicio": datetime(2025, 1, i + 1),
+                         "historical_summary": f"resumen {i}" if i < 2 else None})
+    sesiones.insert({"id_sesion": "b0", "id_cliente": "c2", "fecha_inicio": datetime(2025, 1, 1)})
+    filas = sesiones.find_in("id_cliente", ["c1", "c2"], order_by="fecha_inicio", desc=True,
+                             columns=["id_cliente", "historical_summary"], not_null=["historical_summary"],
+                             first_per_value=True)
+    assert filas == [{"id_cliente": "c1", "historical_summary": "resumen 1"}]
+    with pytest.raises(ValueError):
+        sesiones.find_in("id_cliente", ["c1"], columns=["id_cliente; --"])
+
+
+class _ConsultaPaginada:
+    """Consulta PostgREST falsa que corta cada respuesta en max_rows, como el servidor."""
+
+    def __init__(self, tabla):
+        self.tabla, self.inicio, self.fin = tabla, 0, None
+
+    def __getattr__(self, nombre):
+        self.tabla.registro.append(nombre)
+        return lambda *args, **kwargs: self
+
+    @property
+    def not_(self):
+        return self
+
+    def range(self, inicio, fin):
+        self.inicio, self.fin = inicio, fin
+        return self
+
+    def execute(self):
+        self.tabla.consultas += 1
+        fin = min(self.fin + 1, self.inicio + self.tabla.max_rows)
+        self.data = self.tabla.filas[self.inicio:fin]
+        return self
+
+
+class _SupabasePaginado:
+    def __init__(self, filas, max_rows=1000):
+        self.filas, self.max_rows, self.consultas, self.registro = filas, max_rows, 0, []
+
+    def table(self, nombre):
+        return _ConsultaPaginada(self)
+
+
+def test_supabase_pagina_hasta_una_pagina_corta():
+    filas = [{"id_sesion": f"s{i}", "id_cliente": f"c{i % 3}", "historical_summary": "r"} for i in range(2500)]
+    cliente = _SupabasePaginado(filas)
+    repo = SupabaseBackend(cliente).repository("sesiones")
+    assert len(repo.find_in("id_cliente", ["c0", "c1", "c2"], order_by="fecha_inicio", desc=True)) == 2500
+    assert cliente.consultas == 3
+    assert "order" in cliente.registro
+    assert len(repo.find({"id_cliente": "c0"})) == 2500
+    primeras = repo.find_in("id_cliente", ["c0", "c1", "c2"], columns=["historical_summary"],
+                            not_null=["historical_summary"], first_per_value=True)
+    assert [f["id_sesion"] for f in primeras] == ["s0", "s1", "s2"]
+
+
+def test_fuente_supabase_pagina_sesiones():
+    from core.clientes import SupabaseClientSource
+    filas = [{"id_cliente": "c1", "historical_summary": f"r{i}"} for i in range(1500)]
+    cliente = _SupabasePaginado(filas)
+    assert len(list(SupabaseClientSource(cliente).fetch_sesiones(["c1"]))) == 1500
+    assert cliente.consultas == 2
@@ -0,0 +1,81 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+import uuid
+from datetime import date, datetime
+
+import pytest
+
+from core.session import codec
+from schemas import SessionContext
+
+
+def _ctx(**extra):
+    data = dict(id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4(), fase_actual="Desarrollo_Sesion",
+                modo_asistencia="Rotativo", criterios={"foco": "rapport", "n": 3, "x": 1.5, "ok": None},
+                interacciones_recientes=[{"actor": "cliente", "text": "Hola ñandú " * 10}] * 20)
+    data.update(extra)
+    return SessionContext(**data)
+
+
+def test_ida_y_vuelta():
+    ctx = _ctx()
+    back = codec.decode_context(codec.encode_context(ctx))
+    assert back.model_dump() == ctx.model_dump()
+    assert isinstance(back.id_cliente, uuid.UUID)
+
+
+def test_campos_extra_se_conservan():
+    ctx = _ctx(canal="whatsapp", marcas={"piloto": True, "n": 2})
+    back = codec.decode_context(codec.encode_context(ctx))
+    assert back.model_extra == {"canal": "whatsapp", "marcas": {"piloto": True, "n": 2}}
+    assert back.model_dump() == ctx.model_dump()
+
+
+def test_mas_chico_que_json():
+    ctx = _ctx()
+    assert len(codec.encode_context(ctx)) < len(ctx.model_dump_json())
+
+
+def test_enum_no_internado_se_guarda_como_texto():
+    ctx = _ctx().model_copy(update={"fase_actual": "Otra_Fase"})
+    assert codec.decode_context(codec.encode_context(ctx)).fase_actual == "Otra_Fase"
+
+
+def test_esquema_distinto_o_basura():
+    data = bytearray(codec.encode_context(_ctx()))
+    data[len(codec.MAGIC)] ^= 0xFF
+    with pytest.raises(ValueError):
+        codec.decode_context(bytes(data))
+    with pytest.raises(ValueError):
+        codec.decode_context(b"{}")
+
+
+def test_empaquetado_puro():
+    values = [None, True, False, 0, 127, 128, -1, -33, -200, 70000, -70000, 2 ** 40, -2 ** 40, 1.25,
+              "", "a" * 31, "b" * 40, "c" * 300, "d" * 70000, b"\x00\x01", list(range(20)),
+              {str(i): i for i in range(20)}, uuid.uuid4(), datetime(2025, 1, 2, 3, 4, 5), date(2025, 1, 2)]
+    for value in values:
+        assert codec.unpack_value(codec.pack_value(value)) == value
+    assert codec.unpack_value(codec.pack_value((1, 2))) == [1, 2]
+    with pytest.raises(TypeError):
+        codec.pack_value(object())
+
+
+def test_puro_igual_a_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    value = {"a": [1, -5, 300, "x" * 40, None, True, 2.5, b"\x01"], "u": uuid.uuid4()}
+    packed = codec.pack_value(value)
+    assert packed == msgpack.packb(value, default=codec._default_hook, use_bin_type=True)
+    assert codec.unpack_value(packed) == value
+
+
+def test_volcar_y_cargar_sesiones():
+    contexts = [_ctx() for _ in range(5)]
+    fp = io.BytesIO()
+    assert codec.dump_sessions(contexts, fp) == 5
+    fp.seek(0)
+    loaded = list(codec.load_sessions(fp))
+    assert [c.model_dump() for c in loaded] == [c.model_dump() for c in contexts]
@@ -0,0 +1,88 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import uuid
+
+import pytest
+
+from core.session import SessionContextStore, VersionConflict, apply_patch, diff_context
+from schemas import SessionContext
+
+
+def test_parche_ida_y_vuelta():
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "lista": [1, 2], "quitar": True, "raro/~": 0}
+    new = {"a": 2, "b": {"x": 1, "z": 3}, "lista": [1, 2, 3, 4], "raro/~": 1}
+    ops = diff_context(old, new)
+    assert {"op": "add", "path": "/lista/-", "value": 3} in ops
+    assert {"op": "remove", "path": "/b/y"} in ops
+    assert {"op": "replace", "path": "/raro~1~0", "value": 1} in ops
+    assert apply_patch(old, ops) == new
+    assert old["b"] == {"x": 1, "y": 2} and old["lista"] == [1, 2]   # el original no cambia
+
+
+def test_parche_fallido_no_deja_nada_a_medias():
+    doc = {"a": 1, "b": {"x": 1}}
+    with pytest.raises(KeyError):
+        apply_patch(doc, [{"op": "replace", "path": "/a", "value": 2},
+                          {"op": "replace", "path": "/b/no_existe", "value": 0}])
+    assert doc == {"a": 1, "b": {"x": 1}}
+
+
+def test_escritura_por_turno_proporcional_al_cambio():
+    ctx = SessionContext(id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4(),
+                         resumen_memoria_larga="x" * 5000,
+                         interacciones_recientes=[{"actor": "cliente", "text": f"turno {i}"} for i in range(200)])
+    store = SessionContextStore()
+    sid = str(ctx.id_sesion)
+    version, _ = store.write(sid, ctx.model_dump(mode="json"))
+    assert version == 1
+
+    base = ctx.model_dump(mode="json")
+    nuevo = ctx.model_copy(deep=True)
+    nuevo.interacciones_recientes.append({"actor": "zenda", "text": "respuesta"})
+    nuevo.fase_actual = "Desarrollo_Sesion"
+    ops = diff_context(base, nuevo.model_dump(mode="json"))
+    assert len(ops) == 2
+    assert len(json.dumps(ops)) < len(json.dumps(nuevo.model_dump(mode="json"))) / 50
+    assert store.patch(sid, ops, expected_version=1) == 2
+    assert store.get(sid)[1] == nuevo.model_dump(mode="json")
+
+
+def test_concurrencia_optimista():
+    store = SessionContextStore()
+    store.write("s1", {"fase": "Inicio", "modo": "Integral", "turnos": []})
+    # Otro escritor cambia el modo después de que el DT leyó la versión 1
+    store.patch("s1", [{"op": "replace", "path": "/modo", "value": "Urgente"}], expected_version=1)
+    mio = [{"op": "replace", "path": "/fase", "value": "Desarrollo"}, {"op": "add", "path": "/turnos/-", "value": 1}]
+    with pytest.raises(VersionConflict):
+        store.patch("s1", mio, expected_version=1)
+    assert store.get("s1") == (2, {"fase": "Inicio", "modo": "Urgente", "turnos": []})
+    assert store.patch("s1", mio) == 3          # reaplicado sobre la actual: se conserva "Urgente"
+    assert store.get("s1")[1] == {"fase": "Desarrollo", "modo": "Urgente", "turnos": [1]}
+
+
+def test_rebase_solo_sin_rutas_en_comun():
+    store = SessionContextStore()
+    base = {"fase": "Inicio", "modo": "Integral", "turnos": [], "criterios": {"foco": "rapport"}}
+    store.write("s1", base)
+    store.patch("s1", [{"op": "replace", "path": "/modo", "value": "Urgente"}], expected_version=1)
+    mio = diff_context(base, dict(base, fase="Desarrollo"))
+    assert store.rebase("s1", base, mio, expected_version=1) == 3
+    assert store.get("s1")[1]["modo"] == "Urgente" and store.get("s1")[1]["fase"] == "Desarrollo"
+
+    # El otro escritor ya agregó un turno: re-agregar el mío duplicaría; conflicto
+    base = store.get("s1")[1]
+    store.patch("s1", [{"op": "add", "path": "/turnos/-", "value": "otro"}])
+    mio = diff_context(base, dict(base, turnos=["mio"]))
+    with pytest.raises(VersionConflict):
+        store.rebase("s1", base, mio, expected_version=3)
+
+    # Reemplazo sobre una clave que el otro escritor borró: conflicto, no KeyError
+    base = store.get("s1")[1]
+    store.patch("s1", [{"op": "remove", "path": "/criterios/foco"}])
+    mio = diff_context(base, dict(base, criterios={"foco": "emocional"}))
+    with pytest.raises(VersionConflict):
+        store.rebase("s1", base, mio)
+    assert store.get("s1")[1]["criterios"] == {} and store.get("s1")[1]["turnos"] == ["otro"]
@@ -0,0 +1,95 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import threading
+import time
+
+from core.session import degraded, warm_up
+
+
+def _lento(valor, segundos):
+    def fetch():
+        time.sleep(segundos)
+        return valor
+    return fetch
+
+
+def test_lecturas_en_paralelo():
+    inicio = time.perf_counter()
+    valores, meta = warm_up({
+        "cliente": _lento({"preferencias": {}}, 0.2),
+        "pautas": _lento(["ICF-1.1"], 0.2),
+        "especialidades": _lento({"principal": "ICF"}, 0.2),
+    })
+    assert time.perf_counter() - inicio < 0.45      # la más lenta, no la suma (0.6 s)
+    assert valores["pautas"] == ["ICF-1.1"]
+    assert degraded(meta) == {}
+
+
+def test_plazo_vencido_y_error_usan_valor_por_defecto():
+    def falla():
+        raise ConnectionError("supabase")
+
+    inicio = time.perf_counter()
+    valores, meta = warm_up(
+        {"cliente": _lento({"preferencias": {"tono": "cercano"}}, 0.01),
+         "entidades": _lento([{"id": "e1"}], 2.0),
+         "resumen_ultima_sesion": falla},
+        deadlines={"entidades": 0.1},
+        defaults={"entidades": []},
+    )
+    assert time.perf_counter() - inicio < 1.0       # no espera a la lectura vencida
+    assert valores["cliente"] == {"preferencias": {"tono": "cercano"}}
+    assert valores["entidades"] == []
+    assert valores["resumen_ultima_sesion"] is None
+    assert degraded(meta) == {"entidades": "timeout", "resumen_ultima_sesion": "error"}
+
+
+def test_llamada_sincrona_desde_un_loop():
+    async def escenario():
+        return warm_up({"pautas": _lento(["ICF-2.0"], 0.01)})
+
+    valores, _ = asyncio.run(escenario())
+    assert valores == {"pautas": ["ICF-2.0"]}
+
+
+def test_lecturas_colgadas_no_agotan_los_hilos_de_otros_arranques():
+    colgada = threading.Event()
+
+    def cuelga():
+        colgada.wait(5)
+        return "tarde"
+
+    try:
+        for _ in range(12):                         # más arranques colgados que hilos de un pool fijo
+            valores, meta = warm_up({"entidades": cuelga, "pautas": _lento(["ICF-1.1"], 0.01)},
+                                    deadlines={"entidades": 0.05, "pautas": 0.5}, defaults={"entidades": []})
+            assert valores == {"entidades": [], "pautas": ["ICF-1.1"]}
+            assert degraded(meta) == {"entidades": "timeout"}
+    finally:
+        colgada.set()
+
+
+def test_llamada_sincrona_desde_un_loop_con_fallas(monkeypatch):
+    import core.session.warmup as warmup_mod
+
+    def falla():
+        raise ConnectionError("supabase")
+
+    async def escenario():
+        return warm_up({"entidades": falla, "pautas": _lento(["ICF-2.0"], 0.01)}, defaults={"entidades": []})
+
+    valores, meta = asyncio.run(escenario())
+    assert valores == {"entidades": [], "pautas": ["ICF-2.0"]}
+    assert degraded(meta) == {"entidades": "error"}
+
+    # Si el loop aparte se cae, todas las lecturas usan su valor por defecto (sin KeyError)
+    async def roto(*args, **kwargs):
+        raise RuntimeError("loop")
+
+    monkeypatch.setattr(warmup_mod, "warm_up_async", roto)
+    valores, meta = asyncio.run(escenario())
+    assert valores == {"entidades": [], "pautas": None}
+    assert degraded(meta) == {"entidades": "error", "pautas": "error"}
@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+
+import pytest
+
+from core.cache import ClientDataCache, SingleFlight
+from core.entidades import SQLiteEntityStore, new_entity
+
+
+def _en_paralelo(n, fn):
+    resultados, errores = [], []
+
+    def correr():
+        try:
+            resultados.append(fn())
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=correr) for _ in range(n)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    return resultados, errores
+
+
+def test_lecturas_concurrentes_comparten_una_carga():
+    flight = SingleFlight(timeout=5)
+    cargas = []
+    liberar = threading.Event()
+
+    def cargar():
+        cargas.append(1)
+        liberar.wait(5)
+        return {"ok": True}
+
+    threading.Timer(0.2, liberar.set).start()
+    resultados, errores = _en_paralelo(8, lambda: flight.do("c1", cargar))
+    assert not errores
+    assert len(cargas) == 1
+    assert resultados == [{"ok": True}] * 8
+    assert flight.stats()["compartidas"] == 7
+    assert flight.stats()["en_vuelo"] == 0
+
+
+def test_timeout_por_clave_y_errores_compartidos():
+    flight = SingleFlight()
+    liberar = threading.Event()
+    lider = threading.Thread(target=lambda: flight.do("lenta", lambda: liberar.wait(5)))
+    lider.start()
+    time.sleep(0.05)
+    with pytest.raises(TimeoutError):
+        flight.do("lenta", lambda: None, timeout=0.05)
+    liberar.set()
+    lider.join()
+    assert flight.stats()["timeouts"] == 1
+
+    def falla():
+        time.sleep(0.1)
+        raise RuntimeError("backend caído")
+
+    _, errores = _en_paralelo(4, lambda: flight.do("rota", falla))
+    assert len(errores) == 4 and all(isinstance(e, RuntimeError) for e in errores)
+
+
+def test_cache_de_clientes_coalesce_y_no_cachea_carga_invalidada():
+    cache = ClientDataCache(maxsize=8, ttl=60)
+    cargas = []
+
+    def cargar():
+        cargas.append(1)
+        time.sleep(0.1)
+        return {"preferencias": {}}
+
+    _en_paralelo(6, lambda: cache.get("c1", cargar))
+    assert len(cargas) == 1
+
+    cache.cache.clear()
+    hilo = threading.Thread(target=lambda: cache.get("c1", cargar))
+    hilo.start()
+    time.sleep(0.02)
+    cache.invalidate("c1")          # escritura durante la carga
+    hilo.join()
+    assert len(cache.cache) == 0
+
+
+def test_store_sqlite_comparte_lecturas_y_ve_escrituras():
+    store = SQLiteEntityStore()
+    store.put(new_entity("c1", {"nombre_entidad": "Martín"}))
+    resultados, errores = _en_paralelo(8, lambda: store.find("c1"))
+    assert not errores
+    assert all(r == resultados[0] for r in resultados)
+    assert resultados[0] is not resultados[1]       # dicts propios por llamador
+    store.put(new_entity("c1", {"nombre_entidad": "Rosa"}))
+    assert len(store.find("c1")) == 2
+    store.close()
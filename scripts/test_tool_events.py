@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import io
+from core.utils.tool_events import ToolEventBus, ToolLogger, StdoutSink, MetricsSink, DEBUG, INFO
+
+def test_formateo_perezoso_y_niveles():
+    salida = io.StringIO()
+    metrics = MetricsSink()
+    log = ToolLogger("BITACORA_TOOL", ToolEventBus(level=INFO, sinks=[StdoutSink(salida), metrics]))
+    llamadas = []
+    def costoso():
+        llamadas.append(1)
+        return "{...}"
+
+    log.debug("BITACORA REGISTRADO: %s", costoso)
+    assert llamadas == [] and salida.getvalue() == ""
+
+    log.info("Texto='%.5s...'", "abcdefghij", evento="guardar")
+    assert salida.getvalue() == "[BITACORA_TOOL]: Texto='abcde...' evento=guardar\n"
+    assert metrics.por_evento[("BITACORA_TOOL", "guardar")] == 1
+
+    log.info("LOTE: %s operaciones", 5, evento="lote", operaciones=5)
+    log.info("LOTE: %s operaciones", 3, evento="lote", operaciones=3)
+    assert metrics.sumas[("BITACORA_TOOL", "lote", "operaciones")] == 8
+
+def test_muestreo_por_nivel():
+    metrics = MetricsSink()
+    log = ToolLogger("EMOTION_TOOL", ToolEventBus(level=DEBUG, sinks=[metrics], sampling={DEBUG: 0.0}))
+    for _ in range(100):
+        log.debug("descartado")
+        log.info("siempre")
+    assert metrics.por_tool[("EMOTION_TOOL", "DEBUG")] == 0
+    assert metrics.por_tool[("EMOTION_TOOL", "INFO")] == 100
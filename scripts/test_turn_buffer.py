@@ -0,0 +1,29 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import uuid
+from schemas import SessionContext
+from core.session import TurnRingBuffer, TurnRecord, record_turn, drop_turn_buffer
+
+def test_ring_buffer_conserva_los_ultimos():
+    buffer = TurnRingBuffer(capacity=3)
+    for i in range(5):
+        buffer.append(TurnRecord("cliente", f"t{i}"))
+    assert [r.texto for r in buffer.last()] == ["t2", "t3", "t4"]
+    assert [r.texto for r in buffer.last(2)] == ["t3", "t4"]
+    assert len(buffer) == 3 and buffer.total == 5
+
+def test_session_context_lee_del_buffer():
+    ctx = SessionContext(id_cliente=uuid.uuid4(), id_sesion=uuid.uuid4(),
+                         interacciones_recientes=[{"actor": "cliente", "text": "hola"}])
+    assert ctx.ultimas_interacciones(5) == [{"actor": "cliente", "text": "hola"}]
+
+    sesion = str(ctx.id_sesion)
+    record_turn(sesion, "cliente", "msg", "me siento agotado")
+    record_turn(sesion, "emo", "emo", "Emoción detectada")  # no es un turno
+    record_turn(sesion, "zenda", "msg", "Te escucho")
+    assert ctx.ultimas_interacciones(1) == [{"actor": "zenda", "text": "Te escucho"}]
+    assert len(ctx.ultimas_interacciones()) == 2
+    drop_turn_buffer(sesion)
+    assert ctx.ultimas_interacciones() == [{"actor": "cliente", "text": "hola"}]
@@ -2,7 +2,13 @@ from google.adk.tools import FunctionTool
 from typing import Optional, List, Literal
 from datetime import datetime
 from schemas import BitacoraModel
+from core.bitacora import get_bitacora_writer, get_bitacora_bus, BitacoraBackpressureError
+from core.session.turn_buffer import record_turn
+from core.utils.tool_events import get_tool_logger
 import json
+import uuid
+
+log = get_tool_logger("BITACORA_TOOL")
 
 def bitacora_function(session_id: str, id_cliente: str, actor: str, tipo: str, texto: str,
                      guia: Optional[List[str]] = None, tt: Optional[Literal["S", "F"]] = None,
@@ -22,16 +28,16 @@ def bitacora_function(session_id: str, id_cliente: str, actor: str, tipo: str, t
         canal: Canal de comunicación - T/S (opcional)
         
     Returns:
-        bool: True si el registro fue exitoso
+        bool: True si el registro fue encolado para escritura
     """
-    print(f"\n[BITACORA_TOOL]: Sesion={session_id}, Cliente={id_cliente}")
-    print(f"                  Actor={actor}, Tipo={tipo}")
-    print(f"                  Texto='{texto[:50]}...'")
+    log.debug("Sesion=%s, Cliente=%s, Actor=%s, Tipo=%s, Texto='%.50s...'",
+              session_id, id_cliente, actor, tipo, texto)
     
     # Preparar datos para BitacoraModel
     entry_data = {
         "session_id": session_id,
         "user_id": id_cliente,
+        "event_id": str(uuid.uuid4()),
         "created_at": datetime.now(),
         "actor": actor,
         "event_type": tipo,
@@ -46,11 +52,22 @@ def bitacora_function(session_id: str, id_cliente: str, actor: str, tipo: str, t
         }
     }
     
-    # TODO: Implementar persistencia real a Supabase
-    # bitacora_entry = BitacoraModel(**entry_data)
-    # supabase.table('bitacora').insert(bitacora_entry.model_dump()).execute()
+    # Encolar en el escritor en lote (SQLite local / Supabase según ZENDA_BITACORA_BACKEND o ZENDA_DB_BACKEND).
+    # Vuelve de inmediato; el volcado a la base ocurre en segundo plano.
+    try:
+        get_bitacora_writer().submit(entry_data)
+    except BitacoraBackpressureError as e:
+        log.warning("⚠️  BITACORA NO REGISTRADA (backpressure): %s", e, evento="backpressure")
+        return False
+
+    # Alimentar el buffer de turnos de la sesión (interacciones recientes sin ir a la base);
+    # la ventana por presupuesto de tokens se lee de él y pliega al resumen lo que sale
+    record_turn(session_id, actor, tipo, texto, canal)
+
+    # Notificar a los suscriptores en vivo (DT / QA) sin esperar al volcado
+    get_bitacora_bus().publish(entry_data)
     
-    print(f"       -> BITACORA REGISTRADO: {json.dumps(entry_data, default=str, indent=2)}")
+    log.debug("BITACORA REGISTRADO: %s", lambda: json.dumps(entry_data, default=str, indent=2))
     return True
 
 # Crear FunctionTool ADK
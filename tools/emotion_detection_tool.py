@@ -1,5 +1,9 @@
 from google.adk.tools import FunctionTool
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Iterator, Optional
+from core.emotion import analyze_audio, get_emotion_matcher, iter_audio_emotion
+from core.utils.tool_events import get_tool_logger
+
+log = get_tool_logger("EMOTION_TOOL")
 
 def emotion_detection_function(input_text: str, audio_bytes: Optional[bytes] = None) -> Dict[str, Any]:
     """
@@ -10,41 +14,44 @@ def emotion_detection_function(input_text: str, audio_bytes: Optional[bytes] = N
         audio_bytes: Datos de audio del mensaje del cliente (opcional)
         
     Returns:
-        Dict[str, Any]: Diccionario con la emoción detectada y su nivel
+        Dict[str, Any]: Diccionario con la emoción detectada, su nivel, tono, confianza
+            y los puntajes por emoción ("scores"); con audio, también "prosodia"
     """
-    print(f"\n[EMOTION_TOOL]: Analizando texto: '{input_text[:50]}...'")
-    if audio_bytes:
-        print("                 Audio también recibido (simulando análisis)")
+    log.debug("Analizando texto: '%.50s...'", input_text)
 
-    # Simulación basada en palabras clave
-    emocion = "neutral"
-    nivel = "bajo"
-    tono = "informativo"
+    # Léxico compilado (Aho-Corasick): una sola pasada, con plegado de acentos y variantes
+    resultado = get_emotion_matcher().detect(input_text)
 
-    input_lower = input_text.lower()
-    
-    if any(word in input_lower for word in ["frustrado", "agotado", "no puedo", "harto"]):
-        emocion = "frustracion"
-        nivel = "alto"
-        tono = "pesimista"
-    elif any(word in input_lower for word in ["feliz", "alegre", "contento", "bien"]):
-        emocion = "alegria"
-        nivel = "medio"
-        tono = "positivo"
-    elif any(word in input_lower for word in ["miedo", "ansioso", "nervioso", "preocupado"]):
-        emocion = "ansiedad"
-        nivel = "alto"
-        tono = "nervioso"
-
-    resultado = {
-        "emocion": emocion, 
-        "nivel": nivel, 
-        "tono_general": tono,
-        "confianza": 0.8
-    }
-    
-    print(f"       -> EMOCIÓN DETECTADA: {resultado}")
+    if audio_bytes:
+        # Audio PCM 16 kHz int16 mono (canal "S"): la prosodia decide sólo si el texto es neutral
+        audio = analyze_audio(audio_bytes)
+        log.debug("Prosodia: %s", audio["prosodia"])
+        resultado["prosodia"] = audio["prosodia"]
+        if resultado["emocion"] == "neutral" and audio["emocion"] != "neutral":
+            resultado.update({k: audio[k] for k in ("emocion", "nivel", "tono_general", "confianza")})
+
+    log.info("EMOCIÓN DETECTADA: %s", resultado, evento="emocion")
     return resultado
 
+def emotion_detection_stream(audio_chunks: Iterable[bytes], sample_rate: int = 16000) -> Iterator[Dict[str, Any]]:
+    """
+    Detección de emoción por voz en streaming: consume el audio en chunks a medida
+    que llega y emite estimaciones provisionales ("provisional": True) antes de que
+    termine el enunciado; la última es la definitiva.
+
+    Args:
+        audio_chunks: Chunks de audio PCM int16 mono (bytes, bytearray o memoryview)
+        sample_rate: Frecuencia de muestreo del audio
+
+    Yields:
+        Dict[str, Any]: emocion, nivel, tono_general, confianza, provisional y prosodia
+    """
+    for estimacion in iter_audio_emotion(audio_chunks, sample_rate):
+        log.debug("Estimación (provisional=%s): %s a %.2fs", estimacion["provisional"],
+                  estimacion["emocion"], estimacion["prosodia"]["segundos"])
+        if not estimacion["provisional"]:
+            log.info("EMOCIÓN DETECTADA (voz): %s", estimacion, evento="emocion_voz")
+        yield estimacion
+
 # Crear FunctionTool ADK
 emotion_detection_tool = FunctionTool(emotion_detection_function)
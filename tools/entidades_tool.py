@@ -1,73 +1,116 @@
 entidades_content = '''from google.adk.tools import FunctionTool
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional
 from schemas import EntidadModel
-import uuid
+from core.entidades import get_entity_store, new_entity, save_or_merge
+from core.cache import invalidate_client_data
+from core.utils.tool_events import get_tool_logger
 
-# Simulación de base de datos en memoria (TODO: reemplazar por Supabase)
-_simulated_entities_db = {}
+log = get_tool_logger("ENTIDADES_TOOL")
+
+# Acciones que acepta "lote" (una por operación)
+ACCIONES_LOTE = ("guardar", "actualizar", "leer", "eliminar")
+
+# Acciones que modifican entidades (invalidan los datos del cliente en caché)
+ACCIONES_ESCRITURA = ("guardar", "actualizar", "eliminar", "lote")
 
 def entidades_function(session_id: str, id_cliente: str, action: str, 
                       entity_data: Optional[Dict[str, Any]] = None,
-                      entity_id: Optional[str] = None) -> Dict[str, Any]:
+                      entity_id: Optional[str] = None,
+                      operaciones: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
     Gestiona entidades (personas, organizaciones, jerga, conceptos) en la base de datos.
     
     Args:
         session_id: ID de la sesión actual
         id_cliente: ID del cliente asociado
-        action: Acción a realizar ("guardar", "actualizar", "leer", "eliminar")
-        entity_data: Datos de la entidad para guardar/actualizar (opcional)
-        entity_id: ID de la entidad para leer/actualizar/eliminar (opcional)
+        action: Acción a realizar ("guardar", "actualizar", "leer", "eliminar", "listar", "lote")
+        entity_data: Datos de la entidad para guardar/actualizar, o filtros para listar
+            (tipo_entidad, nombre_entidad, estado, limit) (opcional)
+        entity_id: ID de la entidad para leer/actualizar/eliminar (opcional); sólo se
+            encuentra si es de id_cliente
+        operaciones: Para "lote": lista de {"action", "entity_data", "entity_id"} con
+            acciones guardar/actualizar/leer/eliminar, ejecutadas en una sola transacción
         
     Returns:
-        Dict[str, Any]: Resultado de la operación con status y datos
+        Dict[str, Any]: Resultado de la operación con status y datos; para "lote",
+            "results" con un resultado por operación, en el mismo orden
     """
-    print(f"\\n[ENTIDADES_TOOL]: Acción '{action}' para cliente {id_cliente}")
-    
+    log.debug("Acción '%s' para cliente %s", action, id_cliente)
+    store = get_entity_store()
+    try:
+        if action == "lote":
+            if not operaciones:
+                return {"status": "error", "message": "Operaciones requeridas para lote."}
+            # Una sola llamada a la tool (y un solo commit) en vez de una por entidad.
+            # Los errores de validación / not_found quedan en el resultado de cada operación;
+            # una excepción revierte todo el lote.
+            try:
+                with store.transaction():
+                    results = []
+                    for op in operaciones:
+                        op_action = op.get("action")
+                        if op_action not in ACCIONES_LOTE:
+                            results.append({"status": "error", "message": f"Acción no válida en lote: {op_action}"})
+                            continue
+                        results.append(_ejecutar_accion(store, id_cliente, op_action,
+                                                        op.get("entity_data"), op.get("entity_id")))
+            except Exception as e:
+                log.error("LOTE REVERTIDO: %s", e, evento="lote_error")
+                return {"status": "error", "message": f"Lote revertido: {e}"}
+            log.info("LOTE: %s operaciones en una llamada", len(operaciones), evento="lote",
+                     session_id=session_id, operaciones=len(operaciones))
+            return {"status": "ok", "results": results, "count": len(results)}
+
+        return _ejecutar_accion(store, id_cliente, action, entity_data, entity_id)
+    finally:
+        # Después de escribir (no antes): una lectura concurrente no puede volver a
+        # cachear los datos viejos del cliente
+        if action in ACCIONES_ESCRITURA:
+            invalidate_client_data(id_cliente=id_cliente)
+
+def _ejecutar_accion(store, id_cliente: str, action: str, entity_data: Optional[Dict[str, Any]],
+                     entity_id: Optional[str]) -> Dict[str, Any]:
     if action == "guardar":
         if not entity_data:
             return {"status": "error", "message": "Datos de entidad requeridos para guardar."}
         
-        new_entity_id = str(uuid.uuid4())
+        # Resolución de alias: si el nombre coincide con una entidad del cliente, se combina con ella
+        entity, merged = save_or_merge(id_cliente, new_entity(id_cliente, entity_data))
         
-        entity_entry = {
-            "id_cliente": id_cliente,
-            "tipo_entidad": entity_data.get("tipo_entidad", "Concepto"),
-            "nombre_entidad": entity_data.get("nombre_entidad", ""),
-            "datos_entidad": entity_data.get("datos_entidad", {}),
-            "tipo_relacion": entity_data.get("tipo_relacion"),
-            "estado": "activo",
-            "created_at": datetime.now(),
-            "modified_at": datetime.now()
-        }
+        log.info("ENTIDAD GUARDADA: ID %s, Tipo: %s (combinada: %s)", entity["id"], entity_data.get('tipo_entidad'),
+                 merged, evento="guardar")
         
-        _simulated_entities_db[new_entity_id] = {**entity_entry, "id": new_entity_id}
-        
-        print(f"       -> ENTIDAD GUARDADA: ID {new_entity_id}")
-        print(f"          Tipo: {entity_data.get('tipo_entidad')}")
-        
-        return {"status": "ok", "entity_id": new_entity_id, "entity": _simulated_entities_db[new_entity_id]}
+        return {"status": "ok", "entity_id": entity["id"], "entity": entity, "merged": merged}
     
     elif action == "leer":
         if not entity_id:
             return {"status": "error", "message": "ID de entidad requerido para leer."}
         
-        entity = _simulated_entities_db.get(entity_id)
+        entity = store.get(entity_id, id_cliente=id_cliente)
         if entity:
-            print(f"       -> ENTIDAD LEÍDA: {entity.get('nombre_entidad')}")
+            log.debug("ENTIDAD LEÍDA: %s", entity.get('nombre_entidad'))
             return {"status": "ok", "entity": entity}
         else:
             return {"status": "not_found", "message": "Entidad no encontrada."}
     
+    elif action == "listar":
+        # Acotado a la partición del cliente, por índices (tipo, nombre normalizado, estado)
+        filtros = entity_data or {}
+        entities = store.find(id_cliente,
+                              tipo_entidad=filtros.get("tipo_entidad"),
+                              nombre=filtros.get("nombre_entidad"),
+                              estado=filtros.get("estado"),
+                              limit=filtros.get("limit"))
+        log.debug("ENTIDADES LISTADAS: %s", len(entities))
+        return {"status": "ok", "entities": entities, "count": len(entities)}
+    
     elif action == "actualizar":
         if not entity_id or not entity_data:
             return {"status": "error", "message": "ID y datos requeridos para actualizar."}
         
-        if entity_id in _simulated_entities_db:
-            _simulated_entities_db[entity_id].update(entity_data)
-            _simulated_entities_db[entity_id]["modified_at"] = datetime.now()
-            return {"status": "ok", "entity": _simulated_entities_db[entity_id]}
+        entity = store.update(entity_id, entity_data, id_cliente=id_cliente)
+        if entity:
+            return {"status": "ok", "entity": entity}
         else:
             return {"status": "not_found", "message": "Entidad no encontrada."}
     
@@ -75,9 +118,8 @@ def entidades_function(session_id: str, id_cliente: str, action: str,
         if not entity_id:
             return {"status": "error", "message": "ID de entidad requerido para eliminar."}
         
-        if entity_id in _simulated_entities_db:
-            del _simulated_entities_db[entity_id]
-            print(f"       -> ENTIDAD ELIMINADA: {entity_id}")
+        if store.delete(entity_id, id_cliente=id_cliente):
+            log.info("ENTIDAD ELIMINADA: %s", entity_id, evento="eliminar")
             return {"status": "ok"}
         else:
             return {"status": "not_found", "message": "Entidad no encontrada."}
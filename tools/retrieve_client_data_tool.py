@@ -1,21 +1,15 @@
 retrieve_content = '''from google.adk.tools import FunctionTool
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, Tuple
 from schemas import ClienteModel, SesionModel, EntidadModel
+from core.utils.tool_events import get_tool_logger
+from core.cache import get_client_data_cache
+from core.clientes import CHUNK_DEFAULT, RepositoryClientSource, get_client_data, iter_clients_data
 import json
 
-# Simulación de base de datos (TODO: reemplazar por Supabase real)
-_simulated_db_clients = {
-    "test_id_cliente_1": {
-        "preferencias": {"idioma": "es", "tono": "cercano", "voz": "femenina", "canal_comunicacion": "T"},
-        "resumen_memoria_larga": "El cliente tiene un conflicto laboral. En sesiones anteriores, expresó frustración y ha trabajado en técnicas de gestión de estrés. Su objetivo actual es mejorar la comunicación en el trabajo.",
-        "entidades_iniciales": [
-            {"tipo_entidad": "Persona", "nombre_entidad": "Jefe", "datos_entidad": {"rol": "superior"}, "tipo_relacion": "Disfuncional"},
-            {"tipo_entidad": "Concepto", "nombre_entidad": "Burnout", "datos_entidad": {"definicion": "Estado de agotamiento físico y emocional."}, "estado": "Confirmado"}
-        ],
-        "CSAT": 8,
-        "comentario_usuario": "Zenda me ayudó a ver el problema desde otra perspectiva."
-    }
-}
+log = get_tool_logger("RETRIEVE_CLIENT_TOOL")
+
+# Clientes, sesiones y entidades desde los repositorios compartidos (SQLite local o Supabase)
+_source = RepositoryClientSource()
 
 def retrieve_client_data_function(id_cliente: str) -> Dict[str, Any]:
     """
@@ -28,32 +22,35 @@ def retrieve_client_data_function(id_cliente: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Diccionario con preferencias, resumen de memoria larga, y entidades iniciales
     """
-    print(f"\\n[RETRIEVE_CLIENT_TOOL]: Recuperando datos para cliente '{id_cliente}'")
-
-    data = _simulated_db_clients.get(id_cliente, {})
-
-    if not data:
-        print(f"       -> CLIENTE NO ENCONTRADO: '{id_cliente}' - Devolviendo datos por defecto")
-        return {
-            "preferencias": {"idioma": "es", "tono": "profesional", "canal_comunicacion": "T"},
-            "resumen_memoria_larga": None,
-            "entidades_iniciales": [],
-            "CSAT": None,
-            "comentario_usuario": None
-        }
-    else:
-        resumen = data.get('resumen_memoria_larga', '')
-        print(f"       -> DATOS RECUPERADOS - Resumen: '{resumen[:50]}...'")
-        print(f"          Preferencias: {data.get('preferencias', {}).get('idioma', 'N/A')}")
-        print(f"          Entidades: {len(data.get('entidades_iniciales', []))}")
+    # Caché LRU con TTL por cliente (core.clientes.get_client_data)
+    data = get_client_data(id_cliente, _source)
+    log.debug("DATOS RECUPERADOS - Resumen: '%.50s...', Preferencias: %s, Entidades: %s",
+              data.get('resumen_memoria_larga') or '',
+              lambda: data['preferencias'].get('idioma', 'N/A'),
+              lambda: len(data['entidades_iniciales']))
+    log.debug("Caché de clientes: %s", lambda: get_client_data_cache().stats())
+    return data
 
-    return {
-        "preferencias": data.get("preferencias", {}),
-        "resumen_memoria_larga": data.get("resumen_memoria_larga"),
-        "entidades_iniciales": data.get("entidades_iniciales", []),
-        "CSAT": data.get("CSAT"),
-        "comentario_usuario": data.get("comentario_usuario")
-    }
+def retrieve_clients_data_bulk(ids_cliente: Iterable[str], chunk_size: int = CHUNK_DEFAULT
+                               ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Recupera los datos de muchos clientes para jobs nocturnos (backfills de QA,
+    re-resumen de memoria, conciliación de facturación).
+    No es una FunctionTool: la usan procesos batch, no los agentes.
+    
+    Args:
+        ids_cliente: IDs de cliente (cualquier iterable; se consume por bloques)
+        chunk_size: Clientes por consulta IN
+        
+    Returns:
+        Iterator de (id_cliente, datos), con datos en el formato de retrieve_client_data_function
+    """
+    total = 0
+    for id_cliente, data in iter_clients_data(ids_cliente, _source, chunk_size):
+        total += 1
+        yield id_cliente, data
+    log.info("LECTURA MASIVA: %s clientes en bloques de %s", total, chunk_size, evento="lectura_masiva",
+             clientes=total)
 
 # Crear FunctionTool ADK
 retrieve_client_data_tool = FunctionTool(retrieve_client_data_function)
@@ -2,10 +2,11 @@ save_context_content = '''from google.adk.tools import FunctionTool
 from typing import Dict, Any
 from datetime import datetime
 from schemas import EntidadModel
-import uuid
+from core.entidades import get_entity_store, new_entity
+from core.cache import invalidate_client_data
+from core.utils.tool_events import get_tool_logger
 
-# Simulación de base de datos (TODO: reemplazar por Supabase)
-_simulated_entities_db = {}
+log = get_tool_logger("SAVE_CONTEXT_TOOL")
 
 def save_context_info_function(session_id: str, id_cliente: str, info_type: str, info_content: str) -> Dict[str, Any]:
     """
@@ -21,13 +22,12 @@ def save_context_info_function(session_id: str, id_cliente: str, info_type: str,
     Returns:
         Dict[str, Any]: Resultado de la operación con status y entity_id
     """
-    print(f"\\n[SAVE_CONTEXT_TOOL]: Guardando contexto para cliente {id_cliente}")
-    print(f"                      Tipo: {info_type}")
-    print(f"                      Contenido: '{info_content[:50]}...'")
+    log.debug("Guardando contexto para cliente %s, Tipo: %s, Contenido: '%.50s...'",
+              id_cliente, info_type, info_content)
 
-    new_entity_id = str(uuid.uuid4())
-    entity_data = {
-        "id_cliente": id_cliente,
+    # Mismo almacén que entidades_tool: lo guardado acá se ve con "leer"/"listar".
+    # Sin resolución de alias: el nombre es texto libre y no identifica a una entidad.
+    entity = get_entity_store().put(new_entity(id_cliente, {
         "tipo_entidad": info_type,
         "nombre_entidad": info_content[:100],
         "datos_entidad": {
@@ -37,15 +37,11 @@ def save_context_info_function(session_id: str, id_cliente: str, info_type: str,
             "auto_detected": True
         },
         "tipo_relacion": "Información",
-        "estado": "activo",
-        "created_at": datetime.now(),
-        "modified_at": datetime.now()
-    }
-    
-    _simulated_entities_db[new_entity_id] = {**entity_data, "id": new_entity_id}
+    }))
+    new_entity_id = entity["id"]
+    invalidate_client_data(id_cliente=id_cliente)
     
-    print(f"       -> CONTEXTO GUARDADO: ID {new_entity_id}")
-    print(f"          Como entidad tipo '{info_type}'")
+    log.info("CONTEXTO GUARDADO: ID %s como entidad tipo '%s'", new_entity_id, info_type, evento="guardar")
     
     return {
         "status": "ok", 
@@ -2,9 +2,12 @@ save_qa_content = '''from google.adk.tools import FunctionTool
 from typing import Dict, Any
 from datetime import datetime
 from schemas import QaModel
+from core.utils.tool_events import get_tool_logger
 import uuid
 import json
 
+log = get_tool_logger("SAVE_QA_TOOL")
+
 def save_qa_report_function(qa_report_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Guarda el reporte de auditoría QA en la tabla 'qa'.
@@ -17,24 +20,22 @@ def save_qa_report_function(qa_report_data: Dict[str, Any]) -> Dict[str, Any]:
         Dict[str, Any]: Estado de la operación con report_id
     """
     session_id = qa_report_data.get('id_sesion', 'N/A')
-    print(f"\\n[SAVE_QA_TOOL]: Guardando reporte QA para sesión {session_id}")
-    print(f"                  Adherencia: {qa_report_data.get('adherencia', 'N/A')}")
-    print(f"                  Efectividad: {qa_report_data.get('efectividad', 'N/A')}")
+    log.debug("Guardando reporte QA para sesión %s, Adherencia: %s, Efectividad: %s", session_id,
+              qa_report_data.get('adherencia', 'N/A'), qa_report_data.get('efectividad', 'N/A'))
 
     report_id = str(uuid.uuid4())
     
-    print(f"       -> REPORTE QA GUARDADO: ID {report_id}")
+    log.info("REPORTE QA GUARDADO: ID %s", report_id, evento="guardar")
     
     if qa_report_data.get('violaciones_guardrails'):
-        print(f"       -> ⚠️  VIOLACIONES DETECTADAS: {qa_report_data['violaciones_guardrails']}")
+        log.warning("⚠️  VIOLACIONES DETECTADAS: %s", qa_report_data['violaciones_guardrails'], evento="violaciones")
     
     if qa_report_data.get('alarma_seguridad'):
-        print(f"       -> 🚨 ALARMA DE SEGURIDAD ACTIVADA")
+        log.error("🚨 ALARMA DE SEGURIDAD ACTIVADA", session_id=session_id, evento="alarma_seguridad")
     
-    print(f"       -> Métricas principales:")
-    print(f"          • CSAT: {qa_report_data.get('CSAT', 'N/A')}")
-    print(f"          • QA Labels: {qa_report_data.get('qa_labels', [])}")
-    print(f"          • Fallos memoria: {qa_report_data.get('num_fallos_memoria_explicit', 0)} + {qa_report_data.get('num_fallos_memoria_implicit', 0)}")
+    log.debug("Métricas principales: CSAT: %s, QA Labels: %s, Fallos memoria: %s + %s",
+              qa_report_data.get('CSAT', 'N/A'), qa_report_data.get('qa_labels', []),
+              qa_report_data.get('num_fallos_memoria_explicit', 0), qa_report_data.get('num_fallos_memoria_implicit', 0))
     
     return {
         "status": "ok", 
@@ -1,11 +1,14 @@
 update_summary_content = '''from google.adk.tools import FunctionTool
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from schemas import SesionModel
+from core.utils.tool_events import get_tool_logger
+from core.cache import invalidate_client_data
+from core.repositorios import get_repository
 
-# Simulación de base de datos de sesiones (TODO: reemplazar por Supabase)
-_simulated_sessions_db = {}
+log = get_tool_logger("UPDATE_SUMMARY_TOOL")
 
-def update_session_summary_function(session_id: str, historical_summary: str) -> Dict[str, Any]:
+def update_session_summary_function(session_id: str, historical_summary: str,
+                                    id_cliente: Optional[str] = None) -> Dict[str, Any]:
     """
     Actualiza el campo historical_summary de la sesión en la base de datos.
     Esta es una FunctionTool que el Agente QA usará para la memoria a largo plazo.
@@ -13,20 +16,27 @@ def update_session_summary_function(session_id: str, historical_summary: str) ->
     Args:
         session_id: ID de la sesión
         historical_summary: El nuevo resumen acumulativo de la sesión
+        id_cliente: ID del cliente (opcional; si falta se busca por la sesión) para invalidar
+            sus datos en caché
         
     Returns:
         Dict[str, Any]: Estado de la operación
     """
-    print(f"\\n[UPDATE_SUMMARY_TOOL]: Actualizando resumen para sesión {session_id}")
-    print(f"                        Resumen: '{historical_summary[:100]}...'")
+    log.debug("Actualizando resumen para sesión %s, Resumen: '%.100s...'", session_id, historical_summary)
 
-    _simulated_sessions_db[session_id] = {
-        "historical_summary": historical_summary,
-        "updated_at": "2025-01-01T00:00:00Z"
-    }
+    sesiones = get_repository("sesiones")
+    sesion = sesiones.update(session_id, {"historical_summary": historical_summary})
+    if sesion is None:
+        # Sin sesión no hay a qué colgar el resumen: crear una fila acá dejaría una sesión
+        # huérfana (sin cliente si no se conoce) que nadie vuelve a leer
+        log.warning("SESIÓN NO ENCONTRADA: '%s' - resumen no guardado", session_id, evento="sesion_no_encontrada")
+        return {"status": "error", "session_id": session_id,
+                "message": f"Sesión {session_id} no encontrada; el resumen no se guardó."}
+
+    # El resumen alimenta resumen_memoria_larga: la próxima sesión debe leerlo de la base
+    invalidate_client_data(id_cliente=id_cliente or sesion.get("id_cliente"), session_id=session_id)
     
-    print(f"       -> RESUMEN ACTUALIZADO exitosamente")
-    print(f"          Longitud: {len(historical_summary)} caracteres")
+    log.info("RESUMEN ACTUALIZADO exitosamente. Longitud: %s caracteres", len(historical_summary), evento="actualizar")
     
     # Verificar calidad del resumen
     summary_quality_indicators = {
@@ -37,7 +47,7 @@ def update_session_summary_function(session_id: str, historical_summary: str) ->
     }
     
     quality_score = sum(summary_quality_indicators.values()) / len(summary_quality_indicators)
-    print(f"          Calidad estimada: {quality_score:.1%}")
+    log.debug("Calidad estimada: %.1f%%", quality_score * 100)
     
     return {
         "status": "ok", 
@@ -112,8 +112,11 @@ def test_supabase_connection() -> Any | None: # Returns SupabaseClient or None
     print_header("CONEXIÓN SUPABASE")
     
     try:
-        from supabase import create_client
         from dotenv import load_dotenv
+        if PROJECT_ROOT not in sys.path:
+            sys.path.append(PROJECT_ROOT)
+        # Mismo cliente compartido que usan los repositorios (no uno nuevo por chequeo)
+        from core.repositorios import get_supabase_client
         
         load_dotenv(f'{PROJECT_ROOT}/.env')
         url = os.getenv('SUPABASE_URL')
@@ -123,7 +126,7 @@ def test_supabase_connection() -> Any | None: # Returns SupabaseClient or None
             print("❌ Credenciales no disponibles")
             return None
         
-        client = create_client(url, key)
+        client = get_supabase_client()
         
         # Test básico de conexión
         response = client.table('clientes').select('count', count='exact').execute()